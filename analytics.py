@@ -0,0 +1,142 @@
+"""分析用の集計（表示・出力を伴わない純粋な関数）
+
+CLI（main.py）・HTTP API（api.py）・ダッシュボード（app.py）で共通に使う。
+"""
+
+import pandas as pd
+
+from config import DEFAULT_REGION
+from cost_model import DEFAULT_MODEL, CostModel
+from profit import ProfitParams
+from sketch import DEFAULT_QUANTILES, QuantileSketch
+
+
+def region_mask(df: pd.DataFrame, region: str = DEFAULT_REGION) -> pd.Series:
+    """region の行（region 列がない・空欄の行は既定の地域）"""
+    if "region" not in df.columns:
+        return pd.Series(region == DEFAULT_REGION, index=df.index)
+    return df["region"].fillna(DEFAULT_REGION) == region
+
+
+def for_region(df: pd.DataFrame, region: str = DEFAULT_REGION) -> pd.DataFrame:
+    """1地域の行だけを返す（価格の通貨が混ざらないように、集計の前に絞り込む）"""
+    mask = region_mask(df, region)
+    return df if mask.all() else df[mask]
+
+
+def latest_snapshot(df: pd.DataFrame) -> pd.DataFrame:
+    """最新のタイムスタンプの行だけを返す（timestamp 列がなければそのまま）"""
+    if "timestamp" not in df.columns or df.empty:
+        return df
+    return df[df["timestamp"] == df["timestamp"].max()]
+
+
+def genre_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """ジャンル（キーワード）別の統計
+
+    Returns:
+        DataFrame: ジャンル / 商品数 / 平均価格 / 総販売数 / 平均販売数 / 平均評価 / 最高販売数
+                   （/ 平均想定利益: estimated_profit_jpy 列がある場合）。出現順に並ぶ
+    """
+    aggs = {
+        "商品数": ("price", "size"),
+        "平均価格": ("price", "mean"),
+        "総販売数": ("sales", "sum"),
+        "平均販売数": ("sales", "mean"),
+        "平均評価": ("shop_rating", "mean"),
+        "最高販売数": ("sales", "max"),
+    }
+    if "estimated_profit_jpy" in df.columns:
+        aggs["平均想定利益"] = ("estimated_profit_jpy", "mean")
+
+    stats = df.groupby("keyword", sort=False).agg(**aggs)
+    return stats.rename_axis("ジャンル").reset_index()
+
+
+def top_profit(df: pd.DataFrame, top_n: int = 15) -> pd.DataFrame:
+    """最新スナップショットの利益額上位N商品"""
+    return latest_snapshot(df).nlargest(top_n, "estimated_profit_jpy")
+
+
+def category_summary(
+    rollups: pd.DataFrame,
+    params: ProfitParams | None = None,
+    cost_model: CostModel = DEFAULT_MODEL,
+) -> pd.DataFrame | None:
+    """パーティションの集計値（SnapshotStore.rollups）からキーワード別の統計を計算
+
+    利益はパラメータを固定すると価格の一次式なので、平均利益 = margin × 平均価格 - 固定コスト。
+    行データを使わないため、計算量はパーティション数に比例する。
+
+    Args:
+        rollups: snapshot_id / keyword / rows / sum_sales / sum_price / rate
+        params: 利益計算パラメータ（None=各スナップショットのレートとコストモデル）
+        cost_model: params 省略時のコストモデル
+
+    Returns:
+        DataFrame: index=keyword, 列=rows / sales / mean_price / mean_profit（出現順）。
+                   コストモデルが一次式で表せない場合は None
+    """
+    if params is not None:
+        margin = params.margin
+        fixed = params.fixed_cost
+    else:
+        terms = [cost_model.keyword_params(k, r) for k, r in zip(rollups["keyword"], rollups["rate"])]
+        if any(t is None for t in terms):
+            return None
+        margin = pd.Series([t.margin for t in terms], index=rollups.index, dtype=float)
+        fixed = pd.Series([t.fixed_cost for t in terms], index=rollups.index, dtype=float)
+
+    sums = rollups.assign(sum_profit=rollups["sum_price"] * margin - rollups["rows"] * fixed)
+    sums = sums.groupby("keyword", sort=False)[["rows", "sum_sales", "sum_price", "sum_profit"]].sum()
+    sums = sums[sums["rows"] > 0]
+    return pd.DataFrame({
+        "rows": sums["rows"],
+        "sales": sums["sum_sales"],
+        "mean_price": sums["sum_price"] / sums["rows"],
+        "mean_profit": sums["sum_profit"] / sums["rows"],
+    })
+
+
+def frame_category_summary(df: pd.DataFrame, profit_col: str = "estimated_profit_jpy") -> pd.DataFrame:
+    """行データからキーワード別の統計を計算（category_summary と同じ列。利益列がなければ NaN）"""
+    grouped = df.groupby("keyword", sort=False)
+    return pd.DataFrame({
+        "rows": grouped.size(),
+        "sales": grouped["sales"].sum(),
+        "mean_price": grouped["price"].mean(),
+        "mean_profit": grouped[profit_col].mean() if profit_col in df.columns else float("nan"),
+    })
+
+
+def category_quantiles(
+    sketches: dict[str, dict[str, QuantileSketch]],
+    params: ProfitParams | dict | None = None,
+    qs=DEFAULT_QUANTILES,
+) -> pd.DataFrame:
+    """キーワード別の分位点（SnapshotStore.sketches / sketch.frame_sketches の結果から）
+
+    利益は価格の一次式なので、利益の分位点は価格の分位点から求める
+    （margin が負なら順序が逆になる）。
+
+    Args:
+        sketches: {キーワード: {列名: QuantileSketch}}
+        params: 利益計算パラメータ（キーワード別の dict も可。None=利益の列なし）
+        qs: 分位点（0〜1）
+
+    Returns:
+        DataFrame: index=keyword, 列=price_p10 / ... / sales_p10 / ... / profit_p10 / ...
+    """
+    labels = [f"p{round(q * 100)}" for q in qs]
+    records = {}
+    for keyword, columns in sketches.items():
+        record = {}
+        for col, sketch in columns.items():
+            record.update(zip((f"{col}_{label}" for label in labels), sketch.quantiles(qs)))
+        keyword_params = params.get(keyword) if isinstance(params, dict) else params
+        if keyword_params is not None and "price" in columns:
+            margin, fixed = keyword_params.margin, keyword_params.fixed_cost
+            prices = columns["price"].quantiles(qs if margin >= 0 else [1 - q for q in qs])
+            record.update(zip((f"profit_{label}" for label in labels), (p * margin - fixed for p in prices)))
+        records[keyword] = record
+    return pd.DataFrame.from_dict(records, orient="index")
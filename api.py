@@ -0,0 +1,302 @@
+"""読み取り専用のローカル HTTP API（集計結果をメモリに常駐）
+
+最新スナップショットと集計（ジャンル別統計・利益ランキング・お宝商品インデックス）を
+メモリに保持し、複数のダッシュボードやスクリプトから共有する。
+- ストアのマニフェストが更新されたら次のリクエスト時に作り直す
+- レスポンスは (バージョン, パス, クエリ) 単位でキャッシュし、ETag / 304 に対応
+- リクエストごとにスレッドで処理（ThreadingHTTPServer）
+
+エンドポイント:
+    GET /health
+    GET /snapshots
+    GET /genres
+    GET /ranking?top_n=15
+    GET /treasure?min_profit=500&min_sales=100&min_rating=4.5
+    GET /treasure/sweep?min_profits=0,500,1000&min_sales=100&min_rating=4.5
+
+使い方:
+    python api.py --port 8765
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+
+from analytics import genre_stats, latest_snapshot, top_profit
+from config import STORE_DIR
+from log import get_logger, log_fields, setup_logging
+from metrics import incr, span
+from storage import SnapshotStore
+from treasure_index import TreasureIndex
+
+logger = get_logger("api")
+
+# マニフェストの更新確認の間隔（秒）
+RELOAD_INTERVAL = 1.0
+# レスポンスキャッシュの最大件数
+CACHE_SIZE = 512
+# ランキングの最大件数
+MAX_TOP_N = 500
+
+PRODUCT_FIELDS = ["keyword", "name", "price", "sales", "shop_rating", "price_jpy", "estimated_profit_jpy"]
+
+# ジャンル別統計の列名（API では英語のキーで返す）
+GENRE_FIELDS = {
+    "ジャンル": "keyword",
+    "商品数": "count",
+    "平均価格": "avg_price",
+    "総販売数": "total_sales",
+    "平均販売数": "avg_sales",
+    "平均評価": "avg_rating",
+    "最高販売数": "max_sales",
+    "平均想定利益": "avg_profit_jpy",
+}
+
+
+class ApiError(Exception):
+    """クライアントに返すエラー"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _records(df: pd.DataFrame, columns: list[str] | None = None) -> list[dict]:
+    """DataFrame を JSON 用のレコードに変換（NaN は null）"""
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def _param(query: dict, name: str, default: float, cast=float):
+    """クエリパラメータを数値として取得"""
+    if name not in query:
+        return default
+    try:
+        return cast(query[name])
+    except ValueError:
+        raise ApiError(HTTPStatus.BAD_REQUEST, f"{name} の値が不正です: {query[name]}") from None
+
+
+class _Snapshot:
+    """1バージョン分の常駐データと集計"""
+
+    def __init__(self, version: int, store: SnapshotStore):
+        self.version = version
+        snapshots = store.snapshots()
+        self.snapshot_id = snapshots[-1] if snapshots else None
+        self.snapshots = snapshots
+        df = store.scan(snapshots=[self.snapshot_id]) if self.snapshot_id else pd.DataFrame()
+        self.df = latest_snapshot(df)
+
+        if self.df.empty:
+            self.timestamp = None
+            self.genres = []
+            self.ranking = self.df
+            self.index = None
+            return
+
+        self.timestamp = str(self.df["timestamp"].max()) if "timestamp" in self.df.columns else None
+        stats = genre_stats(self.df).sort_values("総販売数", ascending=False, kind="stable")
+        self.genres = _records(stats.rename(columns=GENRE_FIELDS))
+        self.ranking = top_profit(self.df, MAX_TOP_N)
+        self.index = TreasureIndex(self.df)
+
+
+class ApiState:
+    """常駐データとレスポンスキャッシュ（スレッド間で共有）"""
+
+    def __init__(self, store: SnapshotStore, cache_size: int = CACHE_SIZE):
+        self.store = store
+        self.cache_size = cache_size
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._snapshot: _Snapshot | None = None
+        self._checked_at = 0.0
+        self._cache: OrderedDict[tuple, tuple[str, bytes]] = OrderedDict()
+
+    def current(self) -> _Snapshot:
+        """最新の常駐データ（マニフェストが更新されていれば作り直す）"""
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and now - self._checked_at < RELOAD_INTERVAL:
+            return snapshot
+
+        with self._lock:
+            self._checked_at = now
+            version = self.store.version()
+            if self._snapshot is None or self._snapshot.version != version:
+                with span("api.reload"):
+                    self._snapshot = _Snapshot(version, self.store)
+                self._cache.clear()
+                logger.info(
+                    f"🔄 スナップショット {self._snapshot.snapshot_id} を読み込みました（{len(self._snapshot.df)}件）",
+                    extra=log_fields(snapshot_id=self._snapshot.snapshot_id, rows=len(self._snapshot.df)),
+                )
+            return self._snapshot
+
+    def respond(self, path: str, query: dict) -> tuple[str | None, bytes]:
+        """(ETag, JSON) を返す（キャッシュ済みならそれを使う）"""
+        snapshot = self.current()
+        key = (snapshot.version, path, tuple(sorted(query.items())))
+        if path == "/health":
+            # 稼働時間を含むためキャッシュしない
+            return None, json.dumps(self._build(snapshot, path, query), ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                incr("api.cache_hit")
+                return cached
+
+        incr("api.cache_miss")
+        body = json.dumps(self._build(snapshot, path, query), ensure_ascii=False, default=str).encode("utf-8")
+        etag = 'W/"' + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16] + '"'
+        with self._lock:
+            self._cache[key] = (etag, body)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return etag, body
+
+    def _build(self, snapshot: _Snapshot, path: str, query: dict):
+        """エンドポイントごとのレスポンス"""
+        if path == "/health":
+            return {
+                "status": "ok" if snapshot.index is not None else "empty",
+                "snapshot_id": snapshot.snapshot_id,
+                "timestamp": snapshot.timestamp,
+                "rows": len(snapshot.df),
+                "uptime_s": round(time.time() - self.started_at, 1),
+            }
+        if path == "/snapshots":
+            return {"snapshots": snapshot.snapshots, "latest": snapshot.snapshot_id}
+
+        if path not in ("/genres", "/ranking", "/treasure", "/treasure/sweep"):
+            raise ApiError(HTTPStatus.NOT_FOUND, f"不明なパスです: {path}")
+        if snapshot.index is None:
+            raise ApiError(HTTPStatus.SERVICE_UNAVAILABLE, "データがありません")
+
+        meta = {"snapshot_id": snapshot.snapshot_id, "timestamp": snapshot.timestamp}
+        if path == "/genres":
+            return {**meta, "genres": snapshot.genres}
+
+        if path == "/ranking":
+            top_n = min(max(_param(query, "top_n", 15, int), 0), MAX_TOP_N)
+            return {**meta, "products": _records(snapshot.ranking.head(top_n), PRODUCT_FIELDS)}
+
+        min_sales = _param(query, "min_sales", 100)
+        min_rating = _param(query, "min_rating", 4.5)
+        if path == "/treasure":
+            min_profit = _param(query, "min_profit", 500)
+            treasure = snapshot.index.select(min_profit, min_sales, min_rating)
+            return {**meta, "count": len(treasure), "products": _records(treasure, PRODUCT_FIELDS)}
+
+        try:
+            min_profits = [float(v) for v in query.get("min_profits", "0,250,500,1000,2000").split(",")]
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"min_profits の値が不正です: {query['min_profits']}") from None
+        counts = snapshot.index.sweep(min_profits, min_sales, min_rating)
+        return {**meta, "min_profits": min_profits, "counts": [int(c) for c in counts]}
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """GET / HEAD のみ受け付けるハンドラー"""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "ShopeeResearchAPI/1.0"
+    state: ApiState  # make_server で設定
+
+    def _send(self, status: HTTPStatus, body: bytes = b"", etag: str | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"max-age={int(RELOAD_INTERVAL)}")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/") or "/health"
+        query = dict(parse_qsl(url.query))
+        incr("api.requests")
+        try:
+            with span("api.request"):
+                etag, body = self.state.respond(path, query)
+        except ApiError as e:
+            incr(f"api.status.{e.status.value}")
+            body = json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8")
+            self._send(e.status, body)
+            return
+        except Exception as e:
+            # 壊れたパーティション・コストモデルのエラーなどでも接続を切らずに 500 を返す
+            logger.exception(f"❌ リクエストの処理に失敗: {e}", extra=log_fields(path=path))
+            incr("api.status.500")
+            body = json.dumps({"error": "内部エラーが発生しました"}, ensure_ascii=False).encode("utf-8")
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, body)
+            return
+
+        if etag and etag in self.headers.get("If-None-Match", ""):
+            incr("api.status.304")
+            self._send(HTTPStatus.NOT_MODIFIED, etag=etag)
+            return
+        self._send(HTTPStatus.OK, body, etag)
+
+    do_HEAD = do_GET
+
+    def _method_not_allowed(self) -> None:
+        self.send_response(HTTPStatus.METHOD_NOT_ALLOWED)
+        self.send_header("Allow", "GET, HEAD")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = _method_not_allowed
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args, extra=log_fields(per_item=True, client=self.client_address[0]))
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765, store_root: str = STORE_DIR) -> ThreadingHTTPServer:
+    """API サーバーを作成（起動前に常駐データを読み込む）"""
+    state = ApiState(SnapshotStore(store_root))
+    state.current()
+    handler = type("BoundApiHandler", (ApiHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="読み取り専用のローカル HTTP API")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けアドレス")
+    parser.add_argument("--port", type=int, default=8765, help="待ち受けポート")
+    parser.add_argument("--store", default=STORE_DIR, help="スナップショットストア")
+    parser.add_argument("--log-level", default="INFO", help="ログレベル（DEBUG / INFO / WARNING）")
+    parser.add_argument("--log-format", choices=["console", "json"], default="console", help="ログ形式")
+    args = parser.parse_args()
+
+    setup_logging(args.log_level, args.log_format)
+    server = make_server(args.host, args.port, args.store)
+    logger.info(f"🌐 http://{args.host}:{args.port}/ で待ち受けています", extra=log_fields(host=args.host, port=args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info("🛑 API サーバーを停止しました")
+
+
+if __name__ == "__main__":
+    main()
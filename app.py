@@ -1,18 +1,31 @@
 """Shopee台湾リサーチ ダッシュボード"""
 
+import importlib.util
 import os
 from datetime import datetime
+import altair as alt
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from scraper import ShopeeScraper
-from config import SEARCH_KEYWORDS
-
-try:
-    import anthropic
-    ANTHROPIC_AVAILABLE = True
-except ImportError:
-    ANTHROPIC_AVAILABLE = False
+from analytics import category_quantiles, frame_category_summary
+from config import DEFAULT_REGION, SEARCH_KEYWORDS
+from formatting import QUANTILE_COLUMNS, RANKING_COLUMNS, column_config, visible_page
+from listing_ai import ListingGenerator, StubClient
+from listing_templates import generate_description, generate_hashtags, render_listings
+from marketplace import get_marketplace
+from cost_model import load_cost_model
+from profit import ProfitParams, calculate_profit
+from query import query_category_summary, query_products, query_sketches
+from rates import get_rate_provider
+from seller_export import OPENPYXL_AVAILABLE, calculate_premium_price, export_bytes, keyword_price_stats
+from sensitivity import axis, profit_grid
+from sketch import QuantileSketch, frame_sketches
+from storage import SnapshotStore
+from treasure_index import TreasureIndex
+
+# anthropic は使用時に読み込む（存在確認のみ）
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
 
 # ページ設定
 st.set_page_config(
@@ -216,97 +229,114 @@ st.markdown("""
 
 DATA_FILE = "research_results.csv"
 
+# 感度分析のグリッド（レート・手数料率は100段階、原価率は5%刻み）
+SENSITIVITY_STEPS = 100
+SENSITIVITY_COST_STEPS = 21
+
+
+@st.cache_resource
+def get_store():
+    store = SnapshotStore()
+    # 旧形式のCSVしかない場合は一度だけ取り込む
+    if not store.partitions() and os.path.exists(DATA_FILE):
+        store.import_csv(DATA_FILE)
+    return store
+
 
+# 価格は地域の通貨のため、読み込みはすべて選択中の1地域（region）に限定する
 @st.cache_data
-def load_data():
-    if os.path.exists(DATA_FILE):
-        return pd.read_csv(DATA_FILE, encoding="utf-8-sig")
-    return pd.DataFrame()
+def load_filtered(keywords, min_profit, min_sales, params, use_model, version, region):
+    # version はストア・コストモデル更新時にキャッシュを無効化するためのキー
+    cost_model = load_cost_model() if use_model else None
+    return query_products(get_store(), list(keywords), min_profit, min_sales, params, cost_model, region)
 
 
-def run_scraper(use_sample: bool = False):
-    scraper = ShopeeScraper()
-    scraper.run(keywords=SEARCH_KEYWORDS, use_sample=use_sample)
+@st.cache_data
+def load_category_summary(keywords, min_profit, min_sales, params, use_model, version, region):
+    # パーティションの集計値から計算（条件で一部の行が除外される場合は None）
+    cost_model = load_cost_model() if use_model else None
+    return query_category_summary(get_store(), list(keywords), min_profit, min_sales, params, cost_model, region)
 
 
-def recalculate_profit(df, exchange_rate, fee_rate, fixed_cost, cost_rate):
-    df = df.copy()
-    df["price_jpy"] = df["price"] * exchange_rate
-    df["revenue"] = df["price_jpy"] * (1 - fee_rate)
-    df["cost"] = df["price_jpy"] * cost_rate
-    df["profit"] = df["revenue"] - df["cost"] - fixed_cost
-    return df
+@st.cache_data
+def load_sketches(keywords, min_profit, min_sales, params, use_model, version, region):
+    # パーティションの分位点スケッチを併合（条件で一部の行が除外される場合は None）
+    cost_model = load_cost_model() if use_model else None
+    return query_sketches(get_store(), list(keywords), min_profit, min_sales, params, cost_model, region)
 
 
-def get_api_key():
-    try:
-        if hasattr(st, 'secrets') and 'ANTHROPIC_API_KEY' in st.secrets:
-            return st.secrets['ANTHROPIC_API_KEY']
-    except Exception:
-        pass
-    return os.environ.get("ANTHROPIC_API_KEY")
+@st.cache_data
+def load_sensitivity(keywords, min_profit, min_sales, fixed, version, region):
+    # 利益の条件は閾値として使うため、読み込みはカテゴリ・販売数だけで絞り込む
+    df = get_store().scan(keywords=list(keywords), ranges={"sales": (min_sales, None)}, region=region)
+    prices = df["price"].to_numpy(dtype=float) if not df.empty else np.array([])
+    return profit_grid(
+        prices,
+        axis("exchange_rate", SENSITIVITY_STEPS, get_marketplace(region).rate_range()),
+        axis("fee_rate", SENSITIVITY_STEPS),
+        axis("cost_rate", SENSITIVITY_COST_STEPS),
+        fixed,
+        min_profit,
+    )
 
 
-def calculate_premium_price(price, df, keyword, rate=0.08):
-    same = df[df["keyword"] == keyword]
-    min_p = same["price"].min() if not same.empty else price
-    avg_p = same["price"].mean() if not same.empty else price
-    return {"min": min_p, "avg": avg_p, "premium": min_p * (1 + rate)}
+@st.cache_resource
+def get_treasure_index(keywords, params, use_model, version, region):
+    # フィルタ前のデータでインデックスを作り、閾値の変更はインデックスへのクエリで処理
+    cost_model = load_cost_model() if use_model else None
+    df = query_products(get_store(), list(keywords), params=params, cost_model=cost_model, region=region)
+    return TreasureIndex(df, profit_col="profit") if not df.empty else None
 
 
-def is_food(name, keyword):
-    foods = ["零食", "泡麵", "調味料", "咖啡", "食品", "餅乾", "糖果"]
-    return any(f in keyword or f in name for f in foods)
+@st.cache_data
+def load_keyword(keyword, version, region):
+    return get_store().scan(keywords=[keyword], region=region)
 
 
-def generate_description(product):
-    name, keyword, price = product["name"], product["keyword"], product["price"]
-    is_f = is_food(name, keyword)
+@st.cache_data
+def load_price_stats(keywords, version, region):
+    # キーワード別の価格統計（全スナップショット、パーティション単位で集計）
+    return keyword_price_stats(get_store().iter_scan(keywords=list(keywords), region=region))
 
-    features = {
-        "日本 零食": ("日本人氣零食", "獨特風味", "精緻包裝"),
-        "日本 泡麵": ("日本國民美食", "濃郁湯頭", "道地風味"),
-        "日本 調味料": ("專業主廚愛用", "提升料理層次", "天然食材"),
-        "日本 咖啡": ("嚴選咖啡豆", "香醇順口", "職人烘焙"),
-        "日本 生活用品": ("日本製造", "設計精美", "品質保證"),
-        "日本 美容": ("日本熱銷", "溫和配方", "適合亞洲肌膚"),
-    }.get(keyword, ("日本品質", "人氣商品", "值得信賴"))
 
-    return f"""【商品特點】
+# ダウンロード用ファイルの作成（ボタンを押したときに別スレッドで呼ばれる。内容が大きいため直近の分だけ保持）
+@st.cache_data(max_entries=2)
+def build_listings(keywords, min_profit, min_sales, params, use_model, version, region):
+    return render_listings(load_filtered(keywords, min_profit, min_sales, params, use_model, version, region))
 
-・{features[0]}
-・{features[1]}
-・{features[2]}
-・100% 日本原裝進口
 
-【產品規格】
+@st.cache_data(max_entries=2)
+def build_seller_export(keywords, min_profit, min_sales, params, use_model, version, region, premium_rate, fmt):
+    fdf = load_filtered(keywords, min_profit, min_sales, params, use_model, version, region)
+    return export_bytes(fdf, load_price_stats(keywords, version, region), premium_rate, fmt)
 
-商品名稱：{name[:50]}
-售價：NT${price:,.0f}
-產地：日本
 
-【為什麼選擇我們】
+def run_scraper(use_sample: bool = False):
+    from scraper import ShopeeScraper
+
+    scraper = ShopeeScraper()
+    scraper.run(keywords=SEARCH_KEYWORDS, use_sample=use_sample)
+
 
-✓ 日本通路代購 — 正規店舖購入
-✓ 空運直送 — 新鮮直達
-✓ 包裝嚴實 — 完整保護
-✓ 快速出貨 — 3-5天內寄出
-{"✓ 最新效期 — 保證新鮮" if is_f else "✓ 正品保證"}
+def get_api_key():
+    try:
+        if hasattr(st, 'secrets') and 'ANTHROPIC_API_KEY' in st.secrets:
+            return st.secrets['ANTHROPIC_API_KEY']
+    except Exception:
+        pass
+    return os.environ.get("ANTHROPIC_API_KEY")
 
-有問題歡迎詢問！"""
 
+@st.cache_resource
+def get_listing_generator(api_key):
+    # セッション間で共有（生成中の商品を再度開いても重複して生成しない）
+    if os.environ.get("LISTING_AI_STUB"):
+        return ListingGenerator(StubClient())
+    if not api_key or not ANTHROPIC_AVAILABLE:
+        return None
+    from listing_ai import AnthropicClient
 
-def generate_hashtags(keyword):
-    base = ["#日本代購", "#日本直送", "#空運直送", "#日本正品"]
-    category = {
-        "日本 零食": ["#日本零食", "#進口零食", "#日本伴手禮"],
-        "日本 泡麵": ["#日本泡麵", "#日本拉麵", "#日本美食"],
-        "日本 調味料": ["#日本調味料", "#料理必備", "#日本廚房"],
-        "日本 咖啡": ["#日本咖啡", "#咖啡控", "#辦公室必備"],
-        "日本 生活用品": ["#日本生活", "#日本雜貨", "#質感生活"],
-        "日本 美容": ["#日本美妝", "#日本保養", "#日本藥妝"],
-    }.get(keyword, ["#日本商品"])
-    return base + category
+    return ListingGenerator(AnthropicClient(api_key))
 
 
 def main():
@@ -314,9 +344,9 @@ def main():
     st.markdown('<p class="main-header">Shopee Taiwan Research</p>', unsafe_allow_html=True)
     st.markdown('<p class="sub-header">台湾市場リサーチ & AI出品支援ツール</p>', unsafe_allow_html=True)
 
-    df = load_data()
+    store = get_store()
 
-    if df.empty:
+    if not store.partitions():
         st.info("データがありません。サイドバーからデータを取得してください。")
         with st.sidebar:
             st.markdown("### Data")
@@ -324,43 +354,63 @@ def main():
             if st.button("Fetch Data", use_container_width=True):
                 with st.spinner("Loading..."):
                     run_scraper(use_sample=(mode == "Sample"))
-                    load_data.clear()
                     st.rerun()
         st.stop()
 
     # サイドバー
     with st.sidebar:
         st.markdown("### Data")
-        if os.path.exists(DATA_FILE):
-            t = datetime.fromtimestamp(os.path.getmtime(DATA_FILE))
+        if os.path.exists(store.manifest_path):
+            t = datetime.fromtimestamp(os.path.getmtime(store.manifest_path))
             st.caption(f"Updated: {t.strftime('%Y-%m-%d %H:%M')}")
 
         mode = st.radio("Mode", ["Sample", "API"], horizontal=True, label_visibility="collapsed")
         if st.button("Refresh", use_container_width=True):
             with st.spinner("Loading..."):
                 run_scraper(use_sample=(mode == "Sample"))
-                load_data.clear()
                 st.rerun()
 
+        # 地域（価格の通貨が異なるため、表示・集計は1地域ずつ）
+        regions = store.regions()
+        if len(regions) > 1:
+            default = regions.index(DEFAULT_REGION) if DEFAULT_REGION in regions else 0
+            region = st.selectbox("Region", regions, index=default, format_func=lambda r: f"{r.upper()} ({get_marketplace(r).currency})")
+        else:
+            region = regions[0]
+        marketplace = get_marketplace(region)
+
         st.markdown("---")
         st.markdown("### Settings")
 
-        ex_rate = st.slider("Exchange Rate", 3.0, 7.0, 4.8, 0.1)
-        fee = st.slider("Fee Rate", 0.0, 0.3, 0.1, 0.01, format="%.0f%%")
-        fixed = st.slider("Fixed Cost (JPY)", 0, 1000, 200, 50)
-        cost_r = st.slider("Cost Rate", 0.0, 1.0, 0.5, 0.05, format="%.0f%%")
+        low_rate, high_rate = marketplace.rate_range()
+        if marketplace.exchange_rate is None:
+            current_rate = min(max(round(get_rate_provider().get(), 1), low_rate), high_rate)
+            ex_rate = st.slider("Exchange Rate", low_rate, high_rate, current_rate, 0.1)
+        else:
+            ex_rate = st.slider(
+                "Exchange Rate", low_rate, high_rate, marketplace.exchange_rate, (high_rate - low_rate) / 100,
+                format="%.4f", key=f"exchange_rate_{region}", help=f"JPY / {marketplace.currency}",
+            )
+        use_model = st.toggle("Use Cost Model", help="カテゴリ別の原価率・送料・手数料（cost_model.json）で計算")
+        fee = st.slider("Fee Rate", 0.0, 0.3, 0.1, 0.01, format="%.0f%%", disabled=use_model)
+        fixed = st.slider("Fixed Cost (JPY)", 0, 1000, 200, 50, disabled=use_model)
+        cost_r = st.slider("Cost Rate", 0.0, 1.0, 0.5, 0.05, format="%.0f%%", disabled=use_model)
 
         st.markdown("---")
         st.markdown("### Filter")
 
-        kws = df["keyword"].unique().tolist()
+        kws = store.keywords(region)
         sel_kw = st.multiselect("Category", kws, kws)
-        min_profit = st.number_input("Min Profit (JPY)", -1000, 5000, 0, 100)
+        # 未入力（既定）は利益で絞り込まない（カテゴリ別の集計をパーティションの集計値から計算できる）
+        min_profit = st.number_input("Min Profit (JPY)", -1000, 5000, None, 100, placeholder="No minimum")
         min_sales = st.number_input("Min Sales", 0, 10000, 0, 100)
 
-    # データ処理
-    df = recalculate_profit(df, ex_rate, fee, fixed, cost_r)
-    fdf = df[(df["keyword"].isin(sel_kw)) & (df["profit"] >= min_profit) & (df["sales"] >= min_sales)]
+    # データ処理（条件はストアに渡して読み込み前に絞り込む）
+    params = ProfitParams(ex_rate, fee, fixed, cost_r)
+    fdf = load_filtered(tuple(sel_kw), min_profit, min_sales, params, use_model, store.version(), region)
+    # お宝商品・感度分析の利益の閾値（未入力は 0 円）
+    profit_floor = min_profit if min_profit is not None else 0
+    t_index = get_treasure_index(tuple(sel_kw), params, use_model, store.version(), region)
 
     # メトリクス
     cols = st.columns(4)
@@ -368,7 +418,7 @@ def main():
         ("Products", f"{len(fdf):,}"),
         ("Avg Profit", f"¥{fdf['profit'].mean():,.0f}" if not fdf.empty else "¥0"),
         ("Avg Sales", f"{fdf['sales'].mean():,.0f}" if not fdf.empty else "0"),
-        ("Treasure", f"{len(fdf[(fdf['profit']>=500)&(fdf['sales']>=100)]):,}"),
+        ("Treasure", f"{t_index.count(max(500, profit_floor), max(100, min_sales), 0) if t_index else 0:,}"),
     ]
     for col, (label, value) in zip(cols, metrics):
         col.metric(label, value)
@@ -379,15 +429,48 @@ def main():
     with tab1:
         st.markdown('<p class="section-title">Category Analysis</p>', unsafe_allow_html=True)
 
+        summary = load_category_summary(tuple(sel_kw), min_profit, min_sales, params, use_model, store.version(), region)
+        if summary is None:
+            summary = frame_category_summary(fdf, "profit") if not fdf.empty else pd.DataFrame()
         c1, c2 = st.columns(2)
         with c1:
-            if not fdf.empty:
-                sales_data = fdf.groupby("keyword")["sales"].sum().sort_values()
-                st.bar_chart(sales_data, color="#1a1a2e")
+            if not summary.empty:
+                st.bar_chart(summary["sales"].rename("sales").sort_values(), color="#1a1a2e")
         with c2:
-            if not fdf.empty:
-                profit_data = fdf.groupby("keyword")["profit"].mean().sort_values()
-                st.bar_chart(profit_data, color="#059669")
+            if not summary.empty:
+                st.bar_chart(summary["mean_profit"].rename("profit").sort_values(), color="#059669")
+
+        st.markdown('<p class="section-title">Distribution (p10 / p50 / p90)</p>', unsafe_allow_html=True)
+
+        sketches = load_sketches(tuple(sel_kw), min_profit, min_sales, params, use_model, store.version(), region)
+        if sketches is None:
+            sketches = frame_sketches(fdf) if not fdf.empty else {}
+        if sketches:
+            if use_model:
+                model = load_cost_model()
+                profit_params = {kw: model.keyword_params(kw, ex_rate) for kw in sketches}
+            else:
+                profit_params = params
+            quantiles = category_quantiles(sketches, profit_params).rename_axis("keyword").reset_index()
+            c1, c2 = st.columns([3, 2])
+            with c1:
+                shown = {col: spec for col, spec in QUANTILE_COLUMNS.items() if col in quantiles.columns}
+                st.dataframe(
+                    quantiles[list(shown)],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config=column_config(shown, marketplace.currency, marketplace.price_digits),
+                )
+            with c2:
+                price_sketch = QuantileSketch.merge_all(columns["price"] for columns in sketches.values())
+                st.bar_chart(price_sketch.histogram().rename("Products"), color="#1a1a2e")
+
+        st.markdown('<p class="section-title">Treasure Sensitivity</p>', unsafe_allow_html=True)
+
+        if t_index is not None:
+            thresholds = np.arange(0, 3001, 50)
+            counts = t_index.sweep(np.maximum(thresholds, profit_floor), max(100, min_sales), 0)
+            st.line_chart(pd.Series(counts, index=thresholds, name="Treasure"), color="#1a1a2e")
 
     with tab2:
         st.markdown('<p class="section-title">Product Rankings</p>', unsafe_allow_html=True)
@@ -404,21 +487,51 @@ def main():
             n = st.selectbox("Show", [10, 20, 50], label_visibility="collapsed")
 
         if not fdf.empty:
-            show_df = fdf.sort_values(sort_opt[1], ascending=False).head(n)
-            display = show_df[["keyword", "name", "price", "sales", "profit"]].copy()
-            display.columns = ["Category", "Product", "Price (TWD)", "Sales", "Profit (JPY)"]
-            display["Price (TWD)"] = display["Price (TWD)"].apply(lambda x: f"NT${x:,.0f}")
-            display["Profit (JPY)"] = display["Profit (JPY)"].apply(lambda x: f"¥{x:,.0f}")
-            display["Sales"] = display["Sales"].apply(lambda x: f"{x:,}")
-            st.dataframe(display, use_container_width=True, hide_index=True)
+            show_df = visible_page(fdf, sort_opt[1], n)
+            display = show_df[list(RANKING_COLUMNS)]
+            st.dataframe(
+                display,
+                use_container_width=True,
+                hide_index=True,
+                column_config=column_config(RANKING_COLUMNS, marketplace.currency, marketplace.price_digits),
+            )
 
     with tab3:
         st.markdown('<p class="section-title">AI Listing Assistant</p>', unsafe_allow_html=True)
 
+        generator = get_listing_generator(get_api_key())
+
+        if generator is not None and t_index is not None:
+            treasure = t_index.select(max(500, profit_floor), max(100, min_sales), 0)
+            c1, c2 = st.columns([2, 1])
+            use_batch = c2.checkbox("Batch API", help="Message Batches API でまとめて送信（結果まで時間がかかります）")
+            if c1.button(f"Generate listings for {len(treasure):,} treasure products", use_container_width=True):
+                with st.spinner("Generating..."):
+                    listings = generator.generate_all(treasure.to_dict("records"), use_batch=use_batch)
+                st.success(f"{len(listings):,} / {len(treasure):,} listings ready")
+
         if fdf.empty:
             st.warning("No products available")
         else:
-            options = fdf.apply(lambda x: f"{x['name'][:40]}... (NT${x['price']:,.0f})", axis=1).tolist()
+            filters = (tuple(sel_kw), min_profit, min_sales, params, use_model, store.version(), region)
+            st.download_button(
+                f"Download template listings ({len(fdf):,} products)",
+                lambda: build_listings(*filters),
+                f"listings_{datetime.now().strftime('%Y%m%d')}.jsonl",
+                use_container_width=True,
+            )
+
+            # セラーセンター向け一括出品ファイル
+            with st.expander("Seller Center Export"):
+                export_rate = st.slider("Export Premium Rate", 0.05, 0.15, 0.08, 0.01, format="%.0f%%")
+                export_fmt = st.radio("Format", ["csv", "xlsx"] if OPENPYXL_AVAILABLE else ["csv"], horizontal=True)
+                st.download_button(
+                    f"Download seller upload ({len(fdf):,} products)",
+                    lambda: build_seller_export(*filters, export_rate, export_fmt),
+                    f"seller_upload_{datetime.now().strftime('%Y%m%d')}.{export_fmt}",
+                    use_container_width=True,
+                )
+            options = [f"{name[:40]}... ({marketplace.format_price(price)})" for name, price in zip(fdf["name"], fdf["price"])]
             idx = st.selectbox("Select Product", range(len(options)), format_func=lambda x: options[x])
             product = fdf.iloc[idx].to_dict()
 
@@ -430,37 +543,93 @@ def main():
             with col1:
                 st.markdown("**Pricing Analysis**")
                 prem_rate = st.slider("Premium Rate", 0.05, 0.15, 0.08, 0.01, format="%.0f%%")
-                prices = calculate_premium_price(product["price"], df, product["keyword"], prem_rate)
+                kw_df = load_keyword(product["keyword"], store.version(), region)
+                prices = calculate_premium_price(product["price"], kw_df, product["keyword"], prem_rate)
 
                 st.markdown(f"""
                 <div class="price-highlight">
                     <div class="label">RECOMMENDED PRICE</div>
-                    <div class="value">NT${prices['premium']:,.0f}</div>
+                    <div class="value">{marketplace.format_price(prices['premium'])}</div>
                 </div>
                 """, unsafe_allow_html=True)
 
                 m1, m2 = st.columns(2)
-                m1.metric("Min Price", f"NT${prices['min']:,.0f}")
-                m2.metric("Avg Price", f"NT${prices['avg']:,.0f}")
+                m1.metric("Min Price", marketplace.format_price(prices['min']))
+                m2.metric("Avg Price", marketplace.format_price(prices['avg']))
 
             with col2:
                 st.markdown("**Profit Simulation**")
 
-                curr = product["price"] * ex_rate * (1-fee) - product["price"] * ex_rate * cost_r - fixed
-                prem = prices['premium'] * ex_rate * (1-fee) - prices['premium'] * ex_rate * cost_r - fixed
+                if use_model:
+                    model = load_cost_model()
+                    curr_params = model.params_for(product["keyword"], product["name"], product["price"], ex_rate)
+                    prem_params = model.params_for(product["keyword"], product["name"], prices["premium"], ex_rate)
+                else:
+                    curr_params = prem_params = params
+                curr = calculate_profit(product["price"], curr_params)["profit"]
+                prem = calculate_profit(prices["premium"], prem_params)["profit"]
 
                 m1, m2 = st.columns(2)
                 m1.metric("Current", f"¥{curr:,.0f}")
                 m2.metric("Premium", f"¥{prem:,.0f}", delta=f"+¥{prem-curr:,.0f}")
 
+            with st.expander("Sensitivity: Exchange Rate × Fee × Cost Rate"):
+                grid = load_sensitivity(tuple(sel_kw), profit_floor, min_sales, fixed, store.version(), region)
+                c1, c2 = st.columns(2)
+                metric = c1.radio(
+                    "Metric",
+                    ["mean_profit", "profitable_share"],
+                    format_func=lambda m: "Avg Profit (JPY)" if m == "mean_profit" else f"Share with Profit ≥ ¥{profit_floor:,}",
+                    horizontal=True,
+                )
+                cost_rate = c2.select_slider(
+                    "Cost Rate",
+                    options=[round(c, 2) for c in grid.cost_rates],
+                    value=round(grid.cost_rates[np.abs(grid.cost_rates - cost_r).argmin()], 2),
+                    format_func=lambda c: f"{c:.0%}",
+                )
+                cells = grid.frame(metric, int(np.abs(grid.cost_rates - cost_rate).argmin()))
+                rate_step = grid.exchange_rates[1] - grid.exchange_rates[0]
+                fee_step = grid.fee_rates[1] - grid.fee_rates[0]
+                cells = cells.assign(
+                    rate_end=cells["exchange_rate"] + rate_step,
+                    fee_end=cells["fee_rate"] + fee_step,
+                )
+                heatmap = alt.Chart(cells).mark_rect().encode(
+                    x=alt.X("exchange_rate:Q", title=f"Exchange Rate (JPY/{marketplace.currency})", scale=alt.Scale(zero=False)),
+                    x2="rate_end",
+                    y=alt.Y("fee_rate:Q", title="Fee Rate", axis=alt.Axis(format="%")),
+                    y2="fee_end",
+                    color=alt.Color(
+                        f"{metric}:Q",
+                        title=None,
+                        scale=alt.Scale(scheme="redyellowgreen", domainMid=0 if metric == "mean_profit" else 0.5),
+                    ),
+                    tooltip=[
+                        alt.Tooltip("exchange_rate:Q", format=".4g"),
+                        alt.Tooltip("fee_rate:Q", format=".1%"),
+                        alt.Tooltip(f"{metric}:Q", format=",.0f" if metric == "mean_profit" else ".1%"),
+                    ],
+                )
+                st.altair_chart(heatmap, use_container_width=True)
+                st.caption(
+                    f"{grid.total:,} products (category / sales filters) · fixed cost ¥{fixed:,}"
+                    + (" · grid uses uniform rates, not the cost model" if use_model else "")
+                )
+
             st.markdown("---")
 
-            # 説明文とハッシュタグ
+            # 説明文とハッシュタグ（AI 生成済みならキャッシュを表示）
+            listing = generator.cached(product) if generator is not None else None
+            if generator is not None and listing is None:
+                if st.button("Generate with AI", use_container_width=True):
+                    with st.spinner("Generating..."):
+                        listing = generator.get(product)
             col1, col2 = st.columns([2, 1])
 
             with col1:
                 st.markdown("**Product Description (Traditional Chinese)**")
-                desc = generate_description(product)
+                desc = listing["description"] if listing else generate_description(product)
                 st.text_area("", desc, height=350, label_visibility="collapsed")
                 st.download_button(
                     "Download",
@@ -471,7 +640,7 @@ def main():
 
             with col2:
                 st.markdown("**Hashtags**")
-                tags = generate_hashtags(product["keyword"])
+                tags = listing["hashtags"] if listing else generate_hashtags(product["keyword"])
                 for tag in tags:
                     st.markdown(f'<span class="tag">{tag}</span>', unsafe_allow_html=True)
                 st.text_area("Copy", " ".join(tags), height=100, label_visibility="collapsed")
@@ -0,0 +1,363 @@
+"""パフォーマンス計測スクリプト
+
+使い方:
+    python benchmark.py                               # すべて実行
+    python benchmark.py formatting                    # 指定したベンチマークのみ
+    python benchmark.py analytics --update-baseline   # 分析関数のベースラインを更新
+
+予算を超えたベンチマーク・ベースラインから悪化したベンチマークがあれば終了コード 1 を返す。
+分析関数（analytics）は処理時間とピークメモリ（tracemalloc）を benchmark_baseline.json と比較し、
+行数 10^5 → 10^6 の増加の傾き（log-log）が想定の計算量を超えていないかも確認する。
+ベースラインは計測するマシンで更新すること。
+同じチェックは pytest でも実行される（tests/test_benchmark.py）。既定の実行は処理時間の絶対値を比較せず、
+10^4 → 10^5 行の増加の傾きとピークメモリのみを確認する。処理時間の比較は slow マーク（pytest -m slow）。
+"""
+
+import argparse
+import ast
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from config import SEARCH_KEYWORDS
+
+# 計測する総行数
+ROW_COUNTS = [1_000, 100_000, 1_000_000]
+
+# 分析関数のベースライン（処理時間・ピークメモリ）と許容する悪化の割合
+BASELINE_FILE = "benchmark_baseline.json"
+TIME_TOLERANCE = 0.5
+MEMORY_TOLERANCE = 0.2
+# 誤差とみなす差（これ未満の悪化は無視する。数ms のケースはスケジューラの揺らぎで倍になることがある）
+MIN_REGRESSION_MS = 10.0
+MIN_REGRESSION_MB = 1.0
+# 増加の傾きの許容幅（想定の指数 + この値まで。大きな配列の確保はキャッシュ・ページフォルトで1次より少し重くなる）
+SCALING_SLACK = 0.4
+
+# ダッシュボードのスクリプト（起動時の import は実行せずにファイルから抽出する）
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+
+def _top_level_imports(path: str) -> str:
+    """スクリプトの最上位の import をまとめた import 文（スクリプト自体は実行しない）"""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            modules.append(node.module)
+    return "import " + ", ".join(dict.fromkeys(modules))
+
+
+# 起動時の import 予算（対象: (import文, 予算ms, 読み込まれてはいけないパッケージ)）
+# ダッシュボードは app.py が起動時に読み込むもの（streamlit・altair を含む。タブの中身も初回の表示で実行される）
+STARTUP_BUDGETS = {
+    "cli": ("import main", 1500, {"matplotlib", "requests", "anthropic"}),
+    "scraper": ("import scraper", 1000, {"matplotlib", "requests", "anthropic"}),
+    "dashboard": (_top_level_imports(APP_FILE), 2000, {"matplotlib", "requests", "anthropic"}),
+}
+
+
+def _synthetic_df(n: int, seed: int = 0) -> pd.DataFrame:
+    """計測用のデータを作成（サンプルデータの分布から合成。利益計算済み）"""
+    from profit import with_profit
+    from synthetic import synthetic_df
+
+    return with_profit(synthetic_df(n, len(SEARCH_KEYWORDS), seed))
+
+
+def _timeit(func, repeat: int = 5) -> float:
+    """最良実行時間（ミリ秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench_formatting() -> None:
+    """ランキング表: ページ抽出と表示整形のコスト（整形は総行数に依存しない）"""
+    from formatting import FORMATS, RANKING_COLUMNS, format_column, visible_page
+
+    page_size = 50
+    print(f"{'rows':>10} {'select(ms)':>12} {'format(ms)':>12}")
+    for n in ROW_COUNTS:
+        df = _synthetic_df(n)
+        page = visible_page(df, "profit", page_size)
+
+        def format_page():
+            for col, (_, kind) in RANKING_COLUMNS.items():
+                if kind is not None:
+                    format_column(page[col], FORMATS[kind][1])
+
+        select_ms = _timeit(lambda: visible_page(df, "profit", page_size))
+        format_ms = _timeit(format_page)
+        print(f"{n:>10,} {select_ms:>12.2f} {format_ms:>12.2f}")
+
+
+def bench_treasure_index() -> None:
+    """お宝商品インデックス: 構築・閾値クエリ・閾値スイープのコスト"""
+    from treasure_index import TreasureIndex
+
+    thresholds = np.arange(0, 3001, 10)
+    print(f"{'rows':>10} {'build(ms)':>12} {'query(ms)':>12} {'sweep(ms)':>12}")
+    for n in ROW_COUNTS:
+        df = _synthetic_df(n)
+        build_ms = _timeit(lambda: TreasureIndex(df, profit_col="profit").count(), repeat=3)
+        index = TreasureIndex(df, profit_col="profit")
+        index.count()
+        query_ms = _timeit(lambda: index.count(800, 100, 4.5))
+        sweep_ms = _timeit(lambda: index.sweep(thresholds))
+        print(f"{n:>10,} {build_ms:>12.2f} {query_ms:>12.4f} {sweep_ms:>12.4f}")
+
+
+def _api_items(n: int, seed: int = 0) -> list[dict]:
+    """検索APIの応答と同じ形の商品（一部は代替キー・入れ子の評価・不正な値）"""
+    df = _synthetic_df(n, seed)
+    items = []
+    for i, row in enumerate(df[["name", "price", "sales", "shop_rating"]].itertuples(index=False)):
+        basic = {"name": row.name, "price": int(row.price * 100000), "sold": row.sales, "shop_rating": row.shop_rating}
+        if i % 10 == 1:
+            basic["price"], basic["price_min"] = 0, int(row.price * 100000)
+        if i % 10 == 2:
+            basic["sold"], basic["historical_sold"] = 0, row.sales
+        if i % 10 == 3:
+            basic["shop_rating"], basic["item_rating"] = 0, {"rating_star": row.shop_rating}
+        if i % 100 == 4:
+            basic["price"] = "N/A"
+        items.append({"item_basic": basic} if i % 2 else basic)
+    return items
+
+
+def bench_item_schema() -> None:
+    """商品データの正規化: 1ページ（API応答）の検証・変換と利益計算のコスト"""
+    from cost_model import load_cost_model
+    from item_schema import parse_items
+
+    print(f"{'items':>10} {'parse(ms)':>12} {'profit(ms)':>12}")
+    for n in [100, 1_000, 10_000]:
+        items = _api_items(n)
+        df = parse_items(items).frame.assign(keyword=SEARCH_KEYWORDS[0])
+        parse_ms = _timeit(lambda: parse_items(items))
+        profit_ms = _timeit(lambda: load_cost_model().stored_columns(df, 4.7))
+        print(f"{n:>10,} {parse_ms:>12.2f} {profit_ms:>12.2f}")
+
+
+def _html_report_case(df: pd.DataFrame):
+    """HTMLレポート: ランキング・お宝商品は事前に作成し、レポートの作成だけを計測"""
+    from analytics import top_profit
+    from main import create_html_report
+    from treasure_index import TreasureIndex
+
+    ranking = top_profit(df, 15)
+    treasure = TreasureIndex.from_latest(df).select(500, 100, 4.5)
+    return lambda: create_html_report(df, ranking, treasure, "summary_report.html")
+
+
+def _analytics_cases() -> dict:
+    """{名前: (df から計測する関数を作る関数, 想定する増加の指数)}
+
+    ダッシュボードの利益の再計算は profit.with_profit のため with_profit を計測する。
+    """
+    from main import analyze_results, find_treasure_products, show_profit_ranking
+    from profit import ProfitParams, with_profit
+
+    params = ProfitParams(4.5, 0.12, 250, 0.45)
+    return {
+        "analyze_results": (lambda df: lambda: analyze_results(df), 1.0),
+        "show_profit_ranking": (lambda df: lambda: show_profit_ranking(df, 15), 1.0),
+        "find_treasure_products": (lambda df: lambda: find_treasure_products(df, 500, 100, 4.5), 1.0),
+        "create_html_report": (_html_report_case, 1.0),
+        "with_profit": (lambda df: lambda: with_profit(df, params), 1.0),
+    }
+
+
+def _peak_mb(func) -> float:
+    """1回実行したときのピークメモリ（MB）"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def _regressions(name: str, results: dict, baseline: dict, tolerance: float, compare_time: bool) -> list[str]:
+    """ベースラインからの悪化（compare_time=False はピークメモリのみ）"""
+    failures = []
+    for rows, result in results.items():
+        base = baseline.get(rows)
+        if base is None:
+            continue
+        if (compare_time and result["ms"] > base["ms"] * (1 + tolerance)
+                and result["ms"] - base["ms"] > MIN_REGRESSION_MS):
+            failures.append(f"analytics/{name}@{rows}: {result['ms']:.1f}ms > ベースライン {base['ms']:.1f}ms (+{tolerance:.0%})")
+        if (result["peak_mb"] > base["peak_mb"] * (1 + MEMORY_TOLERANCE)
+                and result["peak_mb"] - base["peak_mb"] > MIN_REGRESSION_MB):
+            failures.append(f"analytics/{name}@{rows}: {result['peak_mb']:.1f}MB > ベースライン {base['peak_mb']:.1f}MB (+{MEMORY_TOLERANCE:.0%})")
+    return failures
+
+
+def _scaling(results: dict, row_counts: list[int]) -> tuple[float, float] | None:
+    """計測した最後の2つの行数（既定は 10^5 → 10^6）の (処理時間, ピークメモリ) の log-log の傾き"""
+    if len(row_counts) < 2:
+        return None
+    small, large = results.get(str(row_counts[-2])), results.get(str(row_counts[-1]))
+    if small is None or large is None:
+        return None
+    ratio = math.log(row_counts[-1] / row_counts[-2])
+    # 誤差の範囲の処理時間は MIN_REGRESSION_MS に切り上げる（数ms 同士の比はスケジューラの揺らぎで大きく変わる）
+    floors = {"ms": MIN_REGRESSION_MS, "peak_mb": 1e-9}
+    return tuple(
+        math.log(max(large[key], floor) / max(small[key], floor)) / ratio
+        for key, floor in floors.items()
+    )
+
+
+def bench_analytics(
+    update_baseline: bool = False,
+    tolerance: float = TIME_TOLERANCE,
+    row_counts: list[int] = ROW_COUNTS,
+    compare_time: bool = True,
+) -> list[str]:
+    """分析関数: 処理時間・ピークメモリのベースライン比較と計算量（増加の傾き）のチェック
+
+    Args:
+        update_baseline: True=計測結果をベースラインとして保存
+        tolerance: 処理時間の許容する悪化の割合
+        row_counts: 計測する総行数（増加の傾きは最後の2つで計算）
+        compare_time: False=処理時間はベースラインと比較しない（別のマシンでも結果が変わらないチェックのみ）
+
+    Returns:
+        list[str]: 予算超過・性能の悪化
+    """
+    cases = _analytics_cases()
+    results: dict[str, dict] = {name: {} for name in cases}
+    print(f"{'function':<24} {'rows':>10} {'time(ms)':>10} {'peak(MB)':>10}")
+
+    # レポートのファイルは一時ディレクトリに書き出す
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for n in row_counts:
+                df = _synthetic_df(n)
+                for name, (make, _) in cases.items():
+                    func = make(df)
+                    ms = _timeit(func, repeat=3 if n >= 1_000_000 else 5)
+                    peak_mb = _peak_mb(func)
+                    results[name][str(n)] = {"ms": round(ms, 2), "peak_mb": round(peak_mb, 2)}
+                    print(f"{name:<24} {n:>10,} {ms:>10.2f} {peak_mb:>10.2f}")
+        finally:
+            os.chdir(cwd)
+
+    failures = []
+    print(f"\n{'function':<24} {'time slope':>10} {'mem slope':>10} {'expected':>10}")
+    for name, (_, exponent) in cases.items():
+        slopes = _scaling(results[name], row_counts)
+        if slopes is None:
+            continue
+        print(f"{name:<24} {slopes[0]:>10.2f} {slopes[1]:>10.2f} {exponent:>10.2f}")
+        for label, slope in zip(("処理時間", "ピークメモリ"), slopes):
+            if slope > exponent + SCALING_SLACK:
+                failures.append(f"analytics/{name}: {label}の増加の傾き {slope:.2f} > 想定 {exponent:.2f}")
+
+    if update_baseline:
+        with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+            f.write("\n")
+        print(f"\n✅ ベースラインを {BASELINE_FILE} に保存しました")
+    elif os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for name, result in results.items():
+            failures += _regressions(name, result, baseline.get(name, {}), tolerance, compare_time)
+    else:
+        print(f"\n⚠️ {BASELINE_FILE} がありません（--update-baseline で作成）")
+    return failures
+
+
+def _import_profile(statement: str) -> tuple[float, set[str]]:
+    """-X importtime で import 文を実行し、(合計ms, 読み込まれたトップレベルパッケージ) を返す"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True, text=True, check=True,
+    )
+    total_us = 0
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        packages.add(name.strip().split(".")[0])
+        # インデントなし = トップレベルの import
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, packages
+
+
+def bench_startup() -> list[str]:
+    """起動時間: -X importtime による import コストと予算チェック"""
+    failures = []
+    print(f"{'target':<12} {'import(ms)':>12} {'budget(ms)':>12}  unexpected")
+    for target, (statement, budget_ms, forbidden) in STARTUP_BUDGETS.items():
+        elapsed_ms = min(_import_profile(statement)[0] for _ in range(3))
+        unexpected = sorted(_import_profile(statement)[1] & forbidden)
+        print(f"{target:<12} {elapsed_ms:>12.1f} {budget_ms:>12,}  {', '.join(unexpected) or '-'}")
+        if elapsed_ms > budget_ms:
+            failures.append(f"startup/{target}: {elapsed_ms:.0f}ms > {budget_ms}ms")
+        if unexpected:
+            failures.append(f"startup/{target}: 不要なパッケージを読み込み ({', '.join(unexpected)})")
+    return failures
+
+
+BENCHMARKS = {
+    "formatting": bench_formatting,
+    "treasure_index": bench_treasure_index,
+    "item_schema": bench_item_schema,
+    "analytics": bench_analytics,
+    "startup": bench_startup,
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="パフォーマンス計測")
+    parser.add_argument("names", nargs="*", help=f"実行するベンチマーク（{', '.join(BENCHMARKS)}。省略時はすべて）")
+    parser.add_argument("--update-baseline", action="store_true", help=f"分析関数の計測結果を {BASELINE_FILE} に保存")
+    parser.add_argument("--tolerance", type=float, default=TIME_TOLERANCE, help="処理時間の許容する悪化の割合（0.5 = +50%%）")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for name in args.names or list(BENCHMARKS):
+        if name not in BENCHMARKS:
+            print(f"❌ 不明なベンチマーク: {name}（{', '.join(BENCHMARKS)}）")
+            sys.exit(1)
+        print(f"\n⏱️  {name}: {BENCHMARKS[name].__doc__}")
+        if name == "analytics":
+            failures += bench_analytics(args.update_baseline, args.tolerance)
+        else:
+            failures += BENCHMARKS[name]() or []
+
+    if failures:
+        print("\n❌ 予算超過・性能の悪化:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,61 @@
-"""Shopee Taiwan スクレイピング設定"""
+"""Shopee Taiwan スクレイピング設定（他の地域は MARKETPLACES）"""
+
+# マーケットプレイス（地域）別の設定（marketplace.py で読み込む）
+# - exchange_rate: 1現地通貨あたりの円（None=為替レートの取得元を使う。台湾のみ）
+# - queries: 検索キーワード（SEARCH_KEYWORDS）の現地での検索語（ない場合はそのまま検索）
+# - requests_per_minute: 地域ごとのリクエスト数の上限（並列スイープ時）
+_EN_QUERIES = {
+    "日本 零食": "japan snack",
+    "日本 泡麵": "japan instant noodles",
+    "日本 調味料": "japan seasoning",
+    "日本 咖啡": "japan coffee",
+    "日本 生活用品": "japan daily necessities",
+    "日本 美容": "japan beauty",
+}
+MARKETPLACES = {
+    "tw": {
+        "base_url": "https://shopee.tw", "currency": "TWD", "exchange_rate": None, "price_digits": 0,
+        "locale": "zh-TW", "language": "zh-Hant", "accept_language": "zh-TW,zh;q=0.9,en;q=0.8",
+        "timezone_id": "Asia/Taipei", "geolocation": {"latitude": 25.0330, "longitude": 121.5654},  # 台北
+    },
+    "my": {
+        "base_url": "https://shopee.com.my", "currency": "MYR", "exchange_rate": 34.0, "price_digits": 2,
+        "locale": "en-MY", "language": "en", "accept_language": "en-MY,en;q=0.9,ms;q=0.8",
+        "timezone_id": "Asia/Kuala_Lumpur", "geolocation": {"latitude": 3.1390, "longitude": 101.6869},  # クアラルンプール
+        "queries": _EN_QUERIES,
+    },
+    "sg": {
+        "base_url": "https://shopee.sg", "currency": "SGD", "exchange_rate": 113.0, "price_digits": 2,
+        "locale": "en-SG", "language": "en", "accept_language": "en-SG,en;q=0.9",
+        "timezone_id": "Asia/Singapore", "geolocation": {"latitude": 1.3521, "longitude": 103.8198},  # シンガポール
+        "queries": _EN_QUERIES,
+    },
+    "th": {
+        "base_url": "https://shopee.co.th", "currency": "THB", "exchange_rate": 4.4, "price_digits": 0,
+        "locale": "th-TH", "language": "th", "accept_language": "th-TH,th;q=0.9,en;q=0.8",
+        "timezone_id": "Asia/Bangkok", "geolocation": {"latitude": 13.7563, "longitude": 100.5018},  # バンコク
+        "queries": _EN_QUERIES,
+    },
+    "ph": {
+        "base_url": "https://shopee.ph", "currency": "PHP", "exchange_rate": 2.6, "price_digits": 2,
+        "locale": "en-PH", "language": "en", "accept_language": "en-PH,en;q=0.9,fil;q=0.8",
+        "timezone_id": "Asia/Manila", "geolocation": {"latitude": 14.5995, "longitude": 120.9842},  # マニラ
+        "queries": _EN_QUERIES,
+    },
+    "vn": {
+        "base_url": "https://shopee.vn", "currency": "VND", "exchange_rate": 0.0058, "price_digits": 0,
+        "locale": "vi-VN", "language": "vi", "accept_language": "vi-VN,vi;q=0.9,en;q=0.8",
+        "timezone_id": "Asia/Ho_Chi_Minh", "geolocation": {"latitude": 10.8231, "longitude": 106.6297},  # ホーチミン
+        "queries": _EN_QUERIES,
+    },
+}
+DEFAULT_REGION = "tw"
+PRICE_DIVISOR = 100000             # API の価格の単位（1現地通貨 = 100000）
+REQUESTS_PER_MINUTE = 10           # 地域ごとのリクエスト数の上限（既定値）
+REGION_SESSIONS = 2                # 並列スイープ時の地域ごとのセッション数
 
 # Base URL
-BASE_URL = "https://shopee.tw"
+BASE_URL = MARKETPLACES[DEFAULT_REGION]["base_url"]
 
 # 検索キーワードリスト（食品ジャンルを細分化）
 SEARCH_KEYWORDS = [
@@ -18,18 +72,37 @@ EXCHANGE_RATE = 4.8        # 1 TWD = 4.8 JPY
 SALES_FEE_RATE = 0.10      # 販売手数料 10%
 FIXED_COST_JPY = 200       # 固定コスト（送料・梱包）200円
 COST_RATE = 0.50           # 仮の原価率（販売価格の50%）
+COST_MODEL_FILE = "cost_model.json"  # カテゴリ別のコストモデル（なければ上の定数を使用）
+
+# 為替レートの取得元（RATE_URL > RATE_FILE > EXCHANGE_RATE の順に使用）
+RATE_FILE = "exchange_rate.json"   # {"rate": 4.8} または数値のみ
+RATE_URL = None                    # ローカルのレート配信サービス（例: "http://127.0.0.1:8800/rate"）
+RATE_TTL = 3600                    # 取得したレートのキャッシュ時間（秒）
 
 # 各キーワードで取得する商品数
 PRODUCTS_PER_KEYWORD = 30
 
+# 店舗情報（商品に販売店の規模・評価を付与）
+SHOP_TTL = 7 * 24 * 3600   # 取得した店舗情報のキャッシュ期間（秒）
+SHOP_BATCH_SIZE = 20       # 1バッチで取得する店舗数
+SHOP_MAX_WORKERS = 4       # 同時リクエスト数
+
 # 出力ファイル
 OUTPUT_FILE = "research_results.csv"
 
-# ブラウザ設定（台湾ユーザーとして）
+# スナップショット保存先（パーティション + マニフェスト）
+STORE_DIR = "research_store"
+
+# AI 出品文生成
+AI_MODEL = "claude-3-5-haiku-latest"
+AI_MAX_WORKERS = 4                 # 同時リクエスト数
+LISTING_CACHE_DIR = "listing_cache"  # 生成結果のキャッシュ
+
+# ブラウザ設定（台湾ユーザーとして。他の地域は Marketplace.browser_config）
 BROWSER_CONFIG = {
-    "locale": "zh-TW",
-    "timezone_id": "Asia/Taipei",
-    "geolocation": {"latitude": 25.0330, "longitude": 121.5654},  # 台北
+    "locale": MARKETPLACES[DEFAULT_REGION]["locale"],
+    "timezone_id": MARKETPLACES[DEFAULT_REGION]["timezone_id"],
+    "geolocation": MARKETPLACES[DEFAULT_REGION]["geolocation"],
     "permissions": ["geolocation"],
 }
 
@@ -0,0 +1,276 @@
+"""カテゴリ別のコストモデル（原価率・送料・手数料）
+
+cost_model.json（COST_MODEL_FILE）の例:
+    {
+      "default_cost_rate": 0.5,
+      "keyword_cost_rates": {"日本 零食": 0.45, "日本 美容": 0.6},
+      "brand_cost_rates": {"ROYCE": 0.65, "SHISEIDO": 0.7},
+      "keyword_weights": {"日本 零食": 250, "日本 調味料": 600},
+      "default_weight": 300,
+      "shipping_tiers": [[250, 150], [500, 220], [1000, 350], [null, 600]],
+      "packing_cost": 30,
+      "fee_schedule": [[0, 0.10], [1000, 0.08]]
+    }
+
+- 原価率: ブランド（商品名に含まれる）> キーワード > 既定値 の順に適用
+- 送料: 商品名の重量・容量（120g, 1.5kg, 200ml など）、なければキーワード別の既定重量で段階表を引く
+  段階表が空なら FIXED_COST_JPY を固定コストとする
+- 手数料率: 価格（TWD）が閾値以上の段階のうち最後のもの
+
+ファイルがなければ config の定数（COST_RATE / SALES_FEE_RATE / FIXED_COST_JPY）と同じ結果になる。
+一括計算はキーワードをカテゴリ型にしてカテゴリごとの値を引き、ブランド・重量は重複を除いた商品名ごとに
+判定してから行に展開する。
+
+使い方:
+    python cost_model.py --init    # 現在の設定と同じ内容の cost_model.json を作成
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from config import COST_MODEL_FILE, COST_RATE, FIXED_COST_JPY, SALES_FEE_RATE, SEARCH_KEYWORDS
+from log import get_logger, setup_logging
+from profit import ProfitParams
+
+logger = get_logger("cost_model")
+
+_WEIGHT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(kg|g|ml|l)(?![a-z])", re.IGNORECASE)
+_WEIGHT_UNITS = {"kg": 1000.0, "g": 1.0, "l": 1000.0, "ml": 1.0}
+
+
+def parse_weight(name: str) -> float | None:
+    """商品名から重量・容量（g / ml）を取り出す"""
+    match = _WEIGHT_PATTERN.search(name)
+    if match is None:
+        return None
+    return float(match.group(1)) * _WEIGHT_UNITS[match.group(2).lower()]
+
+
+def _take(values: np.ndarray, codes: np.ndarray, default: float) -> np.ndarray:
+    """カテゴリのコードに対応する値（コード -1 = キーワード・商品名の欠損は default）"""
+    taken = np.full(len(codes), default, dtype=float)
+    valid = codes >= 0
+    taken[valid] = values[codes[valid]]
+    return taken
+
+
+@dataclass(frozen=True)
+class CostModel:
+    """コストモデル（変更不可。version は内容のハッシュ）"""
+
+    default_cost_rate: float = COST_RATE
+    keyword_cost_rates: dict = field(default_factory=dict)
+    brand_cost_rates: dict = field(default_factory=dict)
+    keyword_weights: dict = field(default_factory=dict)
+    default_weight: float = 300.0
+    shipping_tiers: list = field(default_factory=list)   # [[上限重量(g) または null, 送料(円)], ...]
+    packing_cost: float = 0.0
+    fee_schedule: list = field(default_factory=lambda: [[0, SALES_FEE_RATE]])  # [[価格(TWD)以上, 手数料率], ...]
+
+    @classmethod
+    def from_file(cls, path: str = COST_MODEL_FILE) -> "CostModel":
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def to_file(self, path: str = COST_MODEL_FILE) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, ensure_ascii=False, indent=1)
+
+    def __hash__(self) -> int:
+        return hash(self.version)
+
+    @cached_property
+    def version(self) -> str:
+        """内容のハッシュ（キャッシュキー用）"""
+        data = json.dumps(asdict(self), ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()[:12]
+
+    @cached_property
+    def _brand_pattern(self) -> re.Pattern | None:
+        if not self.brand_cost_rates:
+            return None
+        # 長いブランド名を優先
+        brands = sorted(self.brand_cost_rates, key=len, reverse=True)
+        return re.compile("(" + "|".join(map(re.escape, brands)) + ")", re.IGNORECASE)
+
+    @cached_property
+    def _brand_lookup(self) -> dict[str, float]:
+        return {brand.lower(): rate for brand, rate in self.brand_cost_rates.items()}
+
+    @cached_property
+    def _tiers(self) -> tuple[np.ndarray, np.ndarray]:
+        limits = np.array([np.inf if limit is None else limit for limit, _ in self.shipping_tiers], dtype=float)
+        costs = np.array([cost for _, cost in self.shipping_tiers], dtype=float)
+        return limits, costs
+
+    @cached_property
+    def _fees(self) -> tuple[np.ndarray, np.ndarray]:
+        schedule = sorted(self.fee_schedule)
+        return np.array([p for p, _ in schedule], dtype=float), np.array([r for _, r in schedule], dtype=float)
+
+    @cached_property
+    def is_linear(self) -> bool:
+        """キーワード内で利益が価格の一次式になるか（ブランド別原価率・送料や手数料の段階がない）"""
+        return not self.brand_cost_rates and len(self.shipping_tiers) <= 1 and len(self.fee_schedule) == 1
+
+    def keyword_params(self, keyword: str, exchange_rate: float) -> ProfitParams | None:
+        """キーワード共通の利益計算パラメータ（is_linear でなければ None）"""
+        if not self.is_linear:
+            return None
+        fixed = self.shipping_tiers[0][1] + self.packing_cost if self.shipping_tiers else FIXED_COST_JPY
+        return ProfitParams(
+            exchange_rate,
+            float(self.fee_schedule[0][1]),
+            float(fixed),
+            float(self.keyword_cost_rates.get(keyword, self.default_cost_rate)),
+        )
+
+    # ---- 1商品（取得時の計算用）----
+
+    def params_for(self, keyword: str, name: str, price: float, exchange_rate: float) -> ProfitParams:
+        """1商品の利益計算パラメータ"""
+        cost_rate = self.keyword_cost_rates.get(keyword, self.default_cost_rate)
+        if self._brand_pattern is not None:
+            match = self._brand_pattern.search(name)
+            if match is not None:
+                cost_rate = self._brand_lookup[match.group(1).lower()]
+
+        fixed = FIXED_COST_JPY
+        if self.shipping_tiers:
+            weight = parse_weight(name)
+            if weight is None:
+                weight = self.keyword_weights.get(keyword, self.default_weight)
+            limits, costs = self._tiers
+            fixed = costs[min(np.searchsorted(limits, weight, side="left"), len(costs) - 1)] + self.packing_cost
+
+        thresholds, rates = self._fees
+        fee_rate = rates[max(np.searchsorted(thresholds, price, side="right") - 1, 0)]
+        return ProfitParams(exchange_rate, float(fee_rate), float(fixed), float(cost_rate))
+
+    # ---- 一括計算 ----
+
+    def lookup(self, df: pd.DataFrame) -> pd.DataFrame:
+        """行ごとの cost_rate / fee_rate / fixed_cost（df と同じ index）"""
+        keywords = df["keyword"].astype("category")
+        categories = keywords.cat.categories
+        codes = keywords.cat.codes.to_numpy()
+
+        kw_rates = np.array([self.keyword_cost_rates.get(k, self.default_cost_rate) for k in categories], dtype=float)
+        cost_rate = _take(kw_rates, codes, self.default_cost_rate)
+
+        # 商品名は履歴で繰り返し現れるため、ブランド・重量の判定は重複を除いた商品名に対して行う
+        if self._brand_pattern is not None or self.shipping_tiers:
+            name_codes, names = pd.factorize(df["name"])
+            names = pd.Series(names, dtype=object)
+
+        if self._brand_pattern is not None:
+            brands = names.str.extract(self._brand_pattern, expand=False).str.lower()
+            brand_rates = _take(brands.map(self._brand_lookup).to_numpy(dtype=float), name_codes, np.nan)
+            cost_rate = np.where(np.isnan(brand_rates), cost_rate, brand_rates)
+
+        if self.shipping_tiers:
+            match = names.str.extract(_WEIGHT_PATTERN)
+            units = match[1].str.lower().map(_WEIGHT_UNITS)
+            weight = _take((pd.to_numeric(match[0], errors="coerce") * units).to_numpy(dtype=float), name_codes, np.nan)
+            kw_weights = np.array([self.keyword_weights.get(k, self.default_weight) for k in categories], dtype=float)
+            default_weight = _take(kw_weights, codes, self.default_weight)
+            weight = np.where(np.isnan(weight), default_weight, weight)
+            limits, costs = self._tiers
+            tier = np.minimum(np.searchsorted(limits, weight, side="left"), len(costs) - 1)
+            fixed_cost = costs[tier] + self.packing_cost
+        else:
+            fixed_cost = np.full(len(df), float(FIXED_COST_JPY))
+
+        thresholds, rates = self._fees
+        prices = df["price"].to_numpy(dtype=float)
+        fee_rate = rates[np.maximum(np.searchsorted(thresholds, prices, side="right") - 1, 0)]
+
+        return pd.DataFrame({"cost_rate": cost_rate, "fee_rate": fee_rate, "fixed_cost": fixed_cost}, index=df.index)
+
+    def calculate(self, df: pd.DataFrame, exchange_rate) -> dict:
+        """利益を一括計算（exchange_rate はスカラーまたは行ごとの配列）
+
+        Returns:
+            dict: price_jpy / revenue / cost / profit（profit.calculate_profit と同じ）
+        """
+        terms = self.lookup(df)
+        price_jpy = df["price"].astype(float) * exchange_rate
+        revenue = price_jpy * (1 - terms["fee_rate"])
+        cost = price_jpy * terms["cost_rate"]
+        return {
+            "price_jpy": price_jpy,
+            "revenue": revenue,
+            "cost": cost,
+            "profit": revenue - cost - terms["fixed_cost"],
+        }
+
+    def stored_columns(self, df: pd.DataFrame, exchange_rate) -> dict:
+        """保存用の利益列（profit.stored_profit_columns と同じ列・丸め）"""
+        result = self.calculate(df, exchange_rate)
+        return {
+            "price_jpy": result["price_jpy"].round(0),
+            "estimated_cost_jpy": result["cost"].round(0),
+            "estimated_profit_jpy": result["profit"].round(0),
+        }
+
+    def with_profit(self, df: pd.DataFrame, exchange_rate) -> pd.DataFrame:
+        """利益関連の列（price_jpy / revenue / cost / profit）を追加したコピー"""
+        return df.assign(**self.calculate(df, exchange_rate))
+
+
+DEFAULT_MODEL = CostModel()
+
+_loaded: tuple[int, CostModel] | None = None
+
+
+def model_version(path: str = COST_MODEL_FILE) -> int:
+    """cost_model.json の更新時刻（キャッシュキー用）。未作成なら 0"""
+    if not os.path.exists(path):
+        return 0
+    return os.stat(path).st_mtime_ns
+
+
+def load_cost_model(path: str = COST_MODEL_FILE) -> CostModel:
+    """コストモデルを読み込む（ファイルの更新時刻でキャッシュ。なければ既定値）"""
+    global _loaded
+    version = model_version(path)
+    if version == 0:
+        return DEFAULT_MODEL
+    if _loaded is None or _loaded[0] != version:
+        _loaded = (version, CostModel.from_file(path))
+    return _loaded[1]
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="コストモデルの確認・作成")
+    parser.add_argument("--init", action="store_true", help="現在の設定と同じ内容の cost_model.json を作成")
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.init:
+        if os.path.exists(COST_MODEL_FILE):
+            logger.error(f"❌ {COST_MODEL_FILE} は既に存在します")
+            return
+        model = CostModel(
+            keyword_cost_rates={keyword: COST_RATE for keyword in SEARCH_KEYWORDS},
+            shipping_tiers=[[None, FIXED_COST_JPY]],
+        )
+        model.to_file()
+        logger.info(f"✅ {COST_MODEL_FILE} を作成しました")
+        return
+
+    model = load_cost_model()
+    logger.info(f"📐 コストモデル {model.version}\n" + json.dumps(asdict(model), ensure_ascii=False, indent=1))
+
+
+if __name__ == "__main__":
+    main()
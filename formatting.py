@@ -0,0 +1,101 @@
+"""表示用フォーマット（表示ページのみを列単位で整形）
+
+データ本体は数値のまま保持し、文字列化は画面に出す行だけに限定する。
+- ダッシュボード: Streamlit の column_config で数値列に表示書式を付与
+- CLI: 表示ページを列ごとにまとめて整形し、1回の出力で表示
+"""
+
+import pandas as pd
+
+# 表示種別ごとの書式（Streamlit用 printf形式, Python用 format形式）
+FORMATS = {
+    "twd": ("NT$%,.0f", "NT${:,.0f}"),
+    "jpy": ("¥%,.0f", "¥{:,.0f}"),
+    "count": ("%,d", "{:,.0f}"),
+    "rating": ("%.1f", "{:.1f}"),
+}
+
+# ダッシュボードのランキング表（列名: (表示ラベル, 表示種別)）
+RANKING_COLUMNS = {
+    "keyword": ("Category", None),
+    "name": ("Product", None),
+    "price": ("Price (TWD)", "twd"),
+    "sales": ("Sales", "count"),
+    "profit": ("Profit (JPY)", "jpy"),
+}
+
+# ダッシュボードの分布表（analytics.category_quantiles の列）
+QUANTILE_COLUMNS = {
+    "keyword": ("Category", None),
+    "price_p10": ("Price p10", "twd"),
+    "price_p50": ("Price p50", "twd"),
+    "price_p90": ("Price p90", "twd"),
+    "sales_p50": ("Sales p50", "count"),
+    "profit_p10": ("Profit p10", "jpy"),
+    "profit_p50": ("Profit p50", "jpy"),
+    "profit_p90": ("Profit p90", "jpy"),
+}
+
+
+def visible_page(df: pd.DataFrame, sort_by: str, page_size: int, page: int = 0, ascending: bool = False) -> pd.DataFrame:
+    """表示ページ分の行だけを取り出す
+
+    全件ソートではなく nlargest / nsmallest の部分選択を使う。
+
+    Args:
+        df: 対象データ
+        sort_by: ソート列
+        page_size: 1ページの行数
+        page: ページ番号（0始まり）
+        ascending: True=昇順
+    """
+    end = page_size * (page + 1)
+    if ascending:
+        top = df.nsmallest(end, sort_by)
+    else:
+        top = df.nlargest(end, sort_by)
+    return top.iloc[page_size * page:end]
+
+
+def column_config(columns: dict, currency: str = "TWD", price_digits: int = 0) -> dict:
+    """Streamlit の column_config を作成（データは数値のまま表示書式だけ指定）
+
+    Args:
+        currency: 価格（twd 種別）の列の通貨（TWD 以外は通貨コードを付けて表示）
+        price_digits: TWD 以外の価格の小数点以下の桁数
+    """
+    import streamlit as st
+
+    config = {}
+    for col, (label, kind) in columns.items():
+        if kind is None:
+            config[col] = st.column_config.TextColumn(label)
+        elif kind == "twd" and currency != "TWD":
+            config[col] = st.column_config.NumberColumn(
+                label.replace("TWD", currency), format=f"{currency} %,.{price_digits}f"
+            )
+        else:
+            config[col] = st.column_config.NumberColumn(label, format=FORMATS[kind][0])
+    return config
+
+
+def format_column(series: pd.Series, spec: str) -> pd.Series:
+    """1列をまとめて文字列化（表示ページの行にのみ使う）"""
+    return series.map(spec.format)
+
+
+def shorten(series: pd.Series, width: int, suffix: str = "...") -> pd.Series:
+    """文字列を width 文字で切り詰める（超過分のみ suffix を付与）"""
+    series = series.astype(str)
+    too_long = series.str.len() > width
+    return series.where(~too_long, series.str.slice(0, width) + suffix)
+
+
+def render_rows(columns: list[pd.Series], sep: str = " ") -> str:
+    """整形済みの列を連結して表の本文を作る"""
+    if not columns or len(columns[0]) == 0:
+        return ""
+    line = columns[0].reset_index(drop=True)
+    for col in columns[1:]:
+        line = line + sep + col.reset_index(drop=True)
+    return "\n".join(line.tolist())
@@ -0,0 +1,162 @@
+"""検索APIの商品データの正規化（宣言的なフィールド定義）
+
+API・代替APIの応答はどちらも items[].item_basic（または item そのもの）に商品の属性を持つ。
+フィールドごとに参照するキーを優先順に並べ、最初に 0 / 空 / 未設定でない値を採用する。
+- price: price → price_min（1/100000 TWD 単位）
+- sales: sold → historical_sold
+- shop_rating: shop_rating → item_rating.rating_star
+
+ページ単位で列ごとに値を集めてから一括で数値変換・検証するため、商品ごとの例外処理は行わない。
+必須フィールドがない商品は dropped、型や値の範囲が不正な商品は malformed として数える。
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from metrics import incr
+
+# 商品名の最大文字数
+MAX_NAME_LENGTH = 100
+
+_MISSING = (None, 0, "", "N/A")
+
+
+@dataclass(frozen=True)
+class Field:
+    """1フィールドの定義"""
+
+    name: str
+    keys: tuple[str, ...]        # 参照するキー（優先順。"item_rating.rating_star" のようにドットで入れ子を指定）
+    numeric: bool = True
+    unit: float = 1.0            # 数値を割る単位（価格は 100000 = 1 TWD）
+    digits: int | None = None    # 丸める桁数（None=丸めない）
+    integer: bool = False        # 整数の列にする
+    required: bool = False       # 値がなければ商品ごと除外する
+    max_value: float | None = None
+    positive: bool = False       # 丸めた後の値が 0 以下なら不正とする
+
+
+ITEM_FIELDS = (
+    Field("name", ("name",), numeric=False, required=True),
+    Field("price", ("price", "price_min"), unit=100000, digits=0, required=True, positive=True),
+    Field("sales", ("sold", "historical_sold"), digits=0, integer=True),
+    Field("shop_rating", ("shop_rating", "item_rating.rating_star"), digits=1, max_value=5.0),
+    Field("itemid", ("itemid",), integer=True),
+    Field("shopid", ("shopid",), integer=True),
+)
+
+
+def _column(basics: list[dict], path: tuple[str, ...]) -> list:
+    """全商品からキーの値を取り出す（ない場合は None）"""
+    if len(path) == 1:
+        return [basic.get(path[0]) for basic in basics]
+    values = []
+    for value in basics:
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+        values.append(value)
+    return values
+
+
+def _to_float(values: list) -> np.ndarray:
+    """数値の配列に変換（None・数値に変換できない値は NaN）"""
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
+
+
+class ItemParser:
+    """フィールド定義をコンパイルした正規化処理"""
+
+    def __init__(self, fields: tuple[Field, ...] = ITEM_FIELDS):
+        self.fields = fields
+        # 入れ子のキーは作成時に分割しておく
+        self._paths = tuple(tuple(tuple(key.split(".")) for key in f.keys) for f in fields)
+
+    def _values(self, basics: list[dict], paths: tuple[tuple[str, ...], ...]) -> list:
+        """1フィールドの値（最初のキーで取れなかった商品だけ次のキーを参照する）"""
+        values = _column(basics, paths[0])
+        for path in paths[1:]:
+            empty = [i for i, value in enumerate(values) if value in _MISSING]
+            if not empty:
+                break
+            for i, value in zip(empty, _column([basics[i] for i in empty], path)):
+                values[i] = value
+        return [None if value in _MISSING else value for value in values]
+
+    def parse(self, items: list) -> "ParsedPage":
+        """1ページ分の商品を正規化
+
+        Returns:
+            ParsedPage: 正規化した商品（fields の列）と除外件数
+        """
+        basics = [item.get("item_basic", item) if isinstance(item, dict) else None for item in items]
+        basics = [basic for basic in basics if isinstance(basic, dict)]
+        malformed = len(items) - len(basics)
+        columns = [self._values(basics, paths) for paths in self._paths]
+
+        n = len(basics)
+        keep = np.ones(n, dtype=bool)
+        missing = np.zeros(n, dtype=bool)
+        frame = {}
+        for f, values in zip(self.fields, columns):
+            absent = np.array([value is None for value in values], dtype=bool)
+            if f.required:
+                missing |= absent
+            if f.numeric:
+                numbers = _to_float(values) / f.unit
+                invalid = ~np.isfinite(numbers) | (numbers < 0)
+                if f.max_value is not None:
+                    invalid |= numbers > f.max_value
+                # 不正な値は除外する行だが、整数への変換で警告が出ないよう 0 にしておく
+                numbers[absent | invalid] = 0.0
+                if f.digits is not None:
+                    numbers = numbers.round(f.digits)
+                if f.positive:
+                    invalid |= numbers <= 0
+                keep &= ~(invalid & ~absent)
+                frame[f.name] = numbers.astype(np.int64) if f.integer else numbers
+            else:
+                keep &= np.array([value is None or isinstance(value, str) for value in values], dtype=bool)
+                frame[f.name] = [value[:MAX_NAME_LENGTH] if isinstance(value, str) else value for value in values]
+
+        dropped = int((missing & keep).sum())
+        malformed += int((~keep).sum())
+        df = pd.DataFrame(frame)[keep & ~missing].reset_index(drop=True)
+        return ParsedPage(df, len(items), dropped, malformed)
+
+
+@dataclass(frozen=True)
+class ParsedPage:
+    """正規化の結果"""
+
+    frame: pd.DataFrame
+    items: int       # 応答の商品数
+    dropped: int     # 必須フィールド（商品名・価格）がない商品
+    malformed: int   # 型・値の範囲が不正な商品（丸めると 0 になる価格を含む）
+
+    def record(self, prefix: str = "scraper") -> None:
+        """除外件数をカウンターに記録"""
+        incr(f"{prefix}.items", self.items)
+        incr(f"{prefix}.items_dropped", self.dropped)
+        incr(f"{prefix}.items_malformed", self.malformed)
+
+
+DEFAULT_PARSER = ItemParser()
+
+
+def to_records(df: pd.DataFrame) -> list[dict]:
+    """DataFrame を Python の値の dict のリストに変換
+
+    DataFrame.to_dict("records") は行ごとの変換が遅いため、列ごとに変換してから組み立てる。
+    """
+    columns = list(df.columns)
+    return [dict(zip(columns, row)) for row in zip(*(df[col].tolist() for col in columns))]
+
+
+def parse_items(items: list, parser: ItemParser = DEFAULT_PARSER) -> ParsedPage:
+    """1ページ分の商品を既定のフィールド定義で正規化"""
+    return parser.parse(items)
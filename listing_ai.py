@@ -0,0 +1,269 @@
+"""AI による出品文（説明文・ハッシュタグ）の一括生成
+
+- 商品ごとの結果を (商品キー, プロンプトバージョン) でディスクにキャッシュ
+- 未生成の商品だけを上限付きのスレッドプールで並列にリクエスト
+- 同じ商品の生成が実行中なら、その結果を待つ（重複して生成しない）
+- use_batch=True で Message Batches API にまとめて送信
+- StubClient でオフライン実行・動作確認ができる
+
+使い方:
+    generator = ListingGenerator(AnthropicClient(api_key))
+    listings = generator.generate_all(products)
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from config import AI_MAX_WORKERS, AI_MODEL, LISTING_CACHE_DIR
+from log import get_logger, log_fields
+from metrics import incr, span
+
+logger = get_logger("listing_ai")
+
+# プロンプトを変更したら上げる（古いキャッシュは使われなくなる）
+PROMPT_VERSION = "v1"
+
+PROMPT_TEMPLATE = """あなたは台湾の Shopee で日本商品を販売する出品者です。
+次の商品の出品用説明文（繁体字中国語）とハッシュタグを作成してください。
+
+商品名: {name}
+カテゴリ: {keyword}
+販売価格: NT${price:,.0f}
+
+説明文には【商品特點】【產品規格】【為什麼選擇我們】の3セクションを含め、
+日本からの空運直送・正規品であることを伝えてください。
+ハッシュタグは # で始まる繁体字のタグを6〜8個にしてください。
+
+次の JSON だけを出力してください:
+{{"description": "...", "hashtags": ["#...", "#..."]}}"""
+
+
+def product_key(product: dict) -> str:
+    """商品のキャッシュキー（商品IDがあればID、なければ商品名とカテゴリのハッシュ）"""
+    if product.get("itemid"):
+        source = f"item:{product.get('shopid', '')}:{product['itemid']}"
+    else:
+        source = f"name:{product['keyword']}\n{product['name']}"
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:20]
+
+
+def build_prompt(product: dict) -> str:
+    """生成用のプロンプト"""
+    return PROMPT_TEMPLATE.format(name=product["name"], keyword=product["keyword"], price=product["price"])
+
+
+def parse_listing(text: str) -> dict:
+    """モデルの出力から {"description", "hashtags"} を取り出す"""
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError("JSON が見つかりません")
+    data = json.loads(text[start:end + 1])
+    tags = data.get("hashtags", [])
+    if isinstance(tags, str):
+        tags = tags.split()
+    return {
+        "description": str(data["description"]).strip(),
+        "hashtags": [t if t.startswith("#") else f"#{t}" for t in tags],
+    }
+
+
+class ListingCache:
+    """生成結果のディスクキャッシュ（1商品1ファイル）"""
+
+    def __init__(self, root: str = LISTING_CACHE_DIR, prompt_version: str = PROMPT_VERSION):
+        self.dir = os.path.join(root, prompt_version)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.dir, f"{key}.json")
+
+    def get(self, key: str) -> dict | None:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, listing: dict) -> None:
+        """一時ファイル + rename で保存"""
+        os.makedirs(self.dir, exist_ok=True)
+        tmp_path = self._path(key) + f".{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(listing, f, ensure_ascii=False)
+        os.replace(tmp_path, self._path(key))
+
+
+class AnthropicClient:
+    """anthropic SDK を使うクライアント"""
+
+    def __init__(self, api_key: str, model: str = AI_MODEL, max_tokens: int = 1024):
+        import anthropic
+
+        self.client = anthropic.Anthropic(api_key=api_key)
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def _params(self, prompt: str) -> dict:
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+    def complete(self, prompt: str) -> str:
+        """1件生成"""
+        message = self.client.messages.create(**self._params(prompt))
+        return message.content[0].text
+
+    def complete_batch(self, prompts: dict[str, str], poll_interval: float = 10.0) -> dict[str, str]:
+        """Message Batches API でまとめて生成（終了まで待機）
+
+        Args:
+            prompts: {custom_id: プロンプト}
+
+        Returns:
+            dict: {custom_id: 出力}（失敗した分は含まない）
+        """
+        batch = self.client.messages.batches.create(
+            requests=[{"custom_id": key, "params": self._params(prompt)} for key, prompt in prompts.items()]
+        )
+        logger.info(f"📨 バッチ {batch.id} を送信しました（{len(prompts)}件）", extra=log_fields(batch_id=batch.id, requests=len(prompts)))
+        while batch.processing_status != "ended":
+            time.sleep(poll_interval)
+            batch = self.client.messages.batches.retrieve(batch.id)
+
+        results = {}
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                results[entry.custom_id] = entry.result.message.content[0].text
+            else:
+                logger.warning(f"⚠️ バッチの生成に失敗: {entry.custom_id}", extra=log_fields(custom_id=entry.custom_id, result=entry.result.type))
+        return results
+
+
+class StubClient:
+    """オフライン用のクライアント（プロンプトから決まった出力を返す）"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        name = prompt.split("商品名: ", 1)[1].split("\n", 1)[0]
+        keyword = prompt.split("カテゴリ: ", 1)[1].split("\n", 1)[0]
+        return json.dumps({
+            "description": f"【商品特點】\n\n・{name}\n・100% 日本原裝進口",
+            "hashtags": ["#日本代購", "#日本直送", f"#{keyword.replace('日本 ', '日本')}"],
+        }, ensure_ascii=False)
+
+    def complete_batch(self, prompts: dict[str, str], poll_interval: float = 0.0) -> dict[str, str]:
+        return {key: self.complete(prompt) for key, prompt in prompts.items()}
+
+
+class ListingGenerator:
+    """キャッシュ付きの出品文生成（スレッドセーフ）"""
+
+    def __init__(self, client, cache: ListingCache | None = None, max_workers: int = AI_MAX_WORKERS):
+        self.client = client
+        self.cache = cache or ListingCache()
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._inflight: dict[str, Future] = {}
+
+    def cached(self, product: dict) -> dict | None:
+        """生成済みの出品文（なければ None。生成はしない）"""
+        return self.cache.get(product_key(product))
+
+    def _claim(self, products: list[dict]) -> tuple[dict[str, dict], dict[str, Future], dict[str, Future]]:
+        """キャッシュ済み・他で生成中・自分が生成する分に分ける"""
+        done, waiting, owned = {}, {}, {}
+        with self._lock:
+            for product in products:
+                key = product_key(product)
+                if key in done or key in waiting or key in owned:
+                    continue
+                listing = self.cache.get(key)
+                if listing is not None:
+                    done[key] = listing
+                elif key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                else:
+                    owned[key] = self._inflight[key] = Future()
+        return done, waiting, owned
+
+    def _finish(self, key: str, future: Future, text: str | None, error: Exception | None = None) -> None:
+        """生成結果をキャッシュに保存して待機中の呼び出しに渡す"""
+        try:
+            if error is not None:
+                raise error
+            if text is None:
+                raise RuntimeError("生成結果がありません")
+            listing = {**parse_listing(text), "prompt_version": PROMPT_VERSION}
+            self.cache.put(key, listing)
+            incr("listing_ai.generated")
+            future.set_result(listing)
+        except Exception as e:
+            incr("listing_ai.failed")
+            logger.warning(f"⚠️ 出品文の生成に失敗: {e}", extra=log_fields(key=key, error=repr(e)))
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def generate_all(self, products: list[dict], use_batch: bool = False) -> dict[str, dict]:
+        """商品リストの出品文をまとめて生成
+
+        Args:
+            products: 商品（name / keyword / price を含む dict）のリスト
+            use_batch: True=Message Batches API で送信
+
+        Returns:
+            dict: {商品キー: {"description", "hashtags", "prompt_version"}}（失敗した分は含まない）
+        """
+        done, waiting, owned = self._claim(products)
+        try:
+            incr("listing_ai.cache_hit", len(done))
+            prompts = {product_key(p): build_prompt(p) for p in products if product_key(p) in owned}
+
+            if prompts:
+                logger.info(f"🤖 出品文を生成中...（{len(prompts)}件 / キャッシュ {len(done)}件）", extra=log_fields(requests=len(prompts), cached=len(done), batch=use_batch))
+
+            with span("listing_ai.generate"):
+                if use_batch and prompts:
+                    try:
+                        texts = self.client.complete_batch(prompts)
+                    except Exception as e:
+                        for key, future in owned.items():
+                            self._finish(key, future, None, e)
+                    else:
+                        for key, future in owned.items():
+                            self._finish(key, future, texts.get(key))
+                elif prompts:
+                    with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                        calls = {key: executor.submit(self.client.complete, prompt) for key, prompt in prompts.items()}
+                        for key, call in calls.items():
+                            error = call.exception()
+                            self._finish(key, owned[key], None if error else call.result(), error)
+        finally:
+            # 例外・中断（プロンプト作成の失敗、ダッシュボードの再実行など）で結果を渡せなかった分は
+            # 失敗として解放する（同じ商品を待っている呼び出しが止まらないように）
+            for key, future in owned.items():
+                if not future.done():
+                    self._finish(key, future, None, RuntimeError("出品文の生成が中断されました"))
+
+        for key, future in {**owned, **waiting}.items():
+            if future.exception() is None:
+                done[key] = future.result()
+        return done
+
+    def get(self, product: dict) -> dict | None:
+        """1商品の出品文（キャッシュがあれば生成しない）"""
+        return self.generate_all([product]).get(product_key(product))
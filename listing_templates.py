@@ -0,0 +1,163 @@
+"""テンプレートによる出品文（説明文・ハッシュタグ）の生成
+
+- カテゴリ別の特徴・タグはモジュール読み込み時に作る読み取り専用テーブル
+- 食品判定は食品の語をまとめた正規表現で1回だけ走査（カテゴリ名の判定はキャッシュ）
+- 説明文は (商品名, カテゴリ, 価格) ごとに LRU キャッシュ
+- 一括モード: カテゴリ全体の出品文を JSON Lines / CSV に書き出す
+
+使い方:
+    python listing_templates.py --keyword "日本 零食" --output listings.jsonl
+"""
+
+import argparse
+import csv
+import json
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+import pandas as pd
+
+from config import STORE_DIR
+from log import get_logger, log_fields, setup_logging
+from storage import SnapshotStore
+
+logger = get_logger("listing_templates")
+
+FOOD_TERMS = frozenset(["零食", "泡麵", "調味料", "咖啡", "食品", "餅乾", "糖果"])
+_FOOD_PATTERN = re.compile("|".join(map(re.escape, sorted(FOOD_TERMS))))
+
+FEATURES = MappingProxyType({
+    "日本 零食": ("日本人氣零食", "獨特風味", "精緻包裝"),
+    "日本 泡麵": ("日本國民美食", "濃郁湯頭", "道地風味"),
+    "日本 調味料": ("專業主廚愛用", "提升料理層次", "天然食材"),
+    "日本 咖啡": ("嚴選咖啡豆", "香醇順口", "職人烘焙"),
+    "日本 生活用品": ("日本製造", "設計精美", "品質保證"),
+    "日本 美容": ("日本熱銷", "溫和配方", "適合亞洲肌膚"),
+})
+DEFAULT_FEATURES = ("日本品質", "人氣商品", "值得信賴")
+
+BASE_TAGS = ("#日本代購", "#日本直送", "#空運直送", "#日本正品")
+CATEGORY_TAGS = MappingProxyType({
+    "日本 零食": ("#日本零食", "#進口零食", "#日本伴手禮"),
+    "日本 泡麵": ("#日本泡麵", "#日本拉麵", "#日本美食"),
+    "日本 調味料": ("#日本調味料", "#料理必備", "#日本廚房"),
+    "日本 咖啡": ("#日本咖啡", "#咖啡控", "#辦公室必備"),
+    "日本 生活用品": ("#日本生活", "#日本雜貨", "#質感生活"),
+    "日本 美容": ("#日本美妝", "#日本保養", "#日本藥妝"),
+})
+DEFAULT_TAGS = ("#日本商品",)
+
+DESCRIPTION_TEMPLATE = """【商品特點】
+
+・{f0}
+・{f1}
+・{f2}
+・100% 日本原裝進口
+
+【產品規格】
+
+商品名稱：{name}
+售價：NT${price:,.0f}
+產地：日本
+
+【為什麼選擇我們】
+
+✓ 日本通路代購 — 正規店舖購入
+✓ 空運直送 — 新鮮直達
+✓ 包裝嚴實 — 完整保護
+✓ 快速出貨 — 3-5天內寄出
+{guarantee}
+
+有問題歡迎詢問！"""
+
+
+@lru_cache(maxsize=None)
+def _is_food_keyword(keyword: str) -> bool:
+    return _FOOD_PATTERN.search(keyword) is not None
+
+
+def is_food(name: str, keyword: str) -> bool:
+    """食品かどうか（カテゴリ名または商品名に食品の語を含む）"""
+    return _is_food_keyword(keyword) or _FOOD_PATTERN.search(name) is not None
+
+
+@lru_cache(maxsize=65536)
+def description(name: str, keyword: str, price: float) -> str:
+    """説明文（繁体字）"""
+    f0, f1, f2 = FEATURES.get(keyword, DEFAULT_FEATURES)
+    guarantee = "✓ 最新效期 — 保證新鮮" if is_food(name, keyword) else "✓ 正品保證"
+    return DESCRIPTION_TEMPLATE.format(f0=f0, f1=f1, f2=f2, name=name[:50], price=price, guarantee=guarantee)
+
+
+@lru_cache(maxsize=None)
+def hashtags(keyword: str) -> tuple[str, ...]:
+    """ハッシュタグ"""
+    return BASE_TAGS + CATEGORY_TAGS.get(keyword, DEFAULT_TAGS)
+
+
+def generate_description(product: dict) -> str:
+    """商品（name / keyword / price を含む dict）の説明文"""
+    return description(product["name"], product["keyword"], float(product["price"]))
+
+
+def generate_hashtags(keyword: str) -> list[str]:
+    """カテゴリのハッシュタグ"""
+    return list(hashtags(keyword))
+
+
+def iter_listings(df: pd.DataFrame):
+    """DataFrame の各行の出品文を {"name", "keyword", "price", "description", "hashtags"} で返す"""
+    for name, keyword, price in zip(df["name"].tolist(), df["keyword"].tolist(), df["price"].tolist()):
+        yield {
+            "name": name,
+            "keyword": keyword,
+            "price": price,
+            "description": description(name, keyword, float(price)),
+            "hashtags": " ".join(hashtags(keyword)),
+        }
+
+
+def render_listings(df: pd.DataFrame) -> str:
+    """出品文を JSON Lines の文字列で返す（ダッシュボードのダウンロード用）"""
+    return "".join(json.dumps(listing, ensure_ascii=False) + "\n" for listing in iter_listings(df))
+
+
+def write_listings(df: pd.DataFrame, path: str) -> int:
+    """出品文をファイルに書き出す（拡張子 .csv は CSV、それ以外は JSON Lines）
+
+    Returns:
+        int: 書き出した件数
+    """
+    if path.endswith(".csv"):
+        with open(path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["name", "keyword", "price", "description", "hashtags"])
+            writer.writeheader()
+            writer.writerows(iter_listings(df))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_listings(df))
+    return len(df)
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="カテゴリの出品文を一括で書き出す")
+    parser.add_argument("--keyword", action="append", help="対象カテゴリ（複数指定可。省略時はすべて）")
+    parser.add_argument("--output", default="listings.jsonl", help="出力先（.csv / .jsonl）")
+    parser.add_argument("--store", default=STORE_DIR, help="スナップショットストア")
+    args = parser.parse_args()
+
+    setup_logging()
+    store = SnapshotStore(args.store)
+    snapshots = store.snapshots()
+    if not snapshots:
+        logger.error("❌ データがありません")
+        return
+    df = store.scan(keywords=args.keyword, snapshots=snapshots[-1:])
+    count = write_listings(df, args.output)
+    logger.info(f"✅ {count:,}件の出品文を {args.output} に保存しました", extra=log_fields(output=args.output, count=count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""構造化ログ（レベル付き・キュー経由の非同期出力）
+
+- 呼び出し側はキューに積むだけで、出力はバックグラウンドスレッドが行う
+- console 形式: メッセージのみ（従来の print と同じ見た目）
+- json 形式: 1行1レコードの JSON（extra=log_fields(...) の項目を含む）
+- 商品ごとのメッセージ（per_item）は一定間隔あたりの件数を制限
+- 商品テーブルなどの詳細は report() で出力。json 形式ではコンソールに出さず、
+  レポートファイル指定時のみファイルに書き出す
+
+使い方:
+    logger = get_logger(__name__)
+    logger.info("📦 取得完了", extra=log_fields(keyword=keyword, count=n))
+    logger.debug("商品をスキップ", extra=log_fields(per_item=True, reason="no name"))
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+
+LOGGER_NAME = "shopee"
+REPORT_LOGGER_NAME = f"{LOGGER_NAME}.report"
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """モジュール用のロガーを取得"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def log_fields(**fields) -> dict:
+    """logger の extra に渡す構造化フィールド"""
+    return {"fields": fields}
+
+
+class JsonFormatter(logging.Formatter):
+    """1行1レコードの JSON 形式"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage().strip(),
+        }
+        data.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """商品ごとのメッセージ（per_item=True）を interval 秒あたり limit 件に制限
+
+    抑制した件数は、次に通過したメッセージの suppressed に記録する。
+    """
+
+    def __init__(self, limit: int = 20, interval: float = 1.0):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self._window_start = 0.0
+        self._count = 0
+        self._suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = getattr(record, "fields", None)
+        if not fields or not fields.get("per_item"):
+            return True
+
+        now = time.monotonic()
+        if now - self._window_start >= self.interval:
+            self._window_start = now
+            self._count = 0
+
+        if self._count >= self.limit:
+            self._suppressed += 1
+            return False
+
+        self._count += 1
+        if self._suppressed:
+            record.fields = {**fields, "suppressed": self._suppressed}
+            self._suppressed = 0
+        return True
+
+
+class _ReportFilter(logging.Filter):
+    """レポート用ロガーのレコードだけを通す（include=False なら除外）"""
+
+    def __init__(self, include: bool):
+        super().__init__()
+        self.include = include
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return (record.name == REPORT_LOGGER_NAME) == self.include
+
+
+def setup_logging(level: str = "INFO", fmt: str = "console", report_file: str | None = None) -> None:
+    """ログ出力を設定（プロセスで1回呼ぶ）
+
+    Args:
+        level: ログレベル（DEBUG / INFO / WARNING ...）
+        fmt: console=メッセージのみ, json=JSON Lines
+        report_file: 商品テーブルなど詳細レポートの出力先
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    console = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        console.setFormatter(JsonFormatter())
+        console.addFilter(_ReportFilter(include=False))
+    else:
+        console.setFormatter(logging.Formatter("%(message)s"))
+
+    handlers = [console]
+    if report_file:
+        report = logging.FileHandler(report_file, mode="w", encoding="utf-8")
+        report.setFormatter(logging.Formatter("%(message)s"))
+        report.addFilter(_ReportFilter(include=True))
+        handlers.append(report)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers = [queue_handler]
+    logger.setLevel(level.upper())
+    logger.propagate = False
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """キューに残ったログを書き出して停止"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def report(text: str) -> None:
+    """商品テーブルなどの詳細レポートを出力"""
+    logging.getLogger(REPORT_LOGGER_NAME).info(text)
@@ -1,31 +1,94 @@
 """Shopee Taiwan リサーチツール メインエントリーポイント"""
 
+import io
 import os
+import argparse
 import base64
 from datetime import datetime
+from functools import cache
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
 from scraper import ShopeeScraper
-from config import SEARCH_KEYWORDS, OUTPUT_FILE
-
-# 日本語フォント設定（macOS）
-matplotlib.rcParams['font.family'] = ['Hiragino Sans', 'Arial Unicode MS', 'sans-serif']
-matplotlib.rcParams['axes.unicode_minus'] = False
-
-
-def create_sales_chart(df: pd.DataFrame, output_file: str = "market_report.png") -> None:
+from config import SEARCH_KEYWORDS, OUTPUT_FILE, EXCHANGE_RATE
+from analytics import (
+    category_quantiles,
+    category_summary,
+    for_region,
+    frame_category_summary,
+    genre_stats,
+    latest_snapshot,
+    top_profit,
+)
+from cost_model import load_cost_model
+from formatting import format_column, shorten, render_rows
+from log import get_logger, log_fields, report, setup_logging
+from metrics import METRICS, timed
+from sketch import frame_sketches
+from storage import SnapshotStore, snapshot_id_from_timestamp, stored_rate
+from treasure_index import TreasureIndex
+
+logger = get_logger("main")
+
+
+@cache
+def _pyplot():
+    """matplotlib をグラフ作成時に初めて読み込む（起動時間短縮）"""
+    import matplotlib
+    import matplotlib.pyplot as plt
+
+    # 日本語フォント設定（macOS）
+    matplotlib.rcParams['font.family'] = ['Hiragino Sans', 'Arial Unicode MS', 'sans-serif']
+    matplotlib.rcParams['axes.unicode_minus'] = False
+    return plt
+
+
+def category_summary_for(df: pd.DataFrame, store: SnapshotStore | None = None) -> pd.DataFrame:
+    """最新スナップショットのキーワード別統計（グラフ用）
+
+    ストアに同じスナップショットがあればパーティションの集計値から計算し（行データは読まない）、
+    なければ・コストモデルが一次式で表せなければ df から集計する。
+    """
+    df_latest = latest_snapshot(df)
+    if store is not None and "timestamp" in df_latest.columns and not df_latest.empty:
+        snapshot_id = snapshot_id_from_timestamp(str(df_latest["timestamp"].iloc[0]))
+        rollups = store.rollups(snapshots=[snapshot_id])
+        if rollups is not None and rollups["rows"].sum() == len(df_latest):
+            summary = category_summary(rollups, cost_model=load_cost_model())
+            if summary is not None:
+                return summary
+    return frame_category_summary(df_latest)
+
+
+def category_quantiles_for(df: pd.DataFrame, store: SnapshotStore | None = None) -> pd.DataFrame:
+    """最新スナップショットのキーワード別分位点（価格・販売数・想定利益の p10 / p50 / p90）
+
+    ストアに同じスナップショットがあれば分位点スケッチを併合し、なければ df からスケッチを作る。
+    利益はスナップショットのレートとコストモデルから求める（一次式で表せないキーワードは空欄）。
+    """
+    df_latest = latest_snapshot(df)
+    sketches = None
+    rate = EXCHANGE_RATE
+    if store is not None and "timestamp" in df_latest.columns and not df_latest.empty:
+        snapshot_id = snapshot_id_from_timestamp(str(df_latest["timestamp"].iloc[0]))
+        rollups = store.rollups(snapshots=[snapshot_id])
+        if rollups is not None and rollups["rows"].sum() == len(df_latest):
+            sketches = store.sketches(snapshots=[snapshot_id])
+            rate = float(rollups["rate"].iloc[0])
+    if sketches is None:
+        sketches = frame_sketches(df_latest)
+        if "price_jpy" in df_latest.columns:
+            rate = stored_rate(df_latest)
+    model = load_cost_model()
+    return category_quantiles(sketches, {keyword: model.keyword_params(keyword, rate) for keyword in sketches})
+
+
+@timed("chart.sales")
+def create_sales_chart(summary: pd.DataFrame, output_file: str = "market_report.png") -> None:
     """ジャンル別の総販売数を棒グラフで可視化"""
-    print("\n📊 グラフを作成中...")
-
-    if "timestamp" in df.columns:
-        latest_timestamp = df["timestamp"].max()
-        df_latest = df[df["timestamp"] == latest_timestamp]
-    else:
-        df_latest = df
+    logger.info("\n📊 グラフを作成中...")
 
-    genre_sales = df_latest.groupby("keyword")["sales"].sum().sort_values(ascending=True)
+    genre_sales = summary["sales"].sort_values(ascending=True)
 
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 8))
     colors = plt.cm.viridis([i / len(genre_sales) for i in range(len(genre_sales))])
     bars = ax.barh(genre_sales.index, genre_sales.values, color=colors)
@@ -44,22 +107,18 @@ def create_sales_chart(df: pd.DataFrame, output_file: str = "market_report.png")
     plt.tight_layout()
     plt.savefig(output_file, dpi=150, bbox_inches='tight', facecolor='white')
     plt.close()
-    print(f"   ✅ グラフを {output_file} に保存しました")
+    logger.info(f"   ✅ グラフを {output_file} に保存しました", extra=log_fields(output=output_file))
 
 
-def create_profit_chart(df: pd.DataFrame, output_file: str = "profit_report.png") -> None:
+@timed("chart.profit")
+def create_profit_chart(summary: pd.DataFrame, output_file: str = "profit_report.png") -> None:
     """ジャンル別の平均想定利益を棒グラフで可視化"""
-    if "estimated_profit_jpy" not in df.columns:
+    if summary["mean_profit"].isna().all():
         return
 
-    if "timestamp" in df.columns:
-        latest_timestamp = df["timestamp"].max()
-        df_latest = df[df["timestamp"] == latest_timestamp]
-    else:
-        df_latest = df
-
-    genre_profit = df_latest.groupby("keyword")["estimated_profit_jpy"].mean().sort_values(ascending=True)
+    genre_profit = summary["mean_profit"].sort_values(ascending=True)
 
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(12, 8))
     colors = ['#2ecc71' if v >= 0 else '#e74c3c' for v in genre_profit.values]
     bars = ax.barh(genre_profit.index, genre_profit.values, color=colors)
@@ -82,77 +141,80 @@ def create_profit_chart(df: pd.DataFrame, output_file: str = "profit_report.png"
     plt.tight_layout()
     plt.savefig(output_file, dpi=150, bbox_inches='tight', facecolor='white')
     plt.close()
-    print(f"   ✅ 利益グラフを {output_file} に保存しました")
+    logger.info(f"   ✅ 利益グラフを {output_file} に保存しました", extra=log_fields(output=output_file))
 
 
+@timed("analytics.profit_ranking")
 def show_profit_ranking(df: pd.DataFrame, top_n: int = 15) -> pd.DataFrame:
     """利益額ランキングを表示（上位N商品）"""
-    print("\n" + "=" * 70)
-    print("💰 【利益額ランキング TOP15】")
-    print("=" * 70)
-
-    if "timestamp" in df.columns:
-        latest_timestamp = df["timestamp"].max()
-        df_latest = df[df["timestamp"] == latest_timestamp].copy()
-    else:
-        df_latest = df.copy()
-
-    # 利益順にソート
-    profit_ranking = df_latest.nlargest(top_n, "estimated_profit_jpy")
-
-    print(f"\n{'順位':<4} {'商品名':<42} {'ジャンル':<12} {'販売数':>8} {'価格(TWD)':>10} {'利益(円)':>10}")
-    print("-" * 90)
-
-    for i, row in enumerate(profit_ranking.itertuples(), 1):
-        name = row.name[:38] + "..." if len(row.name) > 38 else row.name
-        keyword = row.keyword.replace("日本 ", "")
-        print(f"{i:<4} {name:<42} {keyword:<12} {row.sales:>8,} NT${row.price:>7,.0f} ¥{row.estimated_profit_jpy:>8,.0f}")
-
-    return profit_ranking
-
-
+    # 利益順にソート（最新スナップショット）
+    ranking = top_profit(df, top_n)
+
+    # 商品テーブルは詳細レポートへ
+    report("\n".join([
+        "\n" + "=" * 70,
+        "💰 【利益額ランキング TOP15】",
+        "=" * 70,
+        f"\n{'順位':<4} {'商品名':<42} {'ジャンル':<12} {'販売数':>8} {'価格(TWD)':>10} {'利益(円)':>10}",
+        "-" * 90,
+        render_rows([
+            format_column(pd.Series(range(1, len(ranking) + 1)), "{:<4}"),
+            shorten(ranking["name"], 38).str.ljust(42),
+            ranking["keyword"].str.replace("日本 ", "", regex=False).str.ljust(12),
+            format_column(ranking["sales"], "{:>8,}"),
+            format_column(ranking["price"], "NT${:>7,.0f}"),
+            format_column(ranking["estimated_profit_jpy"], "¥{:>8,.0f}"),
+        ]),
+    ]))
+    logger.debug("利益額ランキングを作成", extra=log_fields(top_n=top_n, rows=len(ranking)))
+
+    return ranking
+
+
+@timed("analytics.treasure_products")
 def find_treasure_products(df: pd.DataFrame, min_profit: int = 500, min_sales: int = 100, min_rating: float = 4.5) -> pd.DataFrame:
     """お宝商品（優先仕入れ候補）を抽出"""
-    print("\n" + "=" * 70)
-    print("🏆 【お宝商品 - 優先仕入れ候補】")
-    print("=" * 70)
-    print(f"\n抽出条件:")
-    print(f"  ✓ 想定利益 >= ¥{min_profit:,}")
-    print(f"  ✓ 販売数 >= {min_sales:,}個")
-    print(f"  ✓ ショップ評価 >= {min_rating}")
+    # 3条件でフィルタリング（最新スナップショットのインデックスを使用）
+    treasure = TreasureIndex.from_latest(df).select(min_profit, min_sales, min_rating)
 
-    if "timestamp" in df.columns:
-        latest_timestamp = df["timestamp"].max()
-        df_latest = df[df["timestamp"] == latest_timestamp].copy()
-    else:
-        df_latest = df.copy()
-
-    # 3条件でフィルタリング
-    treasure = df_latest[
-        (df_latest["estimated_profit_jpy"] >= min_profit) &
-        (df_latest["sales"] >= min_sales) &
-        (df_latest["shop_rating"] >= min_rating)
-    ].sort_values("estimated_profit_jpy", ascending=False)
-
-    print(f"\n📦 該当商品: {len(treasure)}件\n")
+    logger.info(
+        "\n" + "=" * 70 + "\n🏆 【お宝商品 - 優先仕入れ候補】\n" + "=" * 70
+        + f"\n\n抽出条件:\n  ✓ 想定利益 >= ¥{min_profit:,}\n  ✓ 販売数 >= {min_sales:,}個\n  ✓ ショップ評価 >= {min_rating}"
+        + f"\n\n📦 該当商品: {len(treasure)}件\n",
+        extra=log_fields(min_profit=min_profit, min_sales=min_sales, min_rating=min_rating, count=len(treasure)),
+    )
 
     if len(treasure) > 0:
-        print(f"{'順位':<4} {'商品名':<42} {'ジャンル':<10} {'販売数':>8} {'評価':>5} {'利益(円)':>10}")
-        print("-" * 85)
-
-        for i, row in enumerate(treasure.itertuples(), 1):
-            name = row.name[:38] + "..." if len(row.name) > 38 else row.name
-            keyword = row.keyword.replace("日本 ", "")
-            print(f"{i:<4} {name:<42} {keyword:<10} {row.sales:>8,} ⭐{row.shop_rating:>3.1f} ¥{row.estimated_profit_jpy:>8,.0f}")
+        # 商品テーブルは詳細レポートへ
+        report("\n".join([
+            f"{'順位':<4} {'商品名':<42} {'ジャンル':<10} {'販売数':>8} {'評価':>5} {'利益(円)':>10}",
+            "-" * 85,
+            render_rows([
+                format_column(pd.Series(range(1, len(treasure) + 1)), "{:<4}"),
+                shorten(treasure["name"], 38).str.ljust(42),
+                treasure["keyword"].str.replace("日本 ", "", regex=False).str.ljust(10),
+                format_column(treasure["sales"], "{:>8,}"),
+                format_column(treasure["shop_rating"], "⭐{:>3.1f}"),
+                format_column(treasure["estimated_profit_jpy"], "¥{:>8,.0f}"),
+            ]),
+        ]))
     else:
-        print("   ⚠️ 条件を満たす商品が見つかりませんでした")
+        logger.warning("   ⚠️ 条件を満たす商品が見つかりませんでした")
 
     return treasure
 
 
-def create_html_report(df: pd.DataFrame, profit_ranking: pd.DataFrame, treasure_products: pd.DataFrame, output_file: str = "summary_report.html") -> None:
-    """HTMLレポートを生成"""
-    print("\n📄 HTMLレポートを作成中...")
+@timed("report.html")
+def create_html_report(
+    df: pd.DataFrame,
+    profit_ranking: pd.DataFrame,
+    treasure_products: pd.DataFrame,
+    output_file: str = "summary_report.html",
+    total_rows: int | None = None,
+    quantiles: pd.DataFrame | None = None,
+) -> None:
+    """HTMLレポートを生成（total_rows: 累計データ数。省略時は len(df)。quantiles: category_quantiles_for の結果）"""
+    logger.info("\n📄 HTMLレポートを作成中...")
 
     if "timestamp" in df.columns:
         latest_timestamp = df["timestamp"].max()
@@ -172,17 +234,9 @@ def create_html_report(df: pd.DataFrame, profit_ranking: pd.DataFrame, treasure_
     profit_img = encode_image("profit_report.png")
 
     # ジャンル別統計
-    genre_stats = []
-    for keyword in df_latest["keyword"].unique():
-        genre_df = df_latest[df_latest["keyword"] == keyword]
-        genre_stats.append({
-            "ジャンル": keyword,
-            "商品数": len(genre_df),
-            "総販売数": genre_df["sales"].sum(),
-            "平均価格": genre_df["price"].mean(),
-            "平均利益": genre_df["estimated_profit_jpy"].mean() if "estimated_profit_jpy" in genre_df.columns else 0,
-        })
-    genre_stats_df = pd.DataFrame(genre_stats).sort_values("総販売数", ascending=False)
+    genre_stats_df = genre_stats(df_latest).sort_values("総販売数", ascending=False)
+    if "平均想定利益" not in genre_stats_df.columns:
+        genre_stats_df["平均想定利益"] = 0
 
     html_content = f"""<!DOCTYPE html>
 <html lang="ja">
@@ -320,7 +374,7 @@ def create_html_report(df: pd.DataFrame, profit_ranking: pd.DataFrame, treasure_
             <h1>🛒 Shopee台湾 リサーチレポート</h1>
             <p class="meta">
                 📅 取得日時: {latest_timestamp}<br>
-                📦 分析商品数: {len(df_latest)}件 | 📁 累計データ: {len(df)}件
+                📦 分析商品数: {len(df_latest)}件 | 📁 累計データ: {total_rows if total_rows is not None else len(df)}件
             </p>
         </div>
 
@@ -378,7 +432,7 @@ def create_html_report(df: pd.DataFrame, profit_ranking: pd.DataFrame, treasure_
 
     for i, row in enumerate(genre_stats_df.itertuples(), 1):
         badge = '<span class="badge badge-gold">🥇</span>' if i == 1 else '<span class="badge badge-silver">🥈</span>' if i == 2 else '<span class="badge badge-bronze">🥉</span>' if i == 3 else f'{i}'
-        profit_class = "profit-positive" if row.平均利益 > 0 else "profit-negative"
+        profit_class = "profit-positive" if row.平均想定利益 > 0 else "profit-negative"
         html_content += f"""
                     <tr>
                         <td>{badge}</td>
@@ -386,7 +440,7 @@ def create_html_report(df: pd.DataFrame, profit_ranking: pd.DataFrame, treasure_
                         <td>{row.商品数}</td>
                         <td>{row.総販売数:,}</td>
                         <td>NT${row.平均価格:,.0f}</td>
-                        <td class="{profit_class}">¥{row.平均利益:,.0f}</td>
+                        <td class="{profit_class}">¥{row.平均想定利益:,.0f}</td>
                     </tr>
 """
 
@@ -394,7 +448,48 @@ def create_html_report(df: pd.DataFrame, profit_ranking: pd.DataFrame, treasure_
                 </tbody>
             </table>
         </div>
+"""
 
+    if quantiles is not None and not quantiles.empty:
+        html_content += """
+        <div class="section">
+            <h2>📐 ジャンル別の分布（p10 / p50 / p90）</h2>
+            <p style="color: #666; margin-bottom: 15px;">
+                平均は一部の大ヒット商品に引っ張られるため、分位点で価格帯・販売数・利益の幅を示します（誤差 ±2%）
+            </p>
+            <table>
+                <thead>
+                    <tr>
+                        <th>ジャンル</th>
+                        <th>価格 (TWD)</th>
+                        <th>販売数</th>
+                        <th>想定利益</th>
+                    </tr>
+                </thead>
+                <tbody>
+"""
+        for keyword, row in zip(quantiles.index, quantiles.to_dict("records")):
+            profit = row.get("profit_p50")
+            if profit is None or pd.isna(profit):
+                profit_cell = "-"
+            else:
+                profit_class = "profit-positive" if profit > 0 else "profit-negative"
+                profit_cell = f'¥{row["profit_p10"]:,.0f} / <span class="{profit_class}">¥{profit:,.0f}</span> / ¥{row["profit_p90"]:,.0f}'
+            html_content += f"""
+                    <tr>
+                        <td>{keyword}</td>
+                        <td>NT${row["price_p10"]:,.0f} / <b>NT${row["price_p50"]:,.0f}</b> / NT${row["price_p90"]:,.0f}</td>
+                        <td>{row["sales_p10"]:,.0f} / <b>{row["sales_p50"]:,.0f}</b> / {row["sales_p90"]:,.0f}</td>
+                        <td>{profit_cell}</td>
+                    </tr>
+"""
+        html_content += """
+                </tbody>
+            </table>
+        </div>
+"""
+
+    html_content += """
         <div class="section">
             <h2>💎 お宝商品 - 優先仕入れ候補</h2>
             <p style="color: #666; margin-bottom: 15px;">
@@ -486,122 +581,158 @@ def create_html_report(df: pd.DataFrame, profit_ranking: pd.DataFrame, treasure_
     with open(output_file, "w", encoding="utf-8") as f:
         f.write(html_content)
 
-    print(f"   ✅ HTMLレポートを {output_file} に保存しました")
+    logger.info(f"   ✅ HTMLレポートを {output_file} に保存しました", extra=log_fields(output=output_file))
 
 
-def analyze_results(df: pd.DataFrame) -> None:
-    """取得データを分析してジャンル別の売れ行きを表示"""
-    print("\n" + "=" * 60)
-    print("📊 データ分析レポート")
-    print("=" * 60)
+@timed("analytics.analyze_results")
+def analyze_results(df: pd.DataFrame, total_rows: int | None = None) -> None:
+    """取得データを分析してジャンル別の売れ行きを表示（total_rows: 累計データ数。省略時は len(df)）"""
+    header = "\n" + "=" * 60 + "\n📊 データ分析レポート\n" + "=" * 60
 
     if df.empty:
-        print("❌ 分析するデータがありません")
+        logger.error(header + "\n❌ 分析するデータがありません")
         return
 
+    if total_rows is None:
+        total_rows = len(df)
+
     if "timestamp" in df.columns:
         latest_timestamp = df["timestamp"].max()
         df_analysis = df[df["timestamp"] == latest_timestamp]
-        print(f"\n📅 分析対象: {latest_timestamp}")
+        header += f"\n\n📅 分析対象: {latest_timestamp}"
     else:
+        latest_timestamp = None
         df_analysis = df
 
-    print(f"📦 今回取得商品数: {len(df_analysis)}")
-    print(f"📁 累計データ数: {len(df)}")
+    logger.info(
+        header + f"\n📦 今回取得商品数: {len(df_analysis)}\n📁 累計データ数: {total_rows}",
+        extra=log_fields(snapshot=latest_timestamp, products=len(df_analysis), total=total_rows),
+    )
+
+    stats_df = genre_stats(df_analysis)
+    genre_lines = ["\n" + "-" * 60, "【ジャンル別 分析結果】", "-" * 60]
+
+    for stats in stats_df.to_dict("records"):
+        genre_lines.append(f"\n🏷️  {stats['ジャンル']}")
+        genre_lines.append(f"   商品数:     {stats['商品数']}個")
+        genre_lines.append(f"   平均価格:   NT${stats['平均価格']:,.0f}")
+        genre_lines.append(f"   総販売数:   {stats['総販売数']:,}個")
+        genre_lines.append(f"   平均販売数: {stats['平均販売数']:,.0f}個")
+        genre_lines.append(f"   平均評価:   ⭐{stats['平均評価']:.1f}")
+        if "平均想定利益" in stats:
+            genre_lines.append(f"   平均想定利益: ¥{stats['平均想定利益']:,.0f}")
 
-    print("\n" + "-" * 60)
-    print("【ジャンル別 分析結果】")
-    print("-" * 60)
+    # ジャンル別の詳細は詳細レポートへ
+    report("\n".join(genre_lines))
 
-    genre_stats = []
+    ranking = stats_df.sort_values("総販売数", ascending=False)
 
-    for keyword in df_analysis["keyword"].unique():
-        genre_df = df_analysis[df_analysis["keyword"] == keyword]
+    ranking_lines = ["\n" + "-" * 60, "【🏆 売れ筋ジャンルランキング】", "-" * 60]
+    for i, row in enumerate(ranking.itertuples(), 1):
+        medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
+        ranking_lines.append(f"\n{medal} {row.ジャンル}")
+        ranking_lines.append(f"   総販売数: {row.総販売数:,}個 | 平均販売数: {row.平均販売数:,.0f}個")
+    logger.info("\n".join(ranking_lines), extra=log_fields(ranking=ranking["ジャンル"].tolist()))
 
-        stats = {
-            "ジャンル": keyword,
-            "商品数": len(genre_df),
-            "平均価格": genre_df["price"].mean(),
-            "総販売数": genre_df["sales"].sum(),
-            "平均販売数": genre_df["sales"].mean(),
-            "平均評価": genre_df["shop_rating"].mean(),
-            "最高販売数": genre_df["sales"].max(),
-        }
+    best_genre = ranking.iloc[0]
 
-        if "estimated_profit_jpy" in genre_df.columns:
-            stats["平均想定利益"] = genre_df["estimated_profit_jpy"].mean()
+    logger.info(
+        "\n" + "=" * 60 + "\n📈 【結論】\n" + "=" * 60
+        + f"\n\n🎯 最も売れているジャンル: {best_genre['ジャンル']}"
+        + f"\n   - 総販売数: {best_genre['総販売数']:,}個"
+        + f"\n   - 平均販売数: {best_genre['平均販売数']:,.0f}個/商品"
+        + f"\n   - 平均価格: NT${best_genre['平均価格']:,.0f}",
+        extra=log_fields(best_genre=best_genre["ジャンル"], total_sales=int(best_genre["総販売数"])),
+    )
 
-        genre_stats.append(stats)
 
-        print(f"\n🏷️  {keyword}")
-        print(f"   商品数:     {stats['商品数']}個")
-        print(f"   平均価格:   NT${stats['平均価格']:,.0f}")
-        print(f"   総販売数:   {stats['総販売数']:,}個")
-        print(f"   平均販売数: {stats['平均販売数']:,.0f}個")
-        print(f"   平均評価:   ⭐{stats['平均評価']:.1f}")
-        if "平均想定利益" in stats:
-            print(f"   平均想定利益: ¥{stats['平均想定利益']:,.0f}")
+def create_reports(df: pd.DataFrame, total_rows: int | None = None, store: SnapshotStore | None = None) -> None:
+    """最新スナップショットの分析・グラフ・HTMLレポートを作成
 
-    stats_df = pd.DataFrame(genre_stats)
+    レポートは台湾（TWD）の商品が対象。累計CSVに他の地域の行があっても除外する。
 
-    print("\n" + "-" * 60)
-    print("【🏆 売れ筋ジャンルランキング】")
-    print("-" * 60)
+    Args:
+        df: 最新スナップショットを含むデータ（最新分だけでもよい）
+        total_rows: 累計データ数（省略時は len(df)）
+        store: df の保存先ストア（グラフの集計に使う。省略時は df から集計）
+    """
+    df = for_region(df)
+    analyze_results(df, total_rows)
 
-    ranking = stats_df.sort_values("総販売数", ascending=False)
+    # グラフ作成
+    summary = category_summary_for(df, store)
+    create_sales_chart(summary, "market_report.png")
+    create_profit_chart(summary, "profit_report.png")
 
-    for i, row in enumerate(ranking.itertuples(), 1):
-        medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-        print(f"\n{medal} {row.ジャンル}")
-        print(f"   総販売数: {row.総販売数:,}個 | 平均販売数: {row.平均販売数:,.0f}個")
+    # 利益額ランキング表示
+    profit_ranking = show_profit_ranking(df, top_n=15)
 
-    best_genre = ranking.iloc[0]
+    # お宝商品抽出
+    treasure_products = find_treasure_products(df, min_profit=500, min_sales=100, min_rating=4.5)
 
-    print("\n" + "=" * 60)
-    print("📈 【結論】")
-    print("=" * 60)
-    print(f"\n🎯 最も売れているジャンル: {best_genre['ジャンル']}")
-    print(f"   - 総販売数: {best_genre['総販売数']:,}個")
-    print(f"   - 平均販売数: {best_genre['平均販売数']:,.0f}個/商品")
-    print(f"   - 平均価格: NT${best_genre['平均価格']:,.0f}")
+    # HTMLレポート作成
+    create_html_report(
+        df, profit_ranking, treasure_products, "summary_report.html", total_rows,
+        quantiles=category_quantiles_for(df, store),
+    )
 
 
-def main():
-    """メイン処理"""
-    print("🚀 Shopee台湾リサーチツールを起動します\n")
+def run_pipeline(args: argparse.Namespace) -> None:
+    """取得 → 分析 → レポート作成"""
+    logger.info("🚀 Shopee台湾リサーチツールを起動します\n")
 
-    # 既存のCSVを削除（新規実行の場合）
-    if os.path.exists(OUTPUT_FILE):
+    # 既存のCSVを削除（--fresh 指定時のみ。既定では履歴に追記する）
+    if args.fresh and not args.resume and os.path.exists(OUTPUT_FILE):
         os.remove(OUTPUT_FILE)
-        print(f"📝 既存の {OUTPUT_FILE} を削除しました（新規実行）\n")
+        logger.info(f"📝 既存の {OUTPUT_FILE} を削除しました（新規実行）\n")
 
     # スクレイピング実行
     scraper = ShopeeScraper()
-    df = scraper.run(SEARCH_KEYWORDS)
+    df = scraper.run(SEARCH_KEYWORDS, use_sample=args.sample, resume=args.resume)
 
     # データ分析
     if not df.empty:
-        analyze_results(df)
+        create_reports(df, store=SnapshotStore())
 
-        # グラフ作成
-        create_sales_chart(df, "market_report.png")
-        create_profit_chart(df, "profit_report.png")
-
-        # 利益額ランキング表示
-        profit_ranking = show_profit_ranking(df, top_n=15)
+    else:
+        logger.error("\n❌ データの取得に失敗しました")
 
-        # お宝商品抽出
-        treasure_products = find_treasure_products(df, min_profit=500, min_sales=100, min_rating=4.5)
+    logger.info("\n" + "=" * 60 + "\n✨ 処理完了\n" + "=" * 60)
 
-        # HTMLレポート作成
-        create_html_report(df, profit_ranking, treasure_products, "summary_report.html")
 
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Shopee台湾リサーチツール")
+    parser.add_argument("--sample", action="store_true", help="サンプルデータを使用（デモ用）")
+    parser.add_argument("--resume", action="store_true", help="中断したスイープを再開")
+    parser.add_argument("--fresh", action="store_true", help=f"既存の {OUTPUT_FILE} を削除してから実行")
+    parser.add_argument("--metrics", metavar="FILE", help="処理時間・カウンターを出力（.prom=Prometheus形式, それ以外=JSON Lines）")
+    parser.add_argument("--profile", nargs="?", const="profile.prof", metavar="FILE", help="cProfile の結果を出力（既定: profile.prof）")
+    parser.add_argument("--log-level", default="INFO", help="ログレベル（DEBUG / INFO / WARNING）")
+    parser.add_argument("--log-format", choices=["console", "json"], default="console", help="ログ形式")
+    parser.add_argument("--report", metavar="FILE", help="商品テーブルなどの詳細レポートの出力先")
+    args = parser.parse_args()
+
+    setup_logging(args.log_level, args.log_format, args.report)
+
+    if args.profile:
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.runcall(run_pipeline, args)
+        profiler.dump_stats(args.profile)
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(20)
+        logger.info(f"\n🔬 プロファイルを {args.profile} に保存しました（上位20件）", extra=log_fields(output=args.profile))
+        report(stream.getvalue())
     else:
-        print("\n❌ データの取得に失敗しました")
+        run_pipeline(args)
 
-    print("\n" + "=" * 60)
-    print("✨ 処理完了")
-    print("=" * 60)
+    logger.info("\n⏱️  処理時間\n" + METRICS.summary(), extra=log_fields(metrics=METRICS.snapshot()))
+    if args.metrics:
+        METRICS.write(args.metrics)
+        logger.info(f"\n📈 計測結果を {args.metrics} に保存しました", extra=log_fields(output=args.metrics))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+"""マーケットプレイス（地域）の定義とリクエストの予算
+
+地域ごとに異なる API のベースURL・通貨・価格の単位・言語ヘッダー・Cookie のドメインをまとめる。
+設定値は config.MARKETPLACES から読み込む。
+
+- 価格は API の整数値を PRICE_DIVISOR で割り、地域の通貨の桁数（price_digits）に丸める
+- 利益計算のレートは 1現地通貨あたりの円（台湾は為替レートの取得元の現在値）
+- 検索語は地域ごとに置き換える（保存するキーワードは SEARCH_KEYWORDS のまま。地域間で比較できるように）
+- RateBudget は同じ地域のセッションで共有するリクエスト間隔の下限
+
+コストモデルの手数料の段階表（fee_schedule）の価格は台湾ドル基準のため、他の地域では目安となる。
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from urllib.parse import urlsplit
+
+from config import DEFAULT_REGION, MARKETPLACES, PRICE_DIVISOR, REQUESTS_PER_MINUTE
+from item_schema import ITEM_FIELDS, ItemParser
+from rates import get_rate_provider
+from sensitivity import AXES
+
+
+@dataclass(frozen=True)
+class Marketplace:
+    """1地域の Shopee"""
+
+    region: str
+    base_url: str
+    currency: str
+    exchange_rate: float | None      # 1現地通貨あたりの円（None=為替レートの取得元）
+    locale: str
+    language: str                    # X-Shopee-Language / language Cookie
+    accept_language: str
+    timezone_id: str
+    geolocation: dict
+    price_digits: int = 0
+    price_divisor: int = PRICE_DIVISOR
+    queries: dict = field(default_factory=dict)
+    requests_per_minute: float = REQUESTS_PER_MINUTE
+
+    def __hash__(self) -> int:
+        return hash((self.region, self.base_url))
+
+    @property
+    def cookie_domain(self) -> str:
+        """Cookie のドメイン（.shopee.tw など）"""
+        return "." + (urlsplit(self.base_url).hostname or "").removeprefix("www.")
+
+    def jpy_rate(self) -> float:
+        """利益計算のレート（1現地通貨あたりの円）"""
+        if self.exchange_rate is not None:
+            return self.exchange_rate
+        return get_rate_provider().get()
+
+    def rate_range(self) -> tuple[float, float]:
+        """ダッシュボード・感度分析の為替レートの範囲（台湾は AXES の範囲、他の地域は既定レートの ±50%）"""
+        if self.exchange_rate is None:
+            return AXES["exchange_rate"]
+        return self.exchange_rate * 0.5, self.exchange_rate * 1.5
+
+    def format_price(self, value: float) -> str:
+        """価格の表示（NT$1,234 / MYR 12.34）"""
+        if self.currency == "TWD":
+            return f"NT${value:,.0f}"
+        return f"{self.currency} {value:,.{self.price_digits}f}"
+
+    def with_base_url(self, base_url: str) -> "Marketplace":
+        """ベースURLだけを変えたコピー（ローカルのモックサーバー用）"""
+        return replace(self, base_url=base_url.rstrip("/"))
+
+    def query(self, keyword: str) -> str:
+        """キーワードの現地での検索語"""
+        return self.queries.get(keyword, keyword)
+
+    def headers(self) -> dict:
+        """API リクエストの地域別ヘッダー"""
+        return {
+            "Accept-Language": self.accept_language,
+            "Referer": f"{self.base_url}/",
+            "X-Shopee-Language": self.language,
+        }
+
+    def browser_config(self) -> dict:
+        """ブラウザ設定（config.BROWSER_CONFIG と同じ形）"""
+        return {
+            "locale": self.locale,
+            "timezone_id": self.timezone_id,
+            "geolocation": self.geolocation,
+            "permissions": ["geolocation"],
+        }
+
+    @cached_property
+    def item_parser(self) -> ItemParser:
+        """価格の単位・桁数を地域に合わせた商品データの正規化"""
+        fields = tuple(
+            replace(f, unit=self.price_divisor, digits=self.price_digits) if f.name == "price" else f
+            for f in ITEM_FIELDS
+        )
+        return ItemParser(fields)
+
+
+def get_marketplace(region: str = DEFAULT_REGION) -> Marketplace:
+    """地域コード（tw / my / sg / th / ph / vn）のマーケットプレイス"""
+    if region not in MARKETPLACES:
+        raise ValueError(f"不明な地域です: {region}（{', '.join(MARKETPLACES)}）")
+    return Marketplace(region=region, **MARKETPLACES[region])
+
+
+DEFAULT_MARKETPLACE = get_marketplace()
+
+
+class RateBudget:
+    """リクエスト間隔の下限（スレッドセーフ。同じ地域のセッションで共有）"""
+
+    def __init__(self, requests_per_minute: float = REQUESTS_PER_MINUTE):
+        self.interval = 60.0 / requests_per_minute
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def acquire(self) -> None:
+        """次のリクエストを送れるまで待機"""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class BudgetedSession:
+    """GET の前に RateBudget を待つセッション（requests.Session の代わりに使える）"""
+
+    def __init__(self, session, budget: RateBudget):
+        self._session = session
+        self.budget = budget
+
+    def get(self, *args, **kwargs):
+        self.budget.acquire()
+        return self._session.get(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
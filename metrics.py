@@ -0,0 +1,130 @@
+"""軽量な計測レイヤー（タイマー・カウンター）
+
+使い方:
+    with span("scraper.http"):
+        ...
+
+    @timed("report.html")
+    def create_html_report(...): ...
+
+    incr("scraper.products", len(products))
+
+集計結果は JSON Lines または Prometheus テキスト形式で出力できる。
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+
+class Metrics:
+    """プロセス内のタイマー・カウンター集計"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timers: dict[str, list[float]] = {}   # name -> [回数, 合計秒, 最大秒]
+        self.counters: dict[str, float] = {}
+
+    def observe(self, name: str, seconds: float) -> None:
+        """処理時間を1件記録"""
+        with self._lock:
+            stats = self.timers.get(name)
+            if stats is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                if seconds > stats[2]:
+                    stats[2] = seconds
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """カウンターを加算"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def span(self, name: str):
+        """ブロックの処理時間を記録"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def timed(self, name: str):
+        """関数の処理時間を記録するデコレーター"""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        """集計をクリア"""
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> list[dict]:
+        """集計結果をレコードのリストで返す"""
+        with self._lock:
+            records = [
+                {"type": "timer", "name": name, "count": int(count), "total_s": total, "max_s": max_s}
+                for name, (count, total, max_s) in sorted(self.timers.items())
+            ]
+            records += [
+                {"type": "counter", "name": name, "value": value}
+                for name, value in sorted(self.counters.items())
+            ]
+        return records
+
+    def to_json_lines(self) -> str:
+        """JSON Lines 形式で出力"""
+        now = time.time()
+        return "".join(json.dumps({"ts": now, **r}, ensure_ascii=False) + "\n" for r in self.snapshot())
+
+    def to_prometheus(self, prefix: str = "shopee_research") -> str:
+        """Prometheus テキスト形式で出力"""
+        lines = []
+        for r in self.snapshot():
+            name = f"{prefix}_{r['name'].replace('.', '_')}"
+            if r["type"] == "timer":
+                lines.append(f"# TYPE {name}_seconds summary")
+                lines.append(f"{name}_seconds_count {r['count']}")
+                lines.append(f"{name}_seconds_sum {r['total_s']:.6f}")
+                lines.append(f"{name}_seconds_max {r['max_s']:.6f}")
+            else:
+                lines.append(f"# TYPE {name}_total counter")
+                lines.append(f"{name}_total {r['value']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """ファイルに出力（拡張子 .prom は Prometheus 形式、それ以外は JSON Lines）"""
+        content = self.to_prometheus() if path.endswith(".prom") else self.to_json_lines()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def summary(self) -> str:
+        """処理時間の一覧（合計時間の長い順）"""
+        rows = sorted(self.snapshot(), key=lambda r: -r.get("total_s", -1))
+        lines = [f"{'処理':<32} {'回数':>6} {'合計(ms)':>10} {'最大(ms)':>10}"]
+        for r in rows:
+            if r["type"] == "timer":
+                lines.append(f"{r['name']:<32} {r['count']:>6} {r['total_s'] * 1000:>10.1f} {r['max_s'] * 1000:>10.1f}")
+            else:
+                lines.append(f"{r['name']:<32} {r['value']:>6,}")
+        return "\n".join(lines)
+
+
+# プロセス共通の集計
+METRICS = Metrics()
+span = METRICS.span
+timed = METRICS.timed
+incr = METRICS.incr
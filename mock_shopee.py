@@ -0,0 +1,163 @@
+"""Shopee API のローカルモック（オフラインでの動作確認用）
+
+サンプルデータ（SAMPLE_PRODUCTS）から検索APIと店舗APIの応答を返す。
+- 商品の shopid は商品名のブランド（最初の語）から決まるため、同じ店舗が複数の商品・キーワードに現れる
+- 他の地域の検索語（config.MARKETPLACES の queries）は元のキーワードとして検索する
+- 店舗ごとのリクエスト回数を記録し、/_stats で確認できる（同じ店舗を2回取得していないかの確認用）
+
+エンドポイント:
+    GET /api/v4/search/search_items?keyword=...&limit=30
+    GET /api/v2/search_items/?keyword=...&limit=30
+    GET /api/v4/shop/get_shop_base?shopid=...
+    GET /_stats
+
+使い方:
+    python mock_shopee.py --port 8900
+    python scraper.py --base-url http://127.0.0.1:8900
+"""
+
+import argparse
+import json
+import threading
+import zlib
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+from config import MARKETPLACES
+from log import get_logger, log_fields, setup_logging
+from sample_data import SAMPLE_PRODUCTS
+
+logger = get_logger("mock_shopee")
+
+# 地域の検索語 → キーワード
+KEYWORDS_BY_QUERY = {
+    query: keyword
+    for marketplace in MARKETPLACES.values()
+    for keyword, query in marketplace.get("queries", {}).items()
+}
+
+
+def _id(text: str) -> int:
+    return zlib.crc32(text.encode("utf-8")) % 10**9 + 1
+
+
+def mock_item(product: dict) -> dict:
+    """サンプル商品を検索APIの item 形式に変換"""
+    return {
+        "item_basic": {
+            "itemid": _id(product["name"]),
+            "shopid": _id(product["name"].split()[0]),
+            "name": product["name"],
+            "price": int(product["price"] * 100000),
+            "historical_sold": product["sales"],
+            "item_rating": {"rating_star": product["shop_rating"]},
+        }
+    }
+
+
+def mock_shop(shopid: int) -> dict:
+    """shopid から決まる店舗情報"""
+    return {
+        "shopid": shopid,
+        "name": f"日本直送 {shopid % 1000:03d}",
+        "follower_count": shopid % 50000,
+        "item_count": shopid % 3000 + 1,
+        "rating_star": round(4.0 + shopid % 100 / 100, 2),
+        "is_official_shop": shopid % 7 == 0,
+    }
+
+
+class MockState:
+    """リクエスト回数の記録（スレッドセーフ）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.search_requests = 0
+        self.shop_requests: dict[int, int] = {}
+
+    def search(self, keyword: str, limit: int) -> dict:
+        with self._lock:
+            self.search_requests += 1
+        keyword = KEYWORDS_BY_QUERY.get(keyword, keyword)
+        items = [mock_item(p) for p in SAMPLE_PRODUCTS if p["keyword"] == keyword]
+        return {"items": items[:limit]}
+
+    def shop(self, shopid: int) -> dict:
+        with self._lock:
+            self.shop_requests[shopid] = self.shop_requests.get(shopid, 0) + 1
+        return {"error": 0, "data": mock_shop(shopid)}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "search_requests": self.search_requests,
+                "shop_requests": sum(self.shop_requests.values()),
+                "distinct_shops": len(self.shop_requests),
+                "max_requests_per_shop": max(self.shop_requests.values(), default=0),
+            }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """GET のみ受け付けるハンドラー"""
+
+    protocol_version = "HTTP/1.1"
+    state: MockState  # make_server で設定
+
+    def _send(self, status: HTTPStatus, data: dict) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/")
+        query = dict(parse_qsl(url.query))
+        try:
+            if path in ("/api/v4/search/search_items", "/api/v2/search_items"):
+                self._send(HTTPStatus.OK, self.state.search(query.get("keyword", ""), int(query.get("limit", 30))))
+            elif path == "/api/v4/shop/get_shop_base":
+                self._send(HTTPStatus.OK, self.state.shop(int(query["shopid"])))
+            elif path == "/_stats":
+                self._send(HTTPStatus.OK, self.state.stats())
+            else:
+                self._send(HTTPStatus.NOT_FOUND, {"error": f"不明なパスです: {path}"})
+        except (KeyError, ValueError) as e:
+            self._send(HTTPStatus.BAD_REQUEST, {"error": f"パラメータが不正です: {e}"})
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(format % args, extra=log_fields(per_item=True, client=self.client_address[0]))
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8900) -> ThreadingHTTPServer:
+    """モックサーバーを作成"""
+    handler = type("BoundMockHandler", (MockHandler,), {"state": MockState()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="Shopee API のローカルモック")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けアドレス")
+    parser.add_argument("--port", type=int, default=8900, help="待ち受けポート")
+    args = parser.parse_args()
+
+    setup_logging()
+    server = make_server(args.host, args.port)
+    logger.info(f"🧪 モック API: http://{args.host}:{args.port}/ で待ち受けています", extra=log_fields(host=args.host, port=args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info("🛑 モック API を停止しました")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""利益計算（スカラー・Series共通）
+
+計算式:
+- 販売価格（円） = 販売価格（TWD） × 為替レート
+- 想定利益（円） = 販売価格（円） × (1 - 手数料率) - 販売価格（円） × 原価率 - 固定コスト
+
+パラメータを固定すると利益は価格の一次式になるため、
+利益の閾値はそのまま価格の閾値に変換できる。
+"""
+
+from dataclasses import dataclass
+
+import pandas as pd
+
+from config import EXCHANGE_RATE, SALES_FEE_RATE, FIXED_COST_JPY, COST_RATE
+
+
+@dataclass(frozen=True)
+class ProfitParams:
+    """利益計算パラメータ"""
+
+    exchange_rate: float = EXCHANGE_RATE
+    fee_rate: float = SALES_FEE_RATE
+    fixed_cost: float = FIXED_COST_JPY
+    cost_rate: float = COST_RATE
+
+    @property
+    def margin(self) -> float:
+        """価格1TWDあたりの利益（円）。利益 = 価格 × margin - 固定コスト"""
+        return self.exchange_rate * (1 - self.fee_rate - self.cost_rate)
+
+
+DEFAULT_PARAMS = ProfitParams()
+
+
+def calculate_profit(price, params: ProfitParams = DEFAULT_PARAMS) -> dict:
+    """利益を計算（price はスカラーでも Series でもよい）
+
+    Returns:
+        dict: price_jpy / revenue / cost / profit
+    """
+    price_jpy = price * params.exchange_rate
+    revenue = price_jpy * (1 - params.fee_rate)
+    cost = price_jpy * params.cost_rate
+    return {
+        "price_jpy": price_jpy,
+        "revenue": revenue,
+        "cost": cost,
+        "profit": revenue - cost - params.fixed_cost,
+    }
+
+
+def stored_profit_columns(price, params: ProfitParams = DEFAULT_PARAMS) -> dict:
+    """保存用の利益列（円単位に丸める）
+
+    Returns:
+        dict: price_jpy / estimated_cost_jpy / estimated_profit_jpy
+    """
+    result = calculate_profit(price, params)
+    return {
+        "price_jpy": round(result["price_jpy"], 0),
+        "estimated_cost_jpy": round(result["cost"], 0),
+        "estimated_profit_jpy": round(result["profit"], 0),
+    }
+
+
+def with_profit(df: pd.DataFrame, params: ProfitParams = DEFAULT_PARAMS) -> pd.DataFrame:
+    """利益関連の列を追加したコピーを返す"""
+    df = df.copy()
+    for col, values in calculate_profit(df["price"], params).items():
+        df[col] = values
+    return df
+
+
+def price_range_for_profit(min_profit: float, params: ProfitParams = DEFAULT_PARAMS):
+    """「利益 >= min_profit」を満たす価格範囲を返す
+
+    Returns:
+        (下限, 上限) のタプル（None は上下限なし）。該当する価格がない場合は None
+    """
+    margin = params.margin
+    need = min_profit + params.fixed_cost
+
+    if margin == 0:
+        # 利益は価格によらず -固定コスト
+        return (None, None) if need <= 0 else None
+
+    bound = need / margin
+    # 浮動小数点の丸めで境界の商品を落とさないよう少し広げる（行単位で再判定する）
+    slack = abs(bound) * 1e-9 + 1e-9
+    if margin > 0:
+        return (bound - slack, None)
+    return (None, bound + slack)
@@ -0,0 +1,118 @@
+"""ダッシュボード用クエリ層（述語プッシュダウン）
+
+キーワード・販売数の条件はパーティションと列統計に、
+利益の条件は価格の範囲条件に変換してストアに渡し、読み込み前に絞り込む。
+コストモデル使用時は利益が価格の一次式にならないため、利益の条件は読み込み後に判定する。
+
+カテゴリ別の集計・分位点は、条件で除外される行がなければパーティションの集計値・スケッチから計算する。
+価格は地域の通貨のため、クエリは常に1地域（既定は台湾）を対象とする。
+"""
+
+import pandas as pd
+
+from analytics import category_summary
+from config import DEFAULT_REGION
+from cost_model import CostModel
+from profit import DEFAULT_PARAMS, ProfitParams, price_range_for_profit, with_profit
+from storage import SnapshotStore
+
+
+def _pushdown_ranges(min_profit, min_sales, params: ProfitParams, cost_model: CostModel | None) -> dict | None:
+    """ストアに渡す範囲条件（該当する価格がなければ None）"""
+    ranges = {}
+    if min_sales is not None:
+        ranges["sales"] = (min_sales, None)
+    if min_profit is not None and cost_model is None:
+        price_range = price_range_for_profit(min_profit, params)
+        if price_range is None:
+            return None
+        if price_range != (None, None):
+            ranges["price"] = price_range
+    return ranges
+
+
+def query_products(
+    store: SnapshotStore,
+    keywords: list[str] | None = None,
+    min_profit: float | None = None,
+    min_sales: float | None = None,
+    params: ProfitParams = DEFAULT_PARAMS,
+    cost_model: CostModel | None = None,
+    region: str = DEFAULT_REGION,
+) -> pd.DataFrame:
+    """条件に合う商品を読み込み、指定パラメータで利益を再計算して返す
+
+    Args:
+        store: 読み込み元のストア
+        keywords: 対象キーワード（None=すべて）
+        min_profit: 最低想定利益（円）
+        min_sales: 最低販売数
+        params: 利益計算パラメータ
+        cost_model: コストモデル（指定時は params の為替レートだけを使う）
+        region: 対象地域（params の為替レートはこの地域の通貨のもの）
+    """
+    ranges = _pushdown_ranges(min_profit, min_sales, params, cost_model)
+    if ranges is None:
+        return pd.DataFrame()
+
+    df = store.scan(keywords=keywords, ranges=ranges, region=region)
+    if df.empty:
+        return df
+
+    df = cost_model.with_profit(df, params.exchange_rate) if cost_model else with_profit(df, params)
+    if min_profit is not None:
+        df = df[df["profit"] >= min_profit]
+    return df
+
+
+def query_category_summary(
+    store: SnapshotStore,
+    keywords: list[str] | None = None,
+    min_profit: float | None = None,
+    min_sales: float | None = None,
+    params: ProfitParams = DEFAULT_PARAMS,
+    cost_model: CostModel | None = None,
+    region: str = DEFAULT_REGION,
+) -> pd.DataFrame | None:
+    """キーワード別の総販売数・平均利益をパーティションの集計値から計算（引数は query_products と同じ）
+
+    条件で一部の行だけが除外されるパーティションがある場合や、コストモデルが価格の一次式で
+    表せない場合は None（呼び出し側で query_products の結果から集計する）。
+
+    Returns:
+        DataFrame: analytics.category_summary の結果
+    """
+    if cost_model is not None and min_profit is not None:
+        return None
+    ranges = _pushdown_ranges(min_profit, min_sales, params, cost_model)
+    if ranges is None:
+        return pd.DataFrame(columns=["rows", "sales", "mean_price", "mean_profit"])
+
+    rollups = store.rollups(keywords=keywords, ranges=ranges, region=region)
+    if rollups is None:
+        return None
+    if cost_model is None:
+        return category_summary(rollups, params)
+    return category_summary(rollups.assign(rate=params.exchange_rate), cost_model=cost_model)
+
+
+def query_sketches(
+    store: SnapshotStore,
+    keywords: list[str] | None = None,
+    min_profit: float | None = None,
+    min_sales: float | None = None,
+    params: ProfitParams = DEFAULT_PARAMS,
+    cost_model: CostModel | None = None,
+    region: str = DEFAULT_REGION,
+) -> dict | None:
+    """キーワード別の分位点スケッチ（引数・None を返す条件は query_category_summary と同じ）
+
+    Returns:
+        dict: SnapshotStore.sketches の結果
+    """
+    if cost_model is not None and min_profit is not None:
+        return None
+    ranges = _pushdown_ranges(min_profit, min_sales, params, cost_model)
+    if ranges is None:
+        return {}
+    return store.sketches(keywords=keywords, ranges=ranges, region=region)
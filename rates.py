@@ -0,0 +1,173 @@
+"""為替レート（TWD → JPY）の取得とスナップショット別レート表
+
+- レートの取得元はファイルまたはローカルのサービス（RATE_FILE / RATE_URL）
+- 取得したレートは TTL の間キャッシュし、取得に失敗したら前回値（なければ EXCHANGE_RATE）を使う
+- スナップショットごとのレートは research_store/rates.json に記録する。
+  保存済みの利益列は読み込み時にこのレートから計算し直すため、
+  過去のレートを修正してもパーティションの書き直しは不要
+
+使い方:
+    python rates.py                          # 現在のレートと記録済みのレートを表示
+    python rates.py --set 20250101-120000 4.65
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from functools import cache
+
+from config import EXCHANGE_RATE, RATE_FILE, RATE_TTL, RATE_URL, STORE_DIR
+from log import get_logger, log_fields, setup_logging
+
+logger = get_logger("rates")
+
+RATES_FILE = "rates.json"
+
+
+def _parse_rate(data) -> float:
+    """{"rate": x} または数値からレートを取り出す"""
+    rate = float(data["rate"] if isinstance(data, dict) else data)
+    if rate <= 0:
+        raise ValueError(f"レートが不正です: {rate}")
+    return rate
+
+
+class StaticRateProvider:
+    """固定レート"""
+
+    def __init__(self, rate: float = EXCHANGE_RATE):
+        self.rate = rate
+
+    def fetch(self) -> float:
+        return self.rate
+
+
+class FileRateProvider:
+    """ファイルからレートを読む（{"rate": 4.8} または数値のみ）"""
+
+    def __init__(self, path: str = RATE_FILE):
+        self.path = path
+
+    def fetch(self) -> float:
+        with open(self.path, encoding="utf-8") as f:
+            return _parse_rate(json.load(f))
+
+
+class HttpRateProvider:
+    """ローカルのサービスからレートを取得（{"rate": 4.8} を返す URL）"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self) -> float:
+        from urllib.request import urlopen
+
+        with urlopen(self.url, timeout=self.timeout) as response:
+            return _parse_rate(json.load(response))
+
+
+class CachedRateProvider:
+    """TTL 付きでレートをキャッシュ（スレッドセーフ）"""
+
+    def __init__(self, source, ttl: float = RATE_TTL, fallback: float = EXCHANGE_RATE):
+        self.source = source
+        self.ttl = ttl
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._rate: float | None = None
+        self._fetched_at = 0.0
+
+    def get(self) -> float:
+        """現在のレート"""
+        with self._lock:
+            now = time.monotonic()
+            if self._rate is not None and now - self._fetched_at < self.ttl:
+                return self._rate
+            try:
+                self._rate = self.source.fetch()
+            except Exception as e:
+                logger.warning(
+                    f"⚠️ 為替レートを取得できませんでした（{e}）。{self._rate or self.fallback} を使用します",
+                    extra=log_fields(source=type(self.source).__name__, error=repr(e)),
+                )
+                if self._rate is None:
+                    self._rate = self.fallback
+            self._fetched_at = now
+            return self._rate
+
+
+@cache
+def get_rate_provider() -> CachedRateProvider:
+    """設定に従ったレート取得元（プロセスで共有）"""
+    if RATE_URL:
+        source = HttpRateProvider(RATE_URL)
+    elif os.path.exists(RATE_FILE):
+        source = FileRateProvider(RATE_FILE)
+    else:
+        source = StaticRateProvider()
+    return CachedRateProvider(source)
+
+
+class RateTable:
+    """スナップショット別のレート表（research_store/rates.json）"""
+
+    def __init__(self, root: str = STORE_DIR):
+        self.path = os.path.join(root, RATES_FILE)
+        self._cache: tuple[int, dict[str, float]] | None = None
+
+    def version(self) -> int:
+        """レート表の更新時刻（キャッシュキー用）。未作成なら 0"""
+        if not os.path.exists(self.path):
+            return 0
+        return os.stat(self.path).st_mtime_ns
+
+    def rates(self) -> dict[str, float]:
+        """{スナップショットID: レート}"""
+        version = self.version()
+        if version == 0:
+            return {}
+        if self._cache is None or self._cache[0] != version:
+            with open(self.path, encoding="utf-8") as f:
+                self._cache = (version, json.load(f)["rates"])
+        return self._cache[1]
+
+    def get(self, snapshot_id: str) -> float | None:
+        """スナップショットのレート（未記録なら None = 保存時の値をそのまま使う）"""
+        return self.rates().get(snapshot_id)
+
+    def set(self, snapshot_id: str, rate: float) -> None:
+        """レートを記録（一時ファイル + rename で原子的に更新）"""
+        rates = {**self.rates(), snapshot_id: _parse_rate(rate)}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "rates": dict(sorted(rates.items()))}, f, indent=1)
+        os.replace(tmp_path, self.path)
+        self._cache = None
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="為替レートの確認・スナップショット別レートの修正")
+    parser.add_argument("--set", nargs=2, metavar=("SNAPSHOT_ID", "RATE"), help="スナップショットのレートを変更")
+    parser.add_argument("--store", default=STORE_DIR, help="スナップショットストア")
+    args = parser.parse_args()
+
+    setup_logging()
+    table = RateTable(args.store)
+    if args.set:
+        snapshot_id, rate = args.set
+        table.set(snapshot_id, float(rate))
+        logger.info(f"✅ {snapshot_id} のレートを {float(rate)} に変更しました", extra=log_fields(snapshot_id=snapshot_id, rate=float(rate)))
+        return
+
+    lines = [f"💱 現在のレート: 1 TWD = {get_rate_provider().get()} JPY", "", "スナップショット別:"]
+    lines += [f"   {snapshot_id}: {rate}" for snapshot_id, rate in table.rates().items()] or ["   （記録なし）"]
+    logger.info("\n".join(lines))
+
+
+if __name__ == "__main__":
+    main()
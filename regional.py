@@ -0,0 +1,180 @@
+"""複数地域の並列スイープ（地域間の比較リサーチ用）
+
+地域（Marketplace）ごとに1スレッドで取得し、結果を1つのストアに地域つきで保存する。
+- 各地域は自分の RateBudget（リクエスト間隔の下限）を持ち、地域内の全セッションで共有する
+- 各地域は REGION_SESSIONS 個のセッション（ShopeeScraper）を持ち、キーワードを並列に取得する
+- 店舗情報は地域ごとにまとめて付与する（shopid は地域ごとの番号のため、キャッシュも地域別）
+- 各地域はパーティションを書き込むだけでコミットしない
+- 全地域の完了後、地域ごとのレートを記録してマニフェストへ一括コミット（原子的）
+
+スナップショットIDは地域ごとに分かれる（storage.region_snapshot_id）。
+価格は地域の通貨のため、ストア・クエリ・ダッシュボードの読み込みは1地域ずつ（既定は台湾）。
+サンプルモードは台湾のサンプルデータと台湾のレートを全地域で使う（動作確認用）。
+
+使い方:
+    python regional.py --regions tw,my,sg
+    python regional.py --regions tw,my --base-url http://127.0.0.1:8900   # ローカルのモックサーバー
+    python regional.py --sample
+"""
+
+import argparse
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+
+from config import DEFAULT_REGION, MARKETPLACES, REGION_SESSIONS, SEARCH_KEYWORDS, STORE_DIR
+from log import get_logger, log_fields, setup_logging
+from marketplace import Marketplace, RateBudget, get_marketplace
+from metrics import span
+from scraper import ShopeeScraper, order_columns, to_dataframe
+from storage import SnapshotStore, region_snapshot_id
+
+logger = get_logger("regional")
+
+
+def _sweep_region(
+    marketplace: Marketplace,
+    keywords: list[str],
+    timestamp: str,
+    use_sample: bool,
+    store_root: str,
+    sessions: int,
+) -> tuple[str, list[dict], float]:
+    """1地域のキーワードを取得してパーティションを書き込む
+
+    Returns:
+        tuple: (スナップショットID, コミット待ちのパーティション情報, 利益計算のレート)
+    """
+    snapshot_id = region_snapshot_id(timestamp, marketplace.region)
+    if use_sample:
+        # サンプルデータは台湾ドルの価格のため、台湾のレートで計算する
+        exchange_rate = get_marketplace(DEFAULT_REGION).jpy_rate()
+    else:
+        exchange_rate = marketplace.jpy_rate()
+
+    budget = RateBudget(marketplace.requests_per_minute)
+    pool: queue.Queue[ShopeeScraper] = queue.Queue()
+    for _ in range(max(1, sessions)):
+        pool.put(ShopeeScraper(exchange_rate, marketplace=marketplace, budget=budget))
+
+    def fetch(keyword: str) -> pd.DataFrame | list[dict]:
+        scraper = pool.get()
+        try:
+            if use_sample:
+                return scraper.sample_frame(keyword)
+            return scraper.search_products(keyword)
+        finally:
+            pool.put(scraper)
+
+    with span("regional.sweep_region"):
+        with ThreadPoolExecutor(max_workers=pool.qsize()) as executor:
+            results = list(executor.map(fetch, keywords))
+
+        if use_sample:
+            frames = [frame for frame in results if not frame.empty]
+            df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        else:
+            products = [product for result in results for product in result]
+            if products:
+                products = pool.get().enrich_with_shops(products)
+            df = to_dataframe(products)
+
+        entries = []
+        if not df.empty:
+            df = order_columns(df.assign(timestamp=timestamp, region=marketplace.region))
+            store = SnapshotStore(store_root)
+            entries = [
+                store.stage_partition(group, snapshot_id, keyword)
+                for keyword, group in df.groupby("keyword", sort=False)
+            ]
+
+    rows = sum(entry["rows"] for entry in entries)
+    logger.info(f"   ✅ {marketplace.region}: {len(entries)}キーワード / {rows} 商品",
+                extra=log_fields(region=marketplace.region, snapshot_id=snapshot_id, partitions=len(entries), rows=rows))
+    return snapshot_id, entries, exchange_rate
+
+
+def run_regions(
+    regions: list[str],
+    keywords: list[str] | None = None,
+    sessions: int = REGION_SESSIONS,
+    use_sample: bool = False,
+    store_root: str = STORE_DIR,
+    base_url: str | None = None,
+) -> list[str]:
+    """複数地域を並列に取得し、地域別のスナップショットとして一括コミット
+
+    Args:
+        regions: 地域コードのリスト（tw / my / sg / th / ph / vn）
+        keywords: 検索キーワードリスト（地域ごとの検索語は Marketplace.query で置き換える）
+        sessions: 地域ごとのセッション数
+        use_sample: True=サンプルデータ使用
+        store_root: 保存先ストア
+        base_url: 全地域の API のベースURL（ローカルのモックサーバー用。None=地域の既定値）
+
+    Returns:
+        list[str]: コミットしたスナップショットID
+    """
+    if keywords is None:
+        keywords = SEARCH_KEYWORDS
+    if not regions or not keywords:
+        logger.warning("⚠️ 地域またはキーワードがないため、何も取得しません")
+        return []
+    marketplaces = [get_marketplace(region) for region in regions]
+    if base_url:
+        marketplaces = [marketplace.with_base_url(base_url) for marketplace in marketplaces]
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    logger.info(
+        "=" * 60 + "\n🌏 Shopee 複数地域スイープ\n" + "=" * 60
+        + f"\n   取得日時: {timestamp}\n   地域: {', '.join(regions)} / キーワード数: {len(keywords)}",
+        extra=log_fields(regions=",".join(regions), keywords=len(keywords), sessions=sessions,
+                         mode="sample" if use_sample else "api"),
+    )
+
+    results = []
+    with ThreadPoolExecutor(max_workers=len(marketplaces)) as executor:
+        futures = [
+            executor.submit(_sweep_region, marketplace, keywords, timestamp, use_sample, store_root, sessions)
+            for marketplace in marketplaces
+        ]
+        # 1地域でも失敗した場合は例外となり、何もコミットしない
+        for future in futures:
+            results.append(future.result())
+
+    store = SnapshotStore(store_root)
+    entries = []
+    for snapshot_id, region_entries, exchange_rate in results:
+        if region_entries:
+            store.rates.set(snapshot_id, exchange_rate)
+            entries.extend(region_entries)
+    store.commit(entries)
+
+    snapshot_ids = [snapshot_id for snapshot_id, region_entries, _ in results if region_entries]
+    total = sum(entry["rows"] for entry in entries)
+    logger.info(
+        f"\n✅ {len(snapshot_ids)}地域のスナップショットをコミットしました\n   パーティション: {len(entries)} / 合計 {total} 商品",
+        extra=log_fields(snapshots=",".join(snapshot_ids), partitions=len(entries), rows=total),
+    )
+    return snapshot_ids
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="複数地域を並列に取得")
+    parser.add_argument("--regions", default=",".join(MARKETPLACES), help="地域コード（カンマ区切り。例: tw,my,sg）")
+    parser.add_argument("--sessions", type=int, default=REGION_SESSIONS, help="地域ごとのセッション数")
+    parser.add_argument("--sample", action="store_true", help="サンプルデータを使用")
+    parser.add_argument("--base-url", help="API のベースURL（例: ローカルのモックサーバー http://127.0.0.1:8900）")
+    parser.add_argument("--store", default=STORE_DIR, help="保存先ストア")
+    args = parser.parse_args()
+
+    setup_logging()
+    regions = [region.strip() for region in args.regions.split(",") if region.strip()]
+    run_regions(regions, sessions=args.sessions, use_sample=args.sample, store_root=args.store, base_url=args.base_url)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,17 @@
-"""サンプルデータ（デモ・テスト用）"""
+"""サンプルデータ（デモ・テスト用）
+
+SAMPLE_CATALOGUE はキーワード別に分けた読み取り専用の列データで、読み込み時に1回だけ作る。
+キーワードごとの取得は配列のスライス（コピーなし）で、利益列は
+(キーワード, レート, コストモデル) ごとに一括計算してキャッシュする。
+"""
+
+import threading
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+
+from cost_model import CostModel, load_cost_model
 
 SAMPLE_PRODUCTS = [
     # 日本 零食（お菓子）
@@ -193,3 +206,72 @@ SAMPLE_PRODUCTS = [
     {"keyword": "日本 美容", "name": "日本MELANO CC 藥用美白精華液", "price": 399, "sales": 35600, "shop_rating": 4.8},
     {"keyword": "日本 美容", "name": "日本LULULUN 面膜 保濕型 32入", "price": 599, "sales": 29400, "shop_rating": 4.7},
 ]
+
+
+def _freeze(values) -> np.ndarray:
+    array = np.asarray(values)
+    array.setflags(write=False)
+    return array
+
+
+class SampleCatalogue:
+    """キーワード別の読み取り専用カタログ（列ごとの配列）"""
+
+    def __init__(self, df: pd.DataFrame):
+        self._columns = MappingProxyType({
+            keyword: MappingProxyType({col: _freeze(group[col].to_numpy()) for col in group.columns})
+            for keyword, group in df.groupby("keyword", sort=False)
+        })
+        self._lock = threading.Lock()
+        # (キーワード, レート, コストモデルのバージョン) -> 利益列
+        self._profits: dict[tuple, MappingProxyType] = {}
+
+    @classmethod
+    def from_records(cls, products: list[dict]) -> "SampleCatalogue":
+        return cls(pd.DataFrame(products))
+
+    def keywords(self) -> list[str]:
+        return list(self._columns)
+
+    def __len__(self) -> int:
+        return sum(len(columns["name"]) for columns in self._columns.values())
+
+    def _profit_columns(self, keyword: str, exchange_rate: float, model: CostModel) -> MappingProxyType:
+        key = (keyword, exchange_rate, model.version)
+        with self._lock:
+            cached = self._profits.get(key)
+        if cached is None:
+            base = pd.DataFrame(dict(self._columns[keyword]), copy=False)
+            cached = MappingProxyType({
+                col: _freeze(values.to_numpy()) for col, values in model.stored_columns(base, exchange_rate).items()
+            })
+            with self._lock:
+                self._profits[key] = cached
+        return cached
+
+    def frame(
+        self,
+        keyword: str,
+        exchange_rate: float,
+        limit: int | None = None,
+        model: CostModel | None = None,
+    ) -> pd.DataFrame:
+        """キーワードの商品（利益計算済み）。該当がなければ空の DataFrame
+
+        Args:
+            keyword: 検索キーワード
+            exchange_rate: 為替レート
+            limit: 先頭から取り出す件数（None=すべて）
+            model: コストモデル（None=load_cost_model()）
+        """
+        columns = self._columns.get(keyword)
+        if columns is None:
+            return pd.DataFrame()
+        profits = self._profit_columns(keyword, exchange_rate, model or load_cost_model())
+        return pd.DataFrame(
+            {col: values[:limit] for col, values in {**columns, **profits}.items()},
+            copy=False,
+        )
+
+
+SAMPLE_CATALOGUE = SampleCatalogue.from_records(SAMPLE_PRODUCTS)
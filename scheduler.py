@@ -0,0 +1,244 @@
+"""定期実行デーモン（インターバル / cron 式）
+
+1回ごとにスイープを実行してスナップショットをストアへ追記し、
+今回のスナップショットだけからグラフ・HTMLレポートを作り直す（履歴全体は読み込まない）。
+実行状況は health.json に、処理時間は --metrics で指定したファイルに出力する。
+
+使い方:
+    python scheduler.py --interval 3600
+    python scheduler.py --cron "0 */2 * * *" --now
+"""
+
+import argparse
+import json
+import os
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+
+from config import SEARCH_KEYWORDS
+from log import get_logger, log_fields, setup_logging
+from metrics import METRICS, span
+from storage import SnapshotStore
+
+logger = get_logger("scheduler")
+
+HEALTH_FILE = "health.json"
+
+# cron の各フィールドの範囲（分, 時, 日, 月, 曜日）
+_CRON_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+
+def _parse_cron_field(field: str, low: int, high: int) -> frozenset[int]:
+    """cron の1フィールドを値の集合に変換（*, */n, a-b, a-b/n, a,b に対応）"""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-", 1))
+        else:
+            start = end = int(part)
+        if step < 1 or start < low or end > high + (1 if high == 6 else 0) or start > end:
+            raise ValueError(f"cron フィールドが不正です: {field}")
+        values.update(range(start, end + 1, step))
+    # 曜日の 7 は日曜（0）
+    if high == 6 and 7 in values:
+        values.discard(7)
+        values.add(0)
+    return frozenset(values)
+
+
+class IntervalSchedule:
+    """一定間隔で実行"""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("間隔は正の秒数を指定してください")
+        self.seconds = seconds
+
+    def next_after(self, t: datetime) -> datetime:
+        return t + timedelta(seconds=self.seconds)
+
+
+class CronSchedule:
+    """cron 式（分 時 日 月 曜日）で実行"""
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 式は5フィールドで指定してください: {expr}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_cron_field(f, low, high) for f, (low, high) in zip(fields, _CRON_RANGES)
+        )
+        # 日と曜日の両方が指定された場合はどちらかに一致すればよい（標準の cron と同じ）
+        self._day_restricted = fields[2] != "*"
+        self._weekday_restricted = fields[4] != "*"
+
+    def _day_matches(self, t: datetime) -> bool:
+        day_ok = t.day in self.days
+        weekday_ok = (t.weekday() + 1) % 7 in self.weekdays
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, t: datetime) -> datetime:
+        """t より後で最初に一致する時刻"""
+        t = t.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 4)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"一致する時刻がありません: {self.expr}")
+
+
+class Daemon:
+    """定期実行デーモン"""
+
+    def __init__(
+        self,
+        schedule,
+        keywords: list[str] | None = None,
+        use_sample: bool = False,
+        export_csv: bool = False,
+        health_file: str = HEALTH_FILE,
+        metrics_file: str | None = None,
+    ):
+        self.schedule = schedule
+        self.keywords = keywords or SEARCH_KEYWORDS
+        self.use_sample = use_sample
+        self.export_csv = export_csv
+        self.health_file = health_file
+        self.metrics_file = metrics_file
+        self.store = SnapshotStore()
+        self.stop_event = threading.Event()
+        self.health = {
+            "status": "starting",
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "runs": 0,
+            "failures": 0,
+            "last_run": None,
+            "last_duration_s": None,
+            "last_snapshot": None,
+            "last_error": None,
+            "next_run": None,
+        }
+
+    def _write_health(self, **updates) -> None:
+        """health.json を更新（一時ファイル + rename）"""
+        self.health.update(updates)
+        tmp_path = self.health_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({**self.health, "metrics": METRICS.snapshot()}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.health_file)
+        if self.metrics_file:
+            METRICS.write(self.metrics_file)
+
+    def run_once(self) -> None:
+        """スイープ1回分: 取得 → ストアに追記 → 今回分のレポート更新"""
+        # 分析関数は初回実行時に読み込む（待機中のメモリを抑える）
+        from main import create_reports
+        from scraper import ShopeeScraper
+
+        started = time.perf_counter()
+        self._write_health(status="running")
+        try:
+            with span("scheduler.sweep"):
+                df = ShopeeScraper().run(self.keywords, use_sample=self.use_sample, export_csv=self.export_csv)
+            if df.empty:
+                raise RuntimeError("データを取得できませんでした")
+
+            with span("scheduler.refresh"):
+                latest = df[df["timestamp"] == df["timestamp"].max()]
+                create_reports(latest, total_rows=self.store.row_count(), store=self.store)
+
+            duration = time.perf_counter() - started
+            self._write_health(
+                status="ok",
+                runs=self.health["runs"] + 1,
+                last_run=datetime.now().isoformat(timespec="seconds"),
+                last_duration_s=round(duration, 3),
+                last_snapshot=self.store.snapshots()[-1],
+                last_error=None,
+            )
+            logger.info(f"✅ スイープ完了（{duration:.1f}秒）", extra=log_fields(duration_s=round(duration, 3), rows=len(latest)))
+        except Exception as e:
+            self._write_health(
+                status="error",
+                failures=self.health["failures"] + 1,
+                last_run=datetime.now().isoformat(timespec="seconds"),
+                last_duration_s=round(time.perf_counter() - started, 3),
+                last_error=repr(e),
+            )
+            logger.exception(f"❌ スイープ失敗: {e}")
+
+    def serve(self, run_now: bool = False, max_runs: int | None = None) -> None:
+        """停止シグナルを受けるまでスケジュールに従って実行"""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stop_event.set())
+
+        runs = 0
+        next_run = datetime.now() if run_now else self.schedule.next_after(datetime.now())
+        while not self.stop_event.is_set() and (max_runs is None or runs < max_runs):
+            self._write_health(status="waiting", next_run=next_run.isoformat(timespec="seconds"))
+            logger.info(f"⏳ 次回実行: {next_run:%Y-%m-%d %H:%M:%S}", extra=log_fields(next_run=next_run.isoformat()))
+
+            if self.stop_event.wait(max((next_run - datetime.now()).total_seconds(), 0)):
+                break
+
+            started_at = datetime.now()
+            self.run_once()
+            runs += 1
+            next_run = self.schedule.next_after(started_at)
+            # 実行が次回予定を過ぎた場合は、過ぎた回をまとめてスキップ
+            while next_run <= datetime.now():
+                next_run = self.schedule.next_after(next_run)
+
+        self._write_health(status="stopped", next_run=None)
+        logger.info("🛑 デーモンを停止しました")
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="定期実行デーモン")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--interval", type=float, help="実行間隔（秒）")
+    group.add_argument("--cron", help='cron 式（例: "0 * * * *"）')
+    parser.add_argument("--now", action="store_true", help="起動直後に1回実行")
+    parser.add_argument("--max-runs", type=int, default=None, help="実行回数の上限")
+    parser.add_argument("--sample", action="store_true", help="サンプルデータを使用")
+    parser.add_argument("--csv", action="store_true", help="累計CSVにも追記する")
+    parser.add_argument("--health-file", default=HEALTH_FILE, help="稼働状況の出力先")
+    parser.add_argument("--metrics", metavar="FILE", help="処理時間・カウンターを出力（.prom=Prometheus形式）")
+    parser.add_argument("--log-level", default="INFO", help="ログレベル（DEBUG / INFO / WARNING）")
+    parser.add_argument("--log-format", choices=["console", "json"], default="console", help="ログ形式")
+    args = parser.parse_args()
+
+    setup_logging(args.log_level, args.log_format)
+    schedule = IntervalSchedule(args.interval) if args.interval is not None else CronSchedule(args.cron)
+    daemon = Daemon(
+        schedule,
+        use_sample=args.sample,
+        export_csv=args.csv,
+        health_file=args.health_file,
+        metrics_file=args.metrics,
+    )
+    daemon.serve(run_now=args.now, max_runs=args.max_runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,51 +1,109 @@
-"""Shopee Taiwan スクレイパー（API版）"""
+"""Shopee スクレイパー（API版。既定は台湾、他の地域は Marketplace で指定）"""
 
+import argparse
 import os
 import random
 import time
 from datetime import datetime
-import requests
 import pandas as pd
 
 from config import (
+    DEFAULT_REGION,
+    MARKETPLACES,
     SEARCH_KEYWORDS,
     PRODUCTS_PER_KEYWORD,
     OUTPUT_FILE,
     DELAYS,
-    EXCHANGE_RATE,
-    SALES_FEE_RATE,
-    FIXED_COST_JPY,
-    COST_RATE,
 )
-from sample_data import SAMPLE_PRODUCTS
+from analytics import region_mask
+from log import get_logger, log_fields, setup_logging
+from metrics import incr, span, timed
+from cost_model import load_cost_model
+from item_schema import to_records
+from marketplace import DEFAULT_MARKETPLACE, BudgetedSession, Marketplace, RateBudget, get_marketplace
+from profit import ProfitParams
+from sample_data import SAMPLE_CATALOGUE, SampleCatalogue
+from shops import SHOP_COLUMNS, ShopCache, ShopEnricher, ShopFetcher
+from storage import SnapshotStore, SweepLog, region_snapshot_id
+
+logger = get_logger("scraper")
+
+# 出力CSVの列順
+COLUMNS_ORDER = [
+    "timestamp", "region", "keyword", "name", "price", "sales", "shop_rating",
+    "price_jpy", "estimated_cost_jpy", "estimated_profit_jpy",
+    "itemid", "shopid", *SHOP_COLUMNS,
+]
+
+
+def order_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """出力CSVの列順に揃える"""
+    return df[[col for col in COLUMNS_ORDER if col in df.columns]]
+
+
+def to_dataframe(products: list[dict]) -> pd.DataFrame:
+    """商品リストを列順を揃えた DataFrame に変換"""
+    df = pd.DataFrame(products)
+    if df.empty:
+        return df
+    return order_columns(df)
 
 
 class ShopeeScraper:
-    """Shopee台湾のスクレイピングクラス（API使用）"""
-
-    def __init__(self):
-        self.session = requests.Session()
+    """Shopeeのスクレイピングクラス（API使用）"""
+
+    def __init__(
+        self,
+        exchange_rate: float | None = None,
+        catalogue: SampleCatalogue = SAMPLE_CATALOGUE,
+        marketplace: Marketplace = DEFAULT_MARKETPLACE,
+        enrich_shops: bool = True,
+        budget: RateBudget | None = None,
+    ):
+        """
+        Args:
+            exchange_rate: 利益計算に使う為替レート（None=地域の既定値。台湾はレート取得元の現在値）
+            catalogue: サンプルモード・フォールバック時の商品カタログ
+            marketplace: 取得する地域（ベースURLをローカルのモックサーバーにすることも可能）
+            enrich_shops: True=API取得時に店舗情報を付与
+            budget: リクエスト間隔の下限（同じ地域の他のスクレイパーと共有する。None=制限なし）
+        """
+        self._session = None
+        self.catalogue = catalogue
+        self.marketplace = marketplace
+        self.enrich_shops = enrich_shops
+        self.budget = budget
         self.all_products: list[dict] = []
-        self._setup_session()
-
-    def _setup_session(self) -> None:
-        """セッションの設定"""
-        self.session.headers.update({
+        self.params = ProfitParams(exchange_rate=exchange_rate or marketplace.jpy_rate())
+
+    @property
+    def session(self):
+        """HTTPセッション（API使用時に初めて作成。サンプルモードでは requests を読み込まない）"""
+        if self._session is None:
+            import requests
+
+            session = requests.Session()
+            self._setup_session(session)
+            self._session = BudgetedSession(session, self.budget) if self.budget is not None else session
+        return self._session
+
+    def _setup_session(self, session) -> None:
+        """セッションの設定（言語・Referer・Cookie は地域に合わせる）"""
+        session.headers.update({
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "application/json",
-            "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8",
             "Accept-Encoding": "gzip, deflate, br",
-            "Referer": "https://shopee.tw/",
             "X-Requested-With": "XMLHttpRequest",
-            "X-Shopee-Language": "zh-Hant",
             "X-API-SOURCE": "pc",
             "If-None-Match-": "*",
             "Content-Type": "application/json",
+            **self.marketplace.headers(),
         })
 
         # Cookie設定
-        self.session.cookies.set("language", "zh-Hant", domain=".shopee.tw")
-        self.session.cookies.set("SPC_F", self._generate_device_id(), domain=".shopee.tw")
+        domain = self.marketplace.cookie_domain
+        session.cookies.set("language", self.marketplace.language, domain=domain)
+        session.cookies.set("SPC_F", self._generate_device_id(), domain=domain)
 
     def _generate_device_id(self) -> str:
         """デバイスIDを生成"""
@@ -57,50 +115,36 @@ class ShopeeScraper:
         min_delay, max_delay = DELAYS.get(delay_type, (1, 2))
         time.sleep(random.uniform(min_delay, max_delay))
 
-    def _calculate_profit(self, price_twd: float) -> dict:
-        """利益を計算
-
-        計算式:
-        - 販売価格（円） = 販売価格（TWD） × 為替レート × (1 - 手数料率)
-        - 仮の原価（円） = 販売価格（円） × 原価率
-        - 想定利益（円） = 販売価格（円） - 仮の原価 - 固定コスト
+    def _normalize(self, items: list, keyword: str) -> list[dict]:
+        """APIの商品データを正規化して利益を計算（ページ単位で一括処理）
 
-        Args:
-            price_twd: 販売価格（台湾ドル）
-
-        Returns:
-            dict: 利益関連の計算結果
+        原価率・手数料率・固定コストはコストモデル（cost_model.json）から引く。
+        利益は保存する価格（現地通貨、地域の桁数に丸めたもの）から計算する。
         """
-        # 販売価格（円）
-        price_jpy = price_twd * EXCHANGE_RATE
-
-        # 手数料控除後の売上（円）
-        revenue_after_fee = price_jpy * (1 - SALES_FEE_RATE)
-
-        # 仮の原価（販売価格の50%）
-        estimated_cost = price_jpy * COST_RATE
-
-        # 想定利益 = 売上 - 原価 - 固定コスト
-        estimated_profit = revenue_after_fee - estimated_cost - FIXED_COST_JPY
-
-        return {
-            "price_jpy": round(price_jpy, 0),
-            "estimated_cost_jpy": round(estimated_cost, 0),
-            "estimated_profit_jpy": round(estimated_profit, 0),
-        }
-
+        with span("scraper.normalize"):
+            page = self.marketplace.item_parser.parse(items[:PRODUCTS_PER_KEYWORD])
+            df = page.frame.assign(keyword=keyword)
+            if not df.empty:
+                df = df.assign(**load_cost_model().stored_columns(df, self.params.exchange_rate))
+        page.record()
+        if page.dropped or page.malformed:
+            logger.debug(f"   商品データを除外: 欠損 {page.dropped}件 / 不正 {page.malformed}件",
+                         extra=log_fields(keyword=keyword, dropped=page.dropped, malformed=page.malformed))
+        return to_records(df)
+
+    @timed("scraper.search_products")
     def search_products(self, keyword: str) -> list[dict]:
         """キーワードで商品を検索（API使用）"""
         products = []
 
-        print(f"\n🔍 検索中: {keyword}")
+        logger.info(f"\n🔍 検索中: {keyword}", extra=log_fields(keyword=keyword))
 
         # Shopee Search API
-        api_url = "https://shopee.tw/api/v4/search/search_items"
+        api_url = f"{self.marketplace.base_url}/api/v4/search/search_items"
 
         params = {
             "by": "relevancy",
-            "keyword": keyword,
+            "keyword": self.marketplace.query(keyword),
             "limit": PRODUCTS_PER_KEYWORD,
             "newest": 0,
             "order": "desc",
@@ -110,81 +154,53 @@ class ShopeeScraper:
         }
 
         try:
-            response = self.session.get(api_url, params=params, timeout=30)
+            with span("scraper.http"):
+                response = self.session.get(api_url, params=params, timeout=30)
+            incr(f"scraper.http_status.{response.status_code}")
 
             if response.status_code == 200:
-                data = response.json()
+                with span("scraper.json_decode"):
+                    data = response.json()
 
                 items = data.get("items", [])
                 if not items:
                     items = data.get("data", {}).get("items", [])
 
-                print(f"   📦 API応答: {len(items)}個の商品")
-
-                for item in items[:PRODUCTS_PER_KEYWORD]:
-                    try:
-                        item_basic = item.get("item_basic", item)
-
-                        name = item_basic.get("name", "N/A")
-                        price = item_basic.get("price", 0) / 100000
-                        if price == 0:
-                            price = item_basic.get("price_min", 0) / 100000
-
-                        sales = item_basic.get("sold", 0)
-                        if sales == 0:
-                            sales = item_basic.get("historical_sold", 0)
+                logger.debug(f"   📦 API応答: {len(items)}個の商品", extra=log_fields(keyword=keyword, items=len(items)))
 
-                        shop_rating = item_basic.get("shop_rating", 0)
-                        if shop_rating == 0:
-                            shop_rating = item_basic.get("item_rating", {}).get("rating_star", 0)
-
-                        # 利益計算
-                        profit_info = self._calculate_profit(price)
-
-                        if name and name != "N/A":
-                            product = {
-                                "keyword": keyword,
-                                "name": name[:100],
-                                "price": round(price, 0),
-                                "sales": sales,
-                                "shop_rating": round(shop_rating, 1),
-                                **profit_info,
-                            }
-                            products.append(product)
-
-                    except Exception:
-                        continue
-
-                print(f"   📊 {len(products)}個の商品データを取得")
+                products = self._normalize(items, keyword)
+                incr("scraper.products", len(products))
+                logger.info(f"   📊 {len(products)}個の商品データを取得", extra=log_fields(keyword=keyword, products=len(products), items=len(items)))
 
             elif response.status_code == 403:
-                print(f"   ⚠️ アクセス拒否（403）- 別の方法を試行中...")
+                logger.warning("   ⚠️ アクセス拒否（403）- 別の方法を試行中...", extra=log_fields(keyword=keyword, status=403))
                 products = self._search_via_web(keyword)
 
             else:
-                print(f"   ❌ APIエラー: {response.status_code}")
+                logger.error(f"   ❌ APIエラー: {response.status_code}", extra=log_fields(keyword=keyword, status=response.status_code))
                 products = self._search_via_web(keyword)
 
         except Exception as e:
-            print(f"   ❌ エラー: {e}")
+            logger.error(f"   ❌ エラー: {e}", extra=log_fields(keyword=keyword, error=repr(e)))
             products = self._search_via_web(keyword)
 
         return products
 
+    @timed("scraper.search_via_web")
     def _search_via_web(self, keyword: str) -> list[dict]:
         """Web経由でのフォールバック検索"""
         products = []
 
         api_urls = [
-            "https://shopee.tw/api/v4/search/search_items",
-            "https://shopee.tw/api/v2/search_items/",
+            f"{self.marketplace.base_url}/api/v4/search/search_items",
+            f"{self.marketplace.base_url}/api/v2/search_items/",
         ]
 
         for api_url in api_urls:
             try:
                 params = {
                     "by": "relevancy",
-                    "keyword": keyword,
+                    "keyword": self.marketplace.query(keyword),
                     "limit": PRODUCTS_PER_KEYWORD,
                     "newest": 0,
                     "order": "desc",
@@ -193,31 +209,22 @@ class ShopeeScraper:
                 headers = {
                     "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 16_0 like Mac OS X) AppleWebKit/605.1.15",
                     "Accept": "application/json",
-                    "Referer": "https://shopee.tw/",
+                    "Referer": f"{self.marketplace.base_url}/",
                 }
 
-                response = self.session.get(api_url, params=params, headers=headers, timeout=30)
+                with span("scraper.http"):
+                    response = self.session.get(api_url, params=params, headers=headers, timeout=30)
+                incr(f"scraper.http_status.{response.status_code}")
 
                 if response.status_code == 200:
-                    data = response.json()
+                    with span("scraper.json_decode"):
+                        data = response.json()
                     items = data.get("items", data.get("data", {}).get("items", []))
 
                     if items:
-                        print(f"   ✅ 代替API成功: {len(items)}個")
-                        for item in items[:PRODUCTS_PER_KEYWORD]:
-                            item_basic = item.get("item_basic", item)
-                            price = item_basic.get("price", 0) / 100000
-                            profit_info = self._calculate_profit(price)
-
-                            product = {
-                                "keyword": keyword,
-                                "name": item_basic.get("name", "N/A")[:100],
-                                "price": price,
-                                "sales": item_basic.get("sold", item_basic.get("historical_sold", 0)),
-                                "shop_rating": round(item_basic.get("shop_rating", 0), 1),
-                                **profit_info,
-                            }
-                            products.append(product)
+                        logger.info(f"   ✅ 代替API成功: {len(items)}個", extra=log_fields(keyword=keyword, url=api_url, items=len(items)))
+                        products = self._normalize(items, keyword)
+                        incr("scraper.products", len(products))
                         break
 
             except Exception:
@@ -225,93 +232,159 @@ class ShopeeScraper:
 
         return products
 
-    def run(self, keywords: list[str] | None = None, use_sample: bool = False) -> pd.DataFrame:
+    def enrich_with_shops(self, products: list[dict]) -> list[dict]:
+        """店舗情報を付与（1回のスイープの商品をまとめて渡す。同じ店舗は1回だけ取得）"""
+        with span("scraper.shop_enrichment"):
+            fetcher = ShopFetcher(self.session, self.marketplace.base_url)
+            return ShopEnricher(fetcher, ShopCache(region=self.marketplace.region)).enrich(products)
+
+    def sample_frame(self, keyword: str) -> pd.DataFrame:
+        """サンプルデータからキーワードの商品を取得（利益計算済み・読み取り専用）"""
+        return self.catalogue.frame(keyword, self.params.exchange_rate, PRODUCTS_PER_KEYWORD)
+
+    def _load_samples(self, keywords: list[str], timestamp: str) -> pd.DataFrame:
+        """サンプルデータから全キーワードの商品を取得"""
+        frames = []
+        for keyword in keywords:
+            frame = self.sample_frame(keyword)
+            logger.info(f"   ✅ {keyword}: {len(frame)}個", extra=log_fields(keyword=keyword, products=len(frame)))
+            if not frame.empty:
+                frames.append(frame)
+        if not frames:
+            return pd.DataFrame()
+        return order_columns(pd.concat(frames, ignore_index=True).assign(timestamp=timestamp))
+
+    def run(
+        self,
+        keywords: list[str] | None = None,
+        use_sample: bool = False,
+        resume: bool = False,
+        export_csv: bool = True,
+    ) -> pd.DataFrame:
         """スクレイピングを実行
 
+        API使用時はキーワードごとに先行書き込みログへチェックポイントを記録する。
+
         Args:
             keywords: 検索キーワードリスト
             use_sample: True=サンプルデータ使用（デモ用）, False=API使用
+            resume: True=同じ地域の未完了のスイープを再開（取得済みキーワードはスキップ）
+            export_csv: True=累計CSVにも追記（累計データを返す）, False=ストアのみ（今回分を返す）
         """
         if keywords is None:
             keywords = SEARCH_KEYWORDS
 
-        # 現在のタイムスタンプ
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        wal = SweepLog.latest_open(self.marketplace.region) if resume and not use_sample else None
+
+        # 現在のタイムスタンプ（再開時は中断したスイープのもの）
+        if wal is not None:
+            timestamp = wal.timestamp
+        else:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        print("=" * 60)
-        print("🛒 Shopee台湾 リサーチツール")
-        print("=" * 60)
-        print(f"   取得日時: {timestamp}")
+        logger.info("=" * 60 + "\n🛒 Shopee台湾 リサーチツール\n" + "=" * 60 + f"\n   取得日時: {timestamp}",
+                    extra=log_fields(timestamp=timestamp, keywords=len(keywords), mode="sample" if use_sample else "api"))
 
+        samples = None
         if use_sample:
-            print("   モード: サンプルデータ（デモ用）")
-            print("\n📦 サンプルデータを読み込み中...")
+            logger.info("   モード: サンプルデータ（デモ用）\n\n📦 サンプルデータを読み込み中...")
+            samples = self._load_samples(keywords, timestamp)
+        else:
+            logger.info("   モード: API（ライブデータ）")
 
+            if wal is not None:
+                completed = wal.completed()
+                logger.info(f"   再開: スナップショット {wal.snapshot_id}（取得済み {len(completed)}キーワード）",
+                            extra=log_fields(snapshot_id=wal.snapshot_id, completed=len(completed)))
+            else:
+                wal = SweepLog.create(timestamp, self.marketplace.region)
+                completed = {}
+
+            pending = [keyword for keyword in keywords if keyword not in completed]
             for keyword in keywords:
-                keyword_products = [p.copy() for p in SAMPLE_PRODUCTS if p["keyword"] == keyword]
-                # 利益計算を追加
-                for product in keyword_products[:PRODUCTS_PER_KEYWORD]:
-                    profit_info = self._calculate_profit(product["price"])
-                    product.update(profit_info)
-                    product["timestamp"] = timestamp
-                self.all_products.extend(keyword_products[:PRODUCTS_PER_KEYWORD])
-                print(f"   ✅ {keyword}: {len(keyword_products[:PRODUCTS_PER_KEYWORD])}個")
-        else:
-            print("   モード: API（ライブデータ）")
+                if keyword in completed:
+                    self.all_products.extend(completed[keyword])
 
-            for i, keyword in enumerate(keywords):
+            for i, keyword in enumerate(pending):
                 products = self.search_products(keyword)
                 # タイムスタンプを追加
                 for product in products:
                     product["timestamp"] = timestamp
                 self.all_products.extend(products)
 
-                if i < len(keywords) - 1:
-                    print(f"\n   ⏳ 次の検索まで待機中...")
+                # チェックポイント（取得できなかったキーワードは再開時に再取得）
+                if products:
+                    wal.append(keyword, products)
+
+                if i < len(pending) - 1:
+                    logger.debug("\n   ⏳ 次の検索まで待機中...")
                     self._random_delay("between_keywords")
 
+            # 店舗情報を付与（スイープ内の店舗を重複なくまとめて取得。再開時は取得済みキーワードの分も含む）
+            if self.all_products and self.enrich_shops:
+                self.all_products = self.enrich_with_shops(self.all_products)
+
             # APIで取得できなかった場合、サンプルデータにフォールバック
             if not self.all_products:
-                print("\n⚠️ APIからデータを取得できませんでした。")
-                print("   地域制限の可能性があります（台湾IPが必要）")
-                print("\n📦 サンプルデータを使用します...")
-
-                for keyword in keywords:
-                    keyword_products = [p.copy() for p in SAMPLE_PRODUCTS if p["keyword"] == keyword]
-                    for product in keyword_products[:PRODUCTS_PER_KEYWORD]:
-                        profit_info = self._calculate_profit(product["price"])
-                        product.update(profit_info)
-                        product["timestamp"] = timestamp
-                    self.all_products.extend(keyword_products[:PRODUCTS_PER_KEYWORD])
-                    print(f"   ✅ {keyword}: {len(keyword_products[:PRODUCTS_PER_KEYWORD])}個")
-
-        # DataFrameに変換
-        df = pd.DataFrame(self.all_products)
-
+                logger.warning("\n⚠️ APIからデータを取得できませんでした。\n"
+                               f"   地域制限の可能性があります（{self.marketplace.region.upper()} のIPが必要）\n"
+                               "\n📦 サンプルデータを使用します...")
+                samples = self._load_samples(keywords, timestamp)
+
+        # DataFrameに変換（列の順序を整理）
+        df = samples if samples is not None else to_dataframe(self.all_products)
+        region = self.marketplace.region
         if not df.empty:
-            # 列の順序を整理
-            columns_order = [
-                "timestamp", "keyword", "name", "price", "sales", "shop_rating",
-                "price_jpy", "estimated_cost_jpy", "estimated_profit_jpy"
-            ]
-            df = df[[col for col in columns_order if col in df.columns]]
+            df = order_columns(df.assign(region=region))
 
+        if not df.empty:
+            # スナップショットとして保存（キーワード別パーティション。台湾以外は地域別のスナップショット）
+            with span("storage.write_snapshot"):
+                store = SnapshotStore()
+                snapshot_id = region_snapshot_id(timestamp, region)
+                # 取得時のレートを記録（読み込み時の利益列はこのレートから計算される）
+                store.rates.set(snapshot_id, self.params.exchange_rate)
+                store.write_snapshot(df, snapshot_id)
+
+        if not df.empty and export_csv:
             # 既存ファイルがあれば追記、なければ新規作成
             if os.path.exists(OUTPUT_FILE):
-                existing_df = pd.read_csv(OUTPUT_FILE, encoding="utf-8-sig")
+                with span("storage.csv_read"):
+                    existing_df = pd.read_csv(OUTPUT_FILE, encoding="utf-8-sig")
+                # 同じスナップショットが書き込み済みなら置き換える（再開時の二重追記防止。地域の記録がない行は既定の地域）
+                same = (existing_df["timestamp"] == timestamp) & region_mask(existing_df, region)
+                existing_df = existing_df[~same]
                 df = pd.concat([existing_df, df], ignore_index=True)
-                print(f"\n📝 既存データに追記しました")
+                logger.info("\n📝 既存データに追記しました")
+
+            # 一時ファイルに書き込んでから rename（途中で中断しても既存ファイルは壊れない）
+            with span("storage.csv_write"):
+                tmp_file = OUTPUT_FILE + ".tmp"
+                df.to_csv(tmp_file, index=False, encoding="utf-8-sig")
+                os.replace(tmp_file, OUTPUT_FILE)
+            logger.info(f"✅ 結果を {OUTPUT_FILE} に保存しました\n   合計 {len(df)} 商品（累計）",
+                        extra=log_fields(output=OUTPUT_FILE, rows=len(df)))
 
-            df.to_csv(OUTPUT_FILE, index=False, encoding="utf-8-sig")
-            print(f"✅ 結果を {OUTPUT_FILE} に保存しました")
-            print(f"   合計 {len(df)} 商品（累計）")
+        # コミット完了後にチェックポイントを削除
+        if wal is not None:
+            wal.close()
 
         return df
 
 
 def main():
     """メイン処理"""
-    scraper = ShopeeScraper()
+    parser = argparse.ArgumentParser(description="Shopeeの商品を取得")
+    parser.add_argument("--region", default=DEFAULT_REGION, choices=list(MARKETPLACES), help="地域")
+    parser.add_argument("--base-url", help="API のベースURL（例: ローカルのモックサーバー http://127.0.0.1:8900）")
+    parser.add_argument("--no-shops", action="store_true", help="店舗情報を付与しない")
+    args = parser.parse_args()
+
+    setup_logging()
+    marketplace = get_marketplace(args.region)
+    if args.base_url:
+        marketplace = marketplace.with_base_url(args.base_url)
+    scraper = ShopeeScraper(marketplace=marketplace, enrich_shops=not args.no_shops)
     df = scraper.run()
     return df
 
@@ -0,0 +1,187 @@
+"""Shopee セラーセンター向けの一括出品ファイル（CSV / XLSX）
+
+商品名・推奨価格・説明文・ハッシュタグをチャンク単位で書き出す。
+- キーワード別の価格統計（最低価格・平均価格）は最初に1回だけ集計
+- 読み込み・書き出しともパーティション / チャンク単位（メモリ使用量は件数によらず一定）
+- XLSX は openpyxl（任意の依存）の書き込み専用モードで出力
+
+使い方:
+    python seller_export.py --output seller_upload.csv
+    python seller_export.py --keyword "日本 零食" --output seller_upload.xlsx --premium-rate 0.1
+"""
+
+import argparse
+import csv
+import importlib.util
+import io
+
+import pandas as pd
+
+from config import STORE_DIR
+from listing_templates import description, hashtags
+from log import get_logger, log_fields, setup_logging
+from storage import SnapshotStore
+
+logger = get_logger("seller_export")
+
+OPENPYXL_AVAILABLE = importlib.util.find_spec("openpyxl") is not None
+
+EXPORT_COLUMNS = ["分類", "商品名稱", "商品描述", "價格", "主題標籤", "市場最低價", "市場平均價"]
+DEFAULT_PREMIUM_RATE = 0.08
+CHUNK_SIZE = 5000
+
+
+def calculate_premium_price(price, df, keyword, rate=DEFAULT_PREMIUM_RATE):
+    """同じキーワードの最低価格・平均価格と推奨価格（最低価格 × (1 + rate)）"""
+    same = df[df["keyword"] == keyword]
+    min_p = same["price"].min() if not same.empty else price
+    avg_p = same["price"].mean() if not same.empty else price
+    return {"min": min_p, "avg": avg_p, "premium": min_p * (1 + rate)}
+
+
+def keyword_price_stats(frames) -> pd.DataFrame:
+    """キーワード別の最低価格・平均価格を逐次集計
+
+    Args:
+        frames: DataFrame の反復（パーティションやチャンク）
+
+    Returns:
+        DataFrame: index=keyword, 列=min / avg
+    """
+    partials = [
+        df.groupby("keyword")["price"].agg(["min", "sum", "count"])
+        for df in frames
+    ]
+    if not partials:
+        return pd.DataFrame(columns=["min", "avg"])
+    stats = pd.concat(partials).groupby(level=0).agg({"min": "min", "sum": "sum", "count": "sum"})
+    return pd.DataFrame({"min": stats["min"], "avg": stats["sum"] / stats["count"]})
+
+
+def export_rows(df: pd.DataFrame, stats: pd.DataFrame, rate: float = DEFAULT_PREMIUM_RATE):
+    """1チャンク分の出品行（EXPORT_COLUMNS の順のタプル）
+
+    統計にないキーワードは自身の価格を基準にする。
+    """
+    prices = df["price"].astype(float)
+    min_p = df["keyword"].map(stats["min"]).fillna(prices)
+    avg_p = df["keyword"].map(stats["avg"]).fillna(prices)
+    names, keywords = df["name"].tolist(), df["keyword"].tolist()
+    return zip(
+        keywords,
+        names,
+        [description(n, k, p) for n, k, p in zip(names, keywords, prices.tolist())],
+        (min_p * (1 + rate)).round(0).astype(int).tolist(),
+        [" ".join(hashtags(k)) for k in keywords],
+        min_p.round(0).astype(int).tolist(),
+        avg_p.round(0).astype(int).tolist(),
+    )
+
+
+def _chunks(frames, chunk_size: int):
+    """DataFrame の反復を chunk_size 行以下に分割"""
+    for df in frames:
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+
+def write_export(
+    frames,
+    output,
+    stats: pd.DataFrame,
+    rate: float = DEFAULT_PREMIUM_RATE,
+    fmt: str = "csv",
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """出品ファイルをチャンク単位で書き出す
+
+    Args:
+        frames: 出力する商品の DataFrame の反復
+        output: 出力先のパスまたはファイルオブジェクト（csv はテキスト、xlsx はバイナリ）
+        stats: keyword_price_stats の結果
+        rate: 推奨価格の上乗せ率
+        fmt: csv / xlsx
+
+    Returns:
+        int: 書き出した件数
+    """
+    rows = 0
+    if fmt == "xlsx":
+        if not OPENPYXL_AVAILABLE:
+            raise RuntimeError("XLSX の出力には openpyxl が必要です（pip install openpyxl）")
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("listings")
+        sheet.append(EXPORT_COLUMNS)
+        for chunk in _chunks(frames, chunk_size):
+            for row in export_rows(chunk, stats, rate):
+                sheet.append(row)
+            rows += len(chunk)
+        workbook.save(output)
+        return rows
+
+    f = open(output, "w", encoding="utf-8-sig", newline="") if isinstance(output, str) else output
+    try:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        for chunk in _chunks(frames, chunk_size):
+            writer.writerows(export_rows(chunk, stats, rate))
+            rows += len(chunk)
+    finally:
+        if isinstance(output, str):
+            f.close()
+    return rows
+
+
+def export_bytes(df: pd.DataFrame, stats: pd.DataFrame, rate: float = DEFAULT_PREMIUM_RATE, fmt: str = "csv") -> bytes:
+    """出品ファイルの内容（ダッシュボードのダウンロード用）"""
+    if fmt == "xlsx":
+        buffer = io.BytesIO()
+        write_export([df], buffer, stats, rate, fmt="xlsx")
+        return buffer.getvalue()
+    buffer = io.StringIO()
+    write_export([df], buffer, stats, rate)
+    return buffer.getvalue().encode("utf-8-sig")
+
+
+def export_store(
+    store: SnapshotStore,
+    path: str,
+    keywords: list[str] | None = None,
+    rate: float = DEFAULT_PREMIUM_RATE,
+    chunk_size: int = CHUNK_SIZE,
+) -> int:
+    """最新スナップショットの商品を出品ファイルに書き出す
+
+    価格統計は全スナップショット（ダッシュボードの価格分析と同じ範囲）で集計する。
+    """
+    snapshots = store.snapshots()
+    if not snapshots:
+        return 0
+    stats = keyword_price_stats(store.iter_scan(keywords=keywords))
+    frames = store.iter_scan(keywords=keywords, snapshots=snapshots[-1:])
+    fmt = "xlsx" if path.endswith(".xlsx") else "csv"
+    return write_export(frames, path, stats, rate, fmt, chunk_size)
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="セラーセンター向けの一括出品ファイルを作成")
+    parser.add_argument("--keyword", action="append", help="対象カテゴリ（複数指定可。省略時はすべて）")
+    parser.add_argument("--output", default="seller_upload.csv", help="出力先（.csv / .xlsx）")
+    parser.add_argument("--premium-rate", type=float, default=DEFAULT_PREMIUM_RATE, help="最低価格への上乗せ率")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="1回に書き出す行数")
+    parser.add_argument("--store", default=STORE_DIR, help="スナップショットストア")
+    args = parser.parse_args()
+
+    setup_logging()
+    count = export_store(SnapshotStore(args.store), args.output, args.keyword, args.premium_rate, args.chunk_size)
+    if count == 0:
+        logger.error("❌ 出力する商品がありません")
+        return
+    logger.info(f"✅ {count:,}件を {args.output} に保存しました", extra=log_fields(output=args.output, count=count))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""利益の感度分析（為替レート × 手数料率 × 原価率のグリッド）
+
+利益は価格の一次式（利益 = 価格 × margin - 固定コスト、margin = レート × (1 - 手数料率 - 原価率)）なので、
+グリッドの各点は商品ごとに計算し直さずに求められる。
+- 平均利益: 平均価格 × margin - 固定コスト
+- 閾値以上の商品数: 価格をソートしておき、各点の価格の境界を二分探索（一括）
+
+商品数 N・グリッド点数 G に対して O(N log N + G log N)。商品 × グリッドの配列は作らない。
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# 各軸の既定の範囲（ダッシュボードのスライダーと同じ）
+AXES = {
+    "exchange_rate": (3.0, 7.0),
+    "fee_rate": (0.0, 0.3),
+    "cost_rate": (0.0, 1.0),
+}
+
+
+def axis(name: str, steps: int, bounds: tuple[float, float] | None = None) -> np.ndarray:
+    """軸の値（bounds の範囲を steps 等分。None=AXES の範囲）"""
+    low, high = bounds or AXES[name]
+    return np.linspace(low, high, steps)
+
+
+@dataclass(frozen=True)
+class SensitivityGrid:
+    """感度分析の結果（配列の形はすべて (レート, 手数料率, 原価率)）"""
+
+    exchange_rates: np.ndarray
+    fee_rates: np.ndarray
+    cost_rates: np.ndarray
+    mean_profit: np.ndarray
+    profitable: np.ndarray   # 利益が閾値以上の商品数
+    total: int
+
+    @property
+    def profitable_share(self) -> np.ndarray:
+        return self.profitable / self.total if self.total else np.zeros_like(self.mean_profit)
+
+    def frame(self, metric: str, cost_index: int) -> pd.DataFrame:
+        """原価率を1つに固定した2次元の表（ヒートマップ用の縦持ち）
+
+        Args:
+            metric: mean_profit / profitable / profitable_share
+            cost_index: cost_rates の位置
+        """
+        values = getattr(self, metric)[:, :, cost_index]
+        rates, fees = np.meshgrid(self.exchange_rates, self.fee_rates, indexing="ij")
+        return pd.DataFrame({
+            "exchange_rate": rates.ravel(),
+            "fee_rate": fees.ravel(),
+            metric: values.ravel(),
+        })
+
+
+def profit_grid(
+    prices,
+    exchange_rates,
+    fee_rates,
+    cost_rates,
+    fixed_cost: float,
+    min_profit: float = 0.0,
+) -> SensitivityGrid:
+    """グリッドの全点について平均利益・閾値以上の商品数を計算
+
+    Args:
+        prices: 商品の価格（TWD）
+        exchange_rates / fee_rates / cost_rates: 各軸の値
+        fixed_cost: 固定コスト（円）
+        min_profit: 商品数を数える利益の閾値（円）
+    """
+    prices = np.sort(np.asarray(prices, dtype=float))
+    rates = np.asarray(exchange_rates, dtype=float)
+    fees = np.asarray(fee_rates, dtype=float)
+    costs = np.asarray(cost_rates, dtype=float)
+    n = len(prices)
+
+    margin = rates[:, None, None] * (1 - fees[None, :, None] - costs[None, None, :])
+    mean_price = prices.mean() if n else 0.0
+    mean_profit = mean_price * margin - fixed_cost
+
+    # 価格 × margin - fixed >= min_profit を価格の条件に変換（margin の符号で向きが変わる）
+    need = min_profit + fixed_cost
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bound = need / margin
+    at_least = n - np.searchsorted(prices, np.where(margin > 0, bound, np.inf), side="left")
+    at_most = np.searchsorted(prices, np.where(margin < 0, bound, -np.inf), side="right")
+    profitable = np.where(margin > 0, at_least, np.where(margin < 0, at_most, n if need <= 0 else 0))
+
+    return SensitivityGrid(rates, fees, costs, mean_profit, profitable, n)
@@ -0,0 +1,161 @@
+"""マルチプロセスのシャード実行（大量キーワード用）
+
+キーワードリストを N シャードに分割し、シャードごとに1プロセスで取得する。
+- 各ワーカーは自分の ShopeeScraper（セッション・待機時間）を持つ
+- 各ワーカーはキーワード別パーティションを書き込むだけでコミットしない
+- 全シャード完了後、コーディネーターがマニフェストへ一括コミット（原子的）
+
+使い方:
+    python sharded.py --workers 8 --keywords-file keywords.txt
+    python sharded.py --sample
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from config import SEARCH_KEYWORDS, STORE_DIR
+from log import get_logger, log_fields, setup_logging, shutdown_logging
+from rates import get_rate_provider
+from scraper import ShopeeScraper, order_columns, to_dataframe
+from storage import SnapshotStore, snapshot_id_from_timestamp
+
+logger = get_logger("sharded")
+
+
+def split_keywords(keywords: list[str], n_shards: int) -> list[list[str]]:
+    """キーワードをラウンドロビンで n_shards 個に分割（空のシャードは除く）"""
+    shards = [keywords[i::n_shards] for i in range(n_shards)]
+    return [shard for shard in shards if shard]
+
+
+def load_keywords(path: str) -> list[str]:
+    """キーワードファイルを読み込む（1行1キーワード、# 以降はコメント）"""
+    keywords = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            keyword = line.split("#", 1)[0].strip()
+            if keyword:
+                keywords.append(keyword)
+    return keywords
+
+
+def _run_shard(
+    keywords: list[str],
+    timestamp: str,
+    snapshot_id: str,
+    use_sample: bool,
+    store_root: str,
+    log_config: tuple[str, str],
+    exchange_rate: float,
+) -> list[dict]:
+    """ワーカー: 担当キーワードを取得してパーティションを書き込む
+
+    Returns:
+        list[dict]: コミット待ちのパーティション情報
+    """
+    # ワーカープロセスは親のログ出力スレッドを持たないため個別に設定
+    setup_logging(*log_config)
+    scraper = ShopeeScraper(exchange_rate)
+    store = SnapshotStore(store_root)
+    entries = []
+
+    for i, keyword in enumerate(keywords):
+        if use_sample:
+            df = order_columns(scraper.sample_frame(keyword).assign(timestamp=timestamp))
+        else:
+            products = scraper.search_products(keyword)
+            for product in products:
+                product["timestamp"] = timestamp
+            df = to_dataframe(products)
+
+        if not df.empty:
+            entries.append(store.stage_partition(df, snapshot_id, keyword))
+
+        # ワーカーごとの待機（レート制限はシャード単位）
+        if not use_sample and i < len(keywords) - 1:
+            scraper._random_delay("between_keywords")
+
+    shutdown_logging()
+    return entries
+
+
+def run_sharded(
+    keywords: list[str] | None = None,
+    workers: int | None = None,
+    use_sample: bool = False,
+    store_root: str = STORE_DIR,
+    log_config: tuple[str, str] = ("INFO", "console"),
+) -> str | None:
+    """キーワードをシャードに分けて並列取得し、1スナップショットとしてコミット
+
+    Args:
+        keywords: 検索キーワードリスト
+        workers: ワーカープロセス数（None=CPUコア数）
+        use_sample: True=サンプルデータ使用
+        store_root: 保存先ストア
+        log_config: ワーカーのログ設定（レベル, 形式）
+
+    Returns:
+        str | None: コミットしたスナップショットID（キーワードがない場合は None）
+    """
+    if keywords is None:
+        keywords = SEARCH_KEYWORDS
+    workers = workers or os.cpu_count() or 1
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    snapshot_id = snapshot_id_from_timestamp(timestamp)
+    shards = split_keywords(keywords, workers)
+    if not shards:
+        logger.warning("⚠️ キーワードがないため、何も取得しません")
+        return None
+    # 全シャードで同じレートを使う
+    exchange_rate = get_rate_provider().get()
+
+    logger.info(
+        "=" * 60 + "\n🛒 Shopee台湾 シャード実行\n" + "=" * 60
+        + f"\n   取得日時: {timestamp}\n   キーワード数: {len(keywords)} / シャード数: {len(shards)}",
+        extra=log_fields(snapshot_id=snapshot_id, keywords=len(keywords), shards=len(shards)),
+    )
+
+    entries = []
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(_run_shard, shard, timestamp, snapshot_id, use_sample, store_root, log_config, exchange_rate)
+            for shard in shards
+        ]
+        # 1シャードでも失敗した場合は例外となり、何もコミットしない
+        for future in futures:
+            entries.extend(future.result())
+
+    store = SnapshotStore(store_root)
+    store.rates.set(snapshot_id, exchange_rate)
+    store.commit(entries)
+
+    total = sum(entry["rows"] for entry in entries)
+    logger.info(
+        f"\n✅ スナップショット {snapshot_id} をコミットしました\n   パーティション: {len(entries)} / 合計 {total} 商品",
+        extra=log_fields(snapshot_id=snapshot_id, partitions=len(entries), rows=total),
+    )
+    return snapshot_id
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="キーワードをシャードに分けて並列取得")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（既定: CPUコア数）")
+    parser.add_argument("--keywords-file", help="キーワードファイル（1行1キーワード）")
+    parser.add_argument("--sample", action="store_true", help="サンプルデータを使用")
+    parser.add_argument("--log-level", default="INFO", help="ログレベル（DEBUG / INFO / WARNING）")
+    parser.add_argument("--log-format", choices=["console", "json"], default="console", help="ログ形式")
+    args = parser.parse_args()
+
+    log_config = (args.log_level, args.log_format)
+    setup_logging(*log_config)
+    keywords = load_keywords(args.keywords_file) if args.keywords_file else None
+    run_sharded(keywords, workers=args.workers, use_sample=args.sample, log_config=log_config)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""販売店の情報（店舗単位のデータを商品に付与）
+
+スイープで取得した商品の shopid を重複なく集め、店舗情報をまとめて取得して商品に結合する。
+- 取得した店舗情報は research_store/shops.json に取得日時つきで保存し、SHOP_TTL の間は再取得しない
+- キャッシュにない店舗だけを SHOP_BATCH_SIZE 件ずつ、上限付きのスレッドプールで取得
+- 1回のスイープ（ShopEnricher）では、取得に失敗した店舗も含めて同じ店舗を2回取得しない
+- 応答の正規化は item_schema のフィールド定義で行う
+- ジャンル内の販売数に占める店舗のシェア（shop_sales_share）も付与する
+  （大手の店舗が販売している商品かどうかの判断用）
+
+使い方:
+    enricher = ShopEnricher(ShopFetcher(session, base_url))
+    products = enricher.enrich(products)
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from config import BASE_URL, DEFAULT_REGION, DELAYS, SHOP_BATCH_SIZE, SHOP_MAX_WORKERS, SHOP_TTL, STORE_DIR
+from item_schema import Field, ItemParser, to_records
+from log import get_logger, log_fields
+from metrics import incr, span
+
+logger = get_logger("shops")
+
+SHOPS_FILE = "shops.json"
+SHOP_API_PATH = "/api/v4/shop/get_shop_base"
+
+SHOP_FIELDS = (
+    Field("shopid", ("shopid",), integer=True, required=True),
+    Field("shop_name", ("name",), numeric=False),
+    Field("shop_follower_count", ("follower_count",), integer=True),
+    Field("shop_item_count", ("item_count",), integer=True),
+    Field("shop_rating_star", ("rating_star",), digits=2, max_value=5.0),
+    Field("shop_is_official", ("is_official_shop",), integer=True),
+)
+SHOP_PARSER = ItemParser(SHOP_FIELDS)
+
+# 商品に付与する列
+SHOP_DETAIL_COLUMNS = [f.name for f in SHOP_FIELDS if f.name != "shopid"]
+SHOP_COLUMNS = SHOP_DETAIL_COLUMNS + ["shop_sales_share"]
+
+
+class ShopCache:
+    """店舗情報のキャッシュ（research_store/shops.json。店舗ごとに取得日時を記録）
+
+    shopid は地域ごとの番号のため、キーは「地域:shopid」とする。
+    """
+
+    # 同じプロセスの複数スイープからの同時更新を直列化する
+    _lock = threading.Lock()
+
+    def __init__(self, root: str = STORE_DIR, ttl: float = SHOP_TTL, region: str = DEFAULT_REGION):
+        self.path = os.path.join(root, SHOPS_FILE)
+        self.ttl = ttl
+        self.region = region
+
+    def _key(self, shopid: int) -> str:
+        return f"{self.region}:{shopid}"
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)["shops"]
+        except FileNotFoundError:
+            return {}
+
+    def get_many(self, shopids: list[int], now: float | None = None) -> dict[int, dict]:
+        """期限内の店舗情報 {shopid: 店舗情報}（ない・期限切れの店舗は含まない）"""
+        now = time.time() if now is None else now
+        shops = self._load()
+        fresh = {}
+        for shopid in shopids:
+            shop = shops.get(self._key(shopid))
+            if shop is not None and now - shop["fetched_at"] < self.ttl:
+                fresh[shopid] = shop
+        return fresh
+
+    def put_many(self, records: list[dict], now: float | None = None) -> None:
+        """店舗情報を保存（期限切れの店舗は削除。一時ファイル + rename で原子的に更新）"""
+        if not records:
+            return
+        now = time.time() if now is None else now
+        with self._lock:
+            shops = {k: v for k, v in self._load().items() if now - v["fetched_at"] < self.ttl}
+            for record in records:
+                shops[self._key(record["shopid"])] = {**record, "fetched_at": now}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "shops": shops}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+
+class ShopFetcher:
+    """店舗情報の取得（GET {base_url}/api/v4/shop/get_shop_base?shopid=...）"""
+
+    def __init__(
+        self,
+        session,
+        base_url: str = BASE_URL,
+        batch_size: int = SHOP_BATCH_SIZE,
+        max_workers: int = SHOP_MAX_WORKERS,
+        delay: tuple[float, float] = DELAYS["action"],
+        timeout: float = 30,
+    ):
+        """
+        Args:
+            session: requests.Session 互換のセッション
+            base_url: API のベースURL（ローカルのモックサーバーも指定可能）
+            delay: バッチ間の待機時間（秒）の範囲
+        """
+        self.session = session
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.delay = delay
+        self.timeout = timeout
+
+    def _fetch_one(self, shopid: int) -> dict | None:
+        response = self.session.get(f"{self.base_url}{SHOP_API_PATH}", params={"shopid": shopid}, timeout=self.timeout)
+        incr(f"shops.http_status.{response.status_code}")
+        if response.status_code != 200:
+            return None
+        data = response.json().get("data")
+        return {**data, "shopid": shopid} if isinstance(data, dict) else None
+
+    def fetch(self, shopids: list[int]) -> pd.DataFrame:
+        """店舗情報を取得（列は SHOP_FIELDS。取得できなかった店舗は含まない）"""
+        payloads = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for start in range(0, len(shopids), self.batch_size):
+                if start:
+                    time.sleep(random.uniform(*self.delay))
+                batch = shopids[start:start + self.batch_size]
+                with span("shops.fetch_batch"):
+                    calls = [executor.submit(self._fetch_one, shopid) for shopid in batch]
+                    for shopid, call in zip(batch, calls):
+                        error = call.exception()
+                        if error is not None:
+                            incr("shops.failed")
+                            logger.debug("   店舗情報の取得に失敗", extra=log_fields(shopid=shopid, error=repr(error)))
+                        elif call.result() is not None:
+                            payloads.append(call.result())
+        page = SHOP_PARSER.parse(payloads)
+        page.record("shops")
+        return page.frame
+
+
+class ShopEnricher:
+    """1回のスイープの店舗情報の付与（同じ店舗は取得・キャッシュ参照とも1回だけ）"""
+
+    def __init__(self, fetcher: ShopFetcher, cache: ShopCache | None = None):
+        self.fetcher = fetcher
+        self.cache = cache or ShopCache()
+        self._shops: dict[int, dict] = {}
+        self._failed: set[int] = set()
+
+    def lookup(self, shopids) -> dict[int, dict]:
+        """店舗情報 {shopid: 店舗情報}（このスイープで未参照の店舗だけキャッシュ・API を引く）"""
+        shopids = {int(shopid) for shopid in shopids if shopid}
+        pending = sorted(shopids - self._shops.keys() - self._failed)
+        if pending:
+            cached = self.cache.get_many(pending)
+            self._shops.update(cached)
+            incr("shops.cache_hit", len(cached))
+            missing = [shopid for shopid in pending if shopid not in cached]
+            if missing:
+                logger.info(f"🏪 店舗情報を取得中...（{len(missing)}店舗 / キャッシュ {len(cached)}店舗）",
+                            extra=log_fields(shops=len(missing), cached=len(cached)))
+                with span("shops.fetch"):
+                    fetched = to_records(self.fetcher.fetch(missing))
+                self.cache.put_many(fetched)
+                self._shops.update((record["shopid"], record) for record in fetched)
+                self._failed.update(set(missing) - self._shops.keys())
+                incr("shops.fetched", len(fetched))
+        return {shopid: self._shops[shopid] for shopid in shopids if shopid in self._shops}
+
+    def enrich(self, products: list[dict]) -> list[dict]:
+        """商品に店舗情報とジャンル内の販売数シェアを付与した新しいリストを返す"""
+        shops = self.lookup(product.get("shopid") for product in products)
+
+        keyword_sales: dict[str, float] = {}
+        shop_sales: dict[tuple[str, int], float] = {}
+        for product in products:
+            keyword, shopid, sales = product["keyword"], product.get("shopid"), product.get("sales") or 0
+            keyword_sales[keyword] = keyword_sales.get(keyword, 0) + sales
+            if shopid:
+                shop_sales[keyword, shopid] = shop_sales.get((keyword, shopid), 0) + sales
+
+        enriched = []
+        for product in products:
+            shopid = product.get("shopid")
+            shop = shops.get(shopid, {})
+            total = keyword_sales[product["keyword"]]
+            share = round(shop_sales[product["keyword"], shopid] / total, 4) if shopid and total else None
+            enriched.append({
+                **product,
+                **{col: shop.get(col) for col in SHOP_DETAIL_COLUMNS},
+                "shop_sales_share": share,
+            })
+        return enriched
@@ -0,0 +1,133 @@
+"""分位点スケッチ（価格・販売数の分布）
+
+対数スケールのビンに個数を数える DDSketch 方式のスケッチ。
+- 分位点の相対誤差は alpha 以下（既定 2%）
+- ビンの個数を足すだけで併合できる（キーワード・スナップショットをまたいで集計可能）
+- 大きさは値の範囲（最大 / 最小）の対数に比例し、件数によらない
+
+値は0以上を想定する（0以下は0のビンに数える）。
+パーティションごとのスケッチは書き込み時にパーティションの隣のファイルへ記録する（SnapshotStore.sketches）。
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+SKETCH_ALPHA = 0.02
+SKETCH_COLUMNS = ["price", "sales"]
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+
+
+class QuantileSketch:
+    """併合可能な分位点スケッチ"""
+
+    def __init__(self, alpha: float = SKETCH_ALPHA, bins: dict[int, int] | None = None, zero: int = 0):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = dict(bins or {})
+        self.zero = zero
+
+    @classmethod
+    def from_values(cls, values, alpha: float = SKETCH_ALPHA) -> "QuantileSketch":
+        """値の配列から作成（NaN は除く）"""
+        sketch = cls(alpha)
+        sketch.add(values)
+        return sketch
+
+    def add(self, values) -> None:
+        """値を追加"""
+        values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        positive = values[values > 0]
+        self.zero += len(values) - len(positive)
+        if len(positive):
+            keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                self.bins[key] = self.bins.get(key, 0) + count
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """2つのスケッチを併合した新しいスケッチ（alpha は同じであること）"""
+        if other.alpha != self.alpha:
+            raise ValueError(f"alpha が異なるスケッチは併合できません: {self.alpha} / {other.alpha}")
+        bins = dict(self.bins)
+        for key, count in other.bins.items():
+            bins[key] = bins.get(key, 0) + count
+        return QuantileSketch(self.alpha, bins, self.zero + other.zero)
+
+    @classmethod
+    def merge_all(cls, sketches, alpha: float = SKETCH_ALPHA) -> "QuantileSketch":
+        """複数のスケッチを併合（空なら空のスケッチ）"""
+        merged = cls(alpha)
+        for sketch in sketches:
+            merged = merged.merge(sketch)
+        return merged
+
+    @property
+    def count(self) -> int:
+        return self.zero + sum(self.bins.values())
+
+    def _value(self, key: int) -> float:
+        """ビンの代表値（ビン内のどの値に対しても相対誤差 alpha 以内）"""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantiles(self, qs=DEFAULT_QUANTILES) -> list[float]:
+        """分位点（qs は 0〜1。空のスケッチは NaN）"""
+        total = self.count
+        if total == 0:
+            return [float("nan")] * len(qs)
+        keys = sorted(self.bins)
+        cumulative = self.zero + np.cumsum([self.bins[key] for key in keys])
+        result = []
+        for q in qs:
+            rank = q * (total - 1)
+            if rank < self.zero:
+                result.append(0.0)
+            else:
+                result.append(self._value(keys[int(np.searchsorted(cumulative, rank, side="right"))]))
+        return result
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+
+    def histogram(self, n_bins: int = 20) -> pd.Series:
+        """分布（対数スケールで n_bins 個程度にまとめた個数。index はビンの下限）"""
+        if not self.bins:
+            return pd.Series(dtype=float)
+        low, high = min(self.bins), max(self.bins)
+        width = max(math.ceil((high - low + 1) / n_bins), 1)
+        counts: dict[int, int] = {}
+        for key, count in self.bins.items():
+            group = low + (key - low) // width * width
+            counts[group] = counts.get(group, 0) + count
+        edges = [round(self.gamma ** (group - 1), 1) for group in sorted(counts)]
+        return pd.Series([counts[group] for group in sorted(counts)], index=edges, name="count")
+
+    def to_dict(self) -> dict:
+        """JSON 用（ビンは最小キーからの相対位置で保存）"""
+        if not self.bins:
+            return {"alpha": self.alpha, "zero": self.zero, "offset": 0, "counts": []}
+        offset = min(self.bins)
+        counts = [0] * (max(self.bins) - offset + 1)
+        for key, count in self.bins.items():
+            counts[key - offset] = count
+        return {"alpha": self.alpha, "zero": self.zero, "offset": offset, "counts": counts}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        bins = {data["offset"] + i: count for i, count in enumerate(data["counts"]) if count}
+        return cls(data["alpha"], bins, data["zero"])
+
+
+def partition_sketches(df: pd.DataFrame) -> dict[str, dict]:
+    """パーティションの列ごとのスケッチ（SnapshotStore のスケッチファイル用）"""
+    return {col: QuantileSketch.from_values(df[col]).to_dict() for col in SKETCH_COLUMNS if col in df.columns}
+
+
+def frame_sketches(df: pd.DataFrame) -> dict[str, dict[str, QuantileSketch]]:
+    """行データからキーワード別のスケッチを作成（SnapshotStore.sketches と同じ形）"""
+    return {
+        keyword: {col: QuantileSketch.from_values(group[col]) for col in SKETCH_COLUMNS}
+        for keyword, group in df.groupby("keyword", sort=False)
+    }
@@ -0,0 +1,622 @@
+"""スナップショット単位のパーティション保存
+
+構成:
+    research_store/
+        manifest.json                           # コミット済みパーティションと列統計（min/max）・集計値
+        rates.json                              # スナップショット別の為替レート（利益列は読み込み時に計算）
+        <snapshot_id>/part-<hash>.arrow         # 1スナップショット × 1キーワード = 1パーティション
+        <snapshot_id>/part-<hash>.sketch.json   # パーティションの分位点スケッチ
+
+台湾以外の地域のスナップショットIDには地域コードを付ける（20250101-120000_my）。
+同時刻に複数地域を取得しても、スナップショット別の為替レートが地域ごとに記録される。
+価格は地域の通貨のため、読み込み（scan / rollups / sketches など）は既定で1地域（台湾）に限定する。
+地域の記録がない既存のパーティションは既定の地域として扱う。
+
+読み込み時はマニフェストのキーワードと列統計で不要なパーティションを除外し、
+条件に合う可能性があるファイルだけを読む。
+パーティションごとの集計値（行数・販売数合計・価格合計）は書き込み時にマニフェストへ記録し、
+カテゴリ別のグラフは行データを読まずにこれから計算する（analytics.category_summary）。
+価格・販売数の分位点スケッチ（sketch.py）はパーティションごとの別ファイルに記録し、併合して分布を求める
+（マニフェストはコミットのたびに全体を書き直すため、大きいスケッチは含めない）。
+
+パーティションは Arrow IPC（Feather v2、非圧縮）で保存し、メモリマップで読み込む。
+読み込んだ列は Arrow のまま（pd.ArrowDtype）DataFrame にするため、範囲条件のない scan の
+保存列はメモリマップ上のデータをコピーせずに参照する（ダッシュボードを複数プロセスで動かしても
+ページキャッシュ上の同じデータを共有する）。利益列の付与（assign）・パーティションの結合（concat）も
+Arrow の配列を参照するだけでコピーしない。プロセスごとのメモリになるのは、範囲条件で抽出した行と
+読み込み時に計算する利益列（パーティション単位でキャッシュ）だけ。
+pyarrow がない環境では CSV で保存する（既存の CSV パーティションも読める）。
+
+使い方:
+    python storage.py --convert    # CSV パーティションを Arrow に変換
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from config import DEFAULT_REGION, EXCHANGE_RATE, STORE_DIR
+from cost_model import load_cost_model, model_version
+from log import get_logger, log_fields, setup_logging
+from rates import RateTable
+from sketch import QuantileSketch, partition_sketches
+
+logger = get_logger("storage")
+
+MANIFEST_FILE = "manifest.json"
+
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+PARTITION_FORMAT = "arrow" if ARROW_AVAILABLE else "csv"
+
+# パーティションごとに min/max を記録する列
+STAT_COLUMNS = ["price", "sales", "shop_rating"]
+
+
+def snapshot_id_from_timestamp(timestamp: str) -> str:
+    """タイムスタンプ（%Y-%m-%d %H:%M:%S）からスナップショットIDを作成"""
+    return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").strftime("%Y%m%d-%H%M%S")
+
+
+def region_snapshot_id(timestamp: str, region: str = DEFAULT_REGION) -> str:
+    """地域のスナップショットID（既定の地域は snapshot_id_from_timestamp と同じ）"""
+    snapshot_id = snapshot_id_from_timestamp(timestamp)
+    return snapshot_id if region == DEFAULT_REGION else f"{snapshot_id}_{region}"
+
+
+def _region(part: dict) -> str:
+    """パーティションの地域（記録がない既存のパーティションは既定の地域）"""
+    return part.get("region", DEFAULT_REGION)
+
+
+def _column_stats(df: pd.DataFrame) -> dict:
+    """列統計（min/max）を作成。値がない列は None"""
+    stats = {}
+    for col in STAT_COLUMNS:
+        if col not in df.columns:
+            continue
+        values = pd.to_numeric(df[col], errors="coerce")
+        if values.notna().any():
+            stats[col] = [float(values.min()), float(values.max())]
+        else:
+            stats[col] = None
+    return stats
+
+
+def _may_match(stats: dict, ranges: dict) -> bool:
+    """列統計から、範囲条件に合う行が存在しうるかを判定"""
+    for col, (low, high) in ranges.items():
+        col_stats = stats.get(col)
+        if col_stats is None:
+            continue
+        col_min, col_max = col_stats
+        if low is not None and col_max < low:
+            return False
+        if high is not None and col_min > high:
+            return False
+    return True
+
+
+def _covers(stats: dict, ranges: dict) -> bool:
+    """列統計から、パーティションの全行が範囲条件に合うかを判定"""
+    for col, (low, high) in ranges.items():
+        col_stats = stats.get(col)
+        if col_stats is None:
+            return False
+        col_min, col_max = col_stats
+        if low is not None and col_min < low:
+            return False
+        if high is not None and col_max > high:
+            return False
+    return True
+
+
+def _sketch_path(rel_path: str) -> str:
+    """パーティションの分位点スケッチのファイル（パーティションと同じディレクトリ。形式によらず同じ名前）"""
+    return os.path.splitext(rel_path)[0] + ".sketch.json"
+
+
+def _rollup(df: pd.DataFrame) -> dict:
+    """パーティションの集計値（行数・販売数合計・価格合計・保存時のレート）"""
+    return {
+        "rows": len(df),
+        "sum_sales": float(pd.to_numeric(df["sales"], errors="coerce").sum()),
+        "sum_price": float(pd.to_numeric(df["price"], errors="coerce").sum()),
+        "rate": stored_rate(df),
+    }
+
+
+def stored_rate(df: pd.DataFrame) -> float:
+    """保存済みの price_jpy / price から取得時のレートを求める（なければ EXCHANGE_RATE）"""
+    if "price_jpy" in df.columns:
+        valid = df[df["price"] > 0]
+        if not valid.empty:
+            return round(float((valid["price_jpy"] / valid["price"]).median()), 2)
+    return EXCHANGE_RATE
+
+
+def _write_partition(df: pd.DataFrame, path: str, fmt: str) -> None:
+    """パーティションを書き込む（arrow: Arrow IPC / csv: CSV）"""
+    if fmt == "arrow":
+        from pyarrow import feather
+
+        feather.write_feather(df.reset_index(drop=True), path, compression="uncompressed")
+    else:
+        df.to_csv(path, index=False, encoding="utf-8")
+
+
+def _read_partition(path: str, ranges: dict) -> pd.DataFrame:
+    """パーティションを読み込み、範囲条件を適用する
+
+    Arrow はメモリマップで開き、列は Arrow のまま（pd.ArrowDtype）返す。
+    範囲条件がなければメモリマップを参照し（コピーなし）、あれば条件に合う行だけをコピーする。
+    """
+    if not path.endswith(".arrow"):
+        return _apply_ranges(pd.read_csv(path, encoding="utf-8"), ranges)
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    mask = None
+    for col, (low, high) in ranges.items():
+        for op, bound in ((pc.greater_equal, low), (pc.less_equal, high)):
+            if bound is not None:
+                cond = op(table[col], bound)
+                mask = cond if mask is None else pc.and_(mask, cond)
+    if mask is not None:
+        table = table.filter(mask)
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def _arrow_backed(values: pd.Series):
+    """計算した列を Arrow の配列にする（結合時にコピーされず、キャッシュした配列をそのまま参照する）
+
+    pyarrow がない環境では numpy 配列のまま。NaN は欠損値（null）とする。
+    """
+    if not ARROW_AVAILABLE:
+        return values.to_numpy()
+    import pyarrow as pa
+
+    return pd.arrays.ArrowExtensionArray(pa.array(values.to_numpy(dtype=float), from_pandas=True))
+
+
+def _apply_ranges(df: pd.DataFrame, ranges: dict) -> pd.DataFrame:
+    """行単位で範囲条件を適用"""
+    mask = pd.Series(True, index=df.index)
+    for col, (low, high) in ranges.items():
+        if low is not None:
+            mask &= df[col] >= low
+        if high is not None:
+            mask &= df[col] <= high
+    return df[mask]
+
+
+class SnapshotStore:
+    """スナップショット単位のパーティションストア"""
+
+    def __init__(self, root: str = STORE_DIR):
+        self.root = root
+        self.rates = RateTable(root)
+        self._manifest_cache: tuple[int, list[dict]] | None = None
+        # 利益列の計算結果（コストモデル・マニフェストのバージョンごと）: (パス, レート) -> 列
+        self._derived: tuple[tuple, dict[tuple, dict]] = ((), {})
+        # 集計値・スケッチを記録していない（旧形式の）パーティションの計算結果（マニフェストのバージョンごと）
+        self._legacy: tuple[int, dict[str, dict]] = (0, {})
+        # 読み込んだ分位点スケッチ（マニフェストのバージョンごと）: パス -> スケッチ
+        self._sketches: tuple[int, dict[str, dict]] = (0, {})
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.root, MANIFEST_FILE)
+
+    def partitions(self) -> list[dict]:
+        """コミット済みパーティション一覧（マニフェストの更新時刻でキャッシュ）"""
+        version = self._manifest_version()
+        if version == 0:
+            return []
+
+        if self._manifest_cache is None or self._manifest_cache[0] != version:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self._manifest_cache = (version, json.load(f)["partitions"])
+        return self._manifest_cache[1]
+
+    def _manifest_version(self) -> int:
+        """マニフェストの更新時刻。未作成なら 0"""
+        if not os.path.exists(self.manifest_path):
+            return 0
+        return os.stat(self.manifest_path).st_mtime_ns
+
+    def version(self) -> int:
+        """マニフェスト・レート表・コストモデルの更新時刻（キャッシュキー用）。未作成なら 0"""
+        return self._manifest_version() + self.rates.version() + model_version()
+
+    def keywords(self, region: str | None = DEFAULT_REGION) -> list[str]:
+        """保存済みのキーワード一覧（データは読まない。region=None で全地域）"""
+        return list(dict.fromkeys(p["keyword"] for p in self._select(None, {}, None, region)))
+
+    def row_count(self) -> int:
+        """コミット済みの累計行数（データは読まない）"""
+        return sum(p["rows"] for p in self.partitions())
+
+    def snapshots(self, region: str | None = DEFAULT_REGION) -> list[str]:
+        """保存済みのスナップショットID一覧（古い順。region=None で全地域）"""
+        return sorted({p["snapshot_id"] for p in self._select(None, {}, None, region)})
+
+    def regions(self) -> list[str]:
+        """保存済みの地域一覧"""
+        return sorted({_region(p) for p in self.partitions()})
+
+    def stage_partition(
+        self,
+        df: pd.DataFrame,
+        snapshot_id: str,
+        keyword: str,
+        fmt: str = PARTITION_FORMAT,
+    ) -> dict:
+        """パーティションファイルを書き込む（commit するまで読み込み対象にならない）
+
+        Args:
+            fmt: 保存形式（arrow / csv）
+
+        Returns:
+            dict: マニフェストに登録するパーティション情報
+        """
+        digest = hashlib.sha1(keyword.encode("utf-8")).hexdigest()[:8]
+        rel_path = os.path.join(snapshot_id, f"part-{digest}.{fmt}")
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = path + ".tmp"
+        _write_partition(df, tmp_path, fmt)
+        os.replace(tmp_path, path)
+
+        sketch_path = os.path.join(self.root, _sketch_path(rel_path))
+        with open(sketch_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(partition_sketches(df), f, separators=(",", ":"))
+        os.replace(sketch_path + ".tmp", sketch_path)
+
+        entry = {
+            "snapshot_id": snapshot_id,
+            "timestamp": str(df["timestamp"].iloc[0]) if "timestamp" in df.columns and len(df) else None,
+            "keyword": keyword,
+            "path": rel_path,
+            "rows": len(df),
+            "stats": _column_stats(df),
+            "rollup": _rollup(df),
+        }
+        if "region" in df.columns and len(df):
+            entry["region"] = str(df["region"].iloc[0])
+        return entry
+
+    def commit(self, entries: list[dict]) -> None:
+        """パーティションをマニフェストに登録（一時ファイル + rename で原子的に更新）
+
+        同じ (snapshot_id, keyword) のパーティションは置き換える。
+        マニフェストは区切りの空白なしで書き込む（コミットごとに全体を書き直すため）。
+        """
+        keys = {(e["snapshot_id"], e["keyword"]) for e in entries}
+        partitions = [p for p in self.partitions() if (p["snapshot_id"], p["keyword"]) not in keys]
+        partitions.extend(entries)
+
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "partitions": partitions}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.manifest_path)
+        self._manifest_cache = None
+
+    def write_snapshot(self, df: pd.DataFrame, snapshot_id: str | None = None) -> str:
+        """1スナップショット分のデータをキーワード別パーティションとして保存
+
+        Returns:
+            str: スナップショットID
+        """
+        if snapshot_id is None:
+            snapshot_id = snapshot_id_from_timestamp(str(df["timestamp"].iloc[0]))
+
+        entries = [
+            self.stage_partition(group, snapshot_id, keyword)
+            for keyword, group in df.groupby("keyword", sort=False)
+        ]
+        self.commit(entries)
+        return snapshot_id
+
+    def import_csv(self, path: str) -> list[str]:
+        """既存の結果CSVをタイムスタンプごとのスナップショットとして取り込む"""
+        df = pd.read_csv(path, encoding="utf-8-sig")
+        return [self.write_snapshot(group) for _, group in df.groupby("timestamp", sort=True)]
+
+    def iter_scan(
+        self,
+        keywords: list[str] | None = None,
+        ranges: dict | None = None,
+        snapshots: list[str] | None = None,
+        region: str | None = DEFAULT_REGION,
+    ):
+        """条件に合う行をパーティション単位で読み込む（空のパーティションは返さない）
+
+        地域・キーワード・スナップショット・列統計で除外したパーティションは読まない。
+
+        Args:
+            keywords: 対象キーワード（None=すべて）
+            ranges: {列名: (下限, 上限)}（None は上下限なし）
+            snapshots: 対象スナップショットID（None=すべて）
+            region: 対象地域（None=すべて。価格の通貨が混ざるため集計には使わない）
+        """
+        ranges = ranges or {}
+        for part in self._select(keywords, ranges, snapshots, region):
+            df = _read_partition(os.path.join(self.root, part["path"]), ranges)
+            if not df.empty:
+                yield self._derive_profit(df, part, filtered=bool(ranges))
+
+    def _select(self, keywords: list[str] | None, ranges: dict, snapshots: list[str] | None, region: str | None):
+        """地域・キーワード・スナップショット・列統計で対象になりうるパーティション"""
+        keyword_set = set(keywords) if keywords is not None else None
+        snapshot_set = set(snapshots) if snapshots is not None else None
+
+        for part in self.partitions():
+            if region is not None and _region(part) != region:
+                continue
+            if keyword_set is not None and part["keyword"] not in keyword_set:
+                continue
+            if snapshot_set is not None and part["snapshot_id"] not in snapshot_set:
+                continue
+            if not _may_match(part["stats"], ranges):
+                continue
+            yield part
+
+    def rollups(
+        self,
+        keywords: list[str] | None = None,
+        ranges: dict | None = None,
+        snapshots: list[str] | None = None,
+        region: str | None = DEFAULT_REGION,
+    ) -> pd.DataFrame | None:
+        """パーティションごとの集計値（行データは読まない。引数は iter_scan と同じ）
+
+        範囲条件で一部の行だけが除外されるパーティションがある場合は、
+        集計値から求められないため None を返す。
+
+        Returns:
+            DataFrame: snapshot_id / keyword / rows / sum_sales / sum_price / rate
+                       （rate は記録済みのレート、なければ保存時のレート）
+        """
+        ranges = ranges or {}
+        records = []
+        for part in self._select(keywords, ranges, snapshots, region):
+            if not _covers(part["stats"], ranges):
+                return None
+            rollup = part.get("rollup") or self._legacy_summary(part)["rollup"]
+            rate = self.rates.get(part["snapshot_id"])
+            records.append({
+                "snapshot_id": part["snapshot_id"],
+                "keyword": part["keyword"],
+                **rollup,
+                "rate": rate if rate is not None else rollup["rate"],
+            })
+        return pd.DataFrame(records, columns=["snapshot_id", "keyword", "rows", "sum_sales", "sum_price", "rate"])
+
+    def sketches(
+        self,
+        keywords: list[str] | None = None,
+        ranges: dict | None = None,
+        snapshots: list[str] | None = None,
+        region: str | None = DEFAULT_REGION,
+    ) -> dict[str, dict[str, QuantileSketch]] | None:
+        """キーワード別の分位点スケッチ（スナップショットをまたいで併合。引数は iter_scan と同じ）
+
+        範囲条件で一部の行だけが除外されるパーティションがある場合は None を返す。
+
+        Returns:
+            dict: {キーワード: {列名: QuantileSketch}}
+        """
+        ranges = ranges or {}
+        merged: dict[str, dict[str, QuantileSketch]] = {}
+        for part in self._select(keywords, ranges, snapshots, region):
+            if not _covers(part["stats"], ranges):
+                return None
+            sketches = self._partition_sketch(part)
+            current = merged.setdefault(part["keyword"], {})
+            for col, data in sketches.items():
+                sketch = QuantileSketch.from_dict(data)
+                current[col] = current[col].merge(sketch) if col in current else sketch
+        return merged
+
+    def _partition_sketch(self, part: dict) -> dict:
+        """パーティションの分位点スケッチ（別ファイルから読み込み、マニフェスト更新までキャッシュ）
+
+        マニフェストに記録した旧形式のスケッチはそれを使い、どちらもなければデータから計算する。
+        """
+        if "sketch" in part:
+            return part["sketch"]
+        version = self._manifest_version()
+        if self._sketches[0] != version:
+            self._sketches = (version, {})
+        cache = self._sketches[1]
+        if part["path"] not in cache:
+            try:
+                with open(os.path.join(self.root, _sketch_path(part["path"])), encoding="utf-8") as f:
+                    cache[part["path"]] = json.load(f)
+            except FileNotFoundError:
+                cache[part["path"]] = self._legacy_summary(part)["sketch"]
+        return cache[part["path"]]
+
+    def _legacy_summary(self, part: dict) -> dict:
+        """集計値・スケッチのない旧形式のパーティションはデータから計算（マニフェスト更新までキャッシュ）"""
+        version = self._manifest_version()
+        if self._legacy[0] != version:
+            self._legacy = (version, {})
+        cache = self._legacy[1]
+        if part["path"] not in cache:
+            df = _read_partition(os.path.join(self.root, part["path"]), {})
+            cache[part["path"]] = {"rollup": _rollup(df), "sketch": partition_sketches(df)}
+        return cache[part["path"]]
+
+    def _derive_profit(self, df: pd.DataFrame, part: dict, filtered: bool) -> pd.DataFrame:
+        """利益列をスナップショットのレートとコストモデルから計算
+
+        レート未記録のスナップショットは保存時の price_jpy / price から求めたレートを使う。
+        パーティション全体の計算結果は (パス, レート, コストモデル) ごとにキャッシュする。
+        """
+        rate = self.rates.get(part["snapshot_id"])
+        if rate is None:
+            rate = stored_rate(df)
+        model = load_cost_model()
+        if filtered:
+            return df.assign(**{col: _arrow_backed(values) for col, values in model.stored_columns(df, rate).items()})
+
+        version = (model.version, self._manifest_cache[0])
+        if self._derived[0] != version:
+            self._derived = (version, {})
+        key = (part["path"], rate)
+        columns = self._derived[1].get(key)
+        if columns is None:
+            columns = {col: _arrow_backed(values) for col, values in model.stored_columns(df, rate).items()}
+            self._derived[1][key] = columns
+        return df.assign(**columns)
+
+    def scan(
+        self,
+        keywords: list[str] | None = None,
+        ranges: dict | None = None,
+        snapshots: list[str] | None = None,
+        region: str | None = DEFAULT_REGION,
+    ) -> pd.DataFrame:
+        """条件に合う行を読み込む（引数は iter_scan と同じ）"""
+        frames = list(self.iter_scan(keywords, ranges, snapshots, region))
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def convert(self, fmt: str = PARTITION_FORMAT) -> int:
+        """既存のパーティションを指定形式で書き直す（マニフェストの更新後に旧ファイルを削除）
+
+        Returns:
+            int: 変換したパーティション数
+        """
+        entries, old_paths = [], []
+        for part in self.partitions():
+            if part["path"].endswith(f".{fmt}"):
+                continue
+            path = os.path.join(self.root, part["path"])
+            df = _read_partition(path, {})
+            # マニフェストに記録した旧形式のスケッチは別ファイルに移す
+            part = {key: value for key, value in part.items() if key != "sketch"}
+            entries.append({**part, **self.stage_partition(df, part["snapshot_id"], part["keyword"], fmt)})
+            old_paths.append(path)
+        if entries:
+            self.commit(entries)
+        for path in old_paths:
+            os.remove(path)
+        return len(entries)
+
+
+class SweepLog:
+    """スイープの先行書き込みログ（キーワード単位のチェックポイント）
+
+    1行目にタイムスタンプと地域、以降はキーワードごとの取得結果を JSON Lines で追記する。
+    ファイル名は地域のスナップショットID（地域ごとに別のログ。価格の通貨が混ざらないように再開も地域ごと）。
+    スナップショットのコミット後に削除する。残っているログは未完了のスイープ。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, encoding="utf-8") as f:
+            header = json.loads(f.readline())
+        self.timestamp = header["timestamp"]
+        # 地域の記録がない既存のログは既定の地域
+        self.region = header.get("region", DEFAULT_REGION)
+
+    @staticmethod
+    def _wal_dir(root: str) -> str:
+        return os.path.join(root, "wal")
+
+    @classmethod
+    def create(cls, timestamp: str, region: str = DEFAULT_REGION, root: str = STORE_DIR) -> "SweepLog":
+        """新しいスイープのログを作成"""
+        wal_dir = cls._wal_dir(root)
+        os.makedirs(wal_dir, exist_ok=True)
+        path = os.path.join(wal_dir, f"{region_snapshot_id(timestamp, region)}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"timestamp": timestamp, "region": region}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        return cls(path)
+
+    @classmethod
+    def latest_open(cls, region: str = DEFAULT_REGION, root: str = STORE_DIR) -> "SweepLog | None":
+        """地域の未完了のスイープのうち最新のログ（なければ None）"""
+        wal_dir = cls._wal_dir(root)
+        if not os.path.isdir(wal_dir):
+            return None
+        logs = [cls(os.path.join(wal_dir, name)) for name in os.listdir(wal_dir) if name.endswith(".jsonl")]
+        logs = [log for log in logs if log.region == region]
+        if not logs:
+            return None
+        return max(logs, key=lambda log: log.timestamp)
+
+    @property
+    def snapshot_id(self) -> str:
+        return region_snapshot_id(self.timestamp, self.region)
+
+    def completed(self) -> dict[str, list[dict]]:
+        """チェックポイント済みのキーワードと取得結果
+
+        書き込み途中で中断された末尾の行は切り捨てる（以降の追記を壊さないため）。
+        """
+        done = {}
+        with open(self.path, "rb+") as f:
+            valid_end = len(f.readline())
+            for line in f:
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                done[record["keyword"]] = record["products"]
+                valid_end += len(line)
+            f.truncate(valid_end)
+        return done
+
+    def append(self, keyword: str, products: list[dict]) -> None:
+        """キーワードの取得結果をチェックポイントとして追記（fsync まで行う）"""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"keyword": keyword, "products": products}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self) -> None:
+        """コミット完了後にログを削除"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="スナップショットストアの確認・形式変換")
+    parser.add_argument("--convert", action="store_true", help=f"パーティションを {PARTITION_FORMAT} 形式に変換")
+    parser.add_argument("--store", default=STORE_DIR, help="スナップショットストア")
+    args = parser.parse_args()
+
+    setup_logging()
+    store = SnapshotStore(args.store)
+    if args.convert:
+        count = store.convert()
+        logger.info(f"✅ {count}個のパーティションを {PARTITION_FORMAT} 形式に変換しました", extra=log_fields(converted=count))
+        return
+
+    formats = pd.Series([os.path.splitext(p["path"])[1].lstrip(".") for p in store.partitions()]).value_counts()
+    logger.info(
+        f"🗄️ {args.store}: {len(store.snapshots(region=None))}スナップショット / {len(store.partitions())}パーティション / {store.row_count():,}行\n"
+        + "\n".join(f"   {fmt}: {count}" for fmt, count in formats.items())
+    )
+
+
+if __name__ == "__main__":
+    main()
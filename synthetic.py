@@ -0,0 +1,249 @@
+"""大規模データの合成（スケール検証用）
+
+サンプルデータ（SAMPLE_PRODUCTS）のカテゴリ別分布から、任意の件数の商品・スナップショットを
+決定的に生成してストアに書き込む。
+- 価格・販売数: カテゴリごとに対数正規分布で近似
+- 評価: カテゴリ内の実際の評価値から抽出
+- 商品名: サンプルの商品名を「ブランド / 商品 / 規格」に分け、カテゴリ内で組み合わせる
+- スナップショット間で商品は同じ（価格は小さく変動、販売数は累計なので増加）
+
+乱数は (seed, キーワード番号, スナップショット番号) ごとに独立しているため、
+生成順や件数の一部を変えても同じ商品は同じ値になる。
+1スナップショット × 1キーワード（= 1パーティション）を1チャンクとしてまとめて生成する。
+
+使い方:
+    python synthetic.py --keywords 60 --products 20000 --snapshots 10
+    python synthetic.py --products 1000000 --store synthetic_store --seed 1
+"""
+
+import argparse
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import EXCHANGE_RATE
+from cost_model import load_cost_model
+from log import get_logger, log_fields, setup_logging
+from sample_data import SAMPLE_PRODUCTS
+from storage import SnapshotStore, snapshot_id_from_timestamp
+
+logger = get_logger("synthetic")
+
+SYNTHETIC_STORE_DIR = "synthetic_store"
+DEFAULT_START = "2025-01-01 09:00:00"
+
+_SPEC_PATTERN = re.compile(r"\d|入|裝")
+
+# スナップショットごとの価格変動（標準偏差）と販売数の増加率（上限）
+PRICE_JITTER = 0.03
+MAX_SALES_GROWTH = 0.02
+
+
+@dataclass(frozen=True)
+class CategoryProfile:
+    """1カテゴリの分布（サンプルデータから推定）"""
+
+    keyword: str
+    log_price: tuple[float, float]   # log(価格) の平均・標準偏差
+    log_sales: tuple[float, float]   # log(販売数) の平均・標準偏差
+    ratings: np.ndarray
+    brands: np.ndarray
+    items: np.ndarray
+    specs: np.ndarray
+
+
+def _split_name(name: str) -> tuple[str, str, str]:
+    """商品名を (ブランド, 商品, 規格) に分ける。該当部分がなければ空文字
+
+    規格は数字や「入」「裝」を含む末尾の語（"20入", "120g", "大袋裝" など）とする。
+    """
+    brand, _, rest = name.partition(" ")
+    item, _, last = rest.rpartition(" ")
+    if item and _SPEC_PATTERN.search(last):
+        return brand, item, last
+    return brand, rest, ""
+
+
+def _profile(keyword: str, products: list[dict]) -> CategoryProfile:
+    log_price = np.log([p["price"] for p in products])
+    log_sales = np.log([max(p["sales"], 1) for p in products])
+    brands, items, specs = zip(*(_split_name(p["name"]) for p in products))
+    return CategoryProfile(
+        keyword=keyword,
+        log_price=(float(log_price.mean()), float(log_price.std())),
+        log_sales=(float(log_sales.mean()), float(log_sales.std())),
+        ratings=np.array([p["shop_rating"] for p in products]),
+        brands=np.array(sorted(set(brands)), dtype=object),
+        items=np.array(sorted(set(items)), dtype=object),
+        specs=np.array(sorted(set(specs)), dtype=object),
+    )
+
+
+def _build_profiles() -> tuple[CategoryProfile, ...]:
+    by_keyword: dict[str, list[dict]] = {}
+    for product in SAMPLE_PRODUCTS:
+        by_keyword.setdefault(product["keyword"], []).append(product)
+    return tuple(_profile(keyword, products) for keyword, products in by_keyword.items())
+
+
+PROFILES = _build_profiles()
+
+
+def synthetic_keywords(n_keywords: int) -> list[str]:
+    """合成キーワード（最初はサンプルのカテゴリ名、以降は「カテゴリ名 #n」）"""
+    keywords = []
+    for i in range(n_keywords):
+        base = PROFILES[i % len(PROFILES)].keyword
+        round_ = i // len(PROFILES)
+        keywords.append(base if round_ == 0 else f"{base} #{round_ + 1}")
+    return keywords
+
+
+def _rng(seed: int, *keys: int) -> np.random.Generator:
+    return np.random.default_rng(np.random.SeedSequence([seed, *keys]))
+
+
+def _catalogue(profile: CategoryProfile, n_products: int, seed: int, keyword_index: int) -> dict:
+    """1カテゴリの商品（スナップショットによらない属性）"""
+    rng = _rng(seed, keyword_index)
+    n_items, n_specs = len(profile.items), len(profile.specs)
+    combos = (
+        rng.integers(0, len(profile.brands), n_products) * n_items
+        + rng.integers(0, n_items, n_products)
+    ) * n_specs + rng.integers(0, n_specs, n_products)
+    # 組み合わせの数は限られるため、文字列の連結は重複を除いた組み合わせごとに1回だけ行う
+    unique, inverse = np.unique(combos, return_inverse=True)
+    names = np.array([
+        " ".join(filter(None, (profile.brands[c // (n_items * n_specs)], profile.items[c // n_specs % n_items], profile.specs[c % n_specs])))
+        for c in unique.tolist()
+    ], dtype=object)
+    return {
+        "name": names[inverse],
+        "price": np.exp(rng.normal(*profile.log_price, n_products)),
+        "sales": np.exp(rng.normal(*profile.log_sales, n_products)),
+        "growth": rng.uniform(0, MAX_SALES_GROWTH, n_products),
+        "shop_rating": rng.choice(profile.ratings, n_products),
+    }
+
+
+def synthetic_partition(
+    keyword: str,
+    catalogue: dict,
+    timestamp: str,
+    snapshot_index: int,
+    seed: int,
+    keyword_index: int,
+    exchange_rate: float = EXCHANGE_RATE,
+) -> pd.DataFrame:
+    """1スナップショット × 1キーワード分の行（ストアと同じ列・利益計算済み）"""
+    n = len(catalogue["name"])
+    rng = _rng(seed, keyword_index, snapshot_index)
+    price = np.maximum(np.round(catalogue["price"] * (1 + rng.normal(0, PRICE_JITTER, n))), 1)
+    sales = np.round(catalogue["sales"] * (1 + catalogue["growth"] * snapshot_index)).astype(np.int64)
+    df = pd.DataFrame({
+        "timestamp": timestamp,
+        "keyword": keyword,
+        "name": catalogue["name"],
+        "price": price,
+        "sales": sales,
+        "shop_rating": catalogue["shop_rating"],
+    })
+    return df.assign(**load_cost_model().stored_columns(df, exchange_rate))
+
+
+def iter_synthetic(
+    n_keywords: int = len(PROFILES),
+    products_per_keyword: int = 1000,
+    n_snapshots: int = 1,
+    seed: int = 0,
+    start: str = DEFAULT_START,
+    interval_hours: float = 24,
+    exchange_rate: float = EXCHANGE_RATE,
+):
+    """合成データをパーティション単位で返す
+
+    Yields:
+        (スナップショットID, キーワード, DataFrame)
+    """
+    keywords = synthetic_keywords(n_keywords)
+    catalogues = [
+        _catalogue(PROFILES[i % len(PROFILES)], products_per_keyword, seed, i)
+        for i in range(n_keywords)
+    ]
+    first = datetime.strptime(start, "%Y-%m-%d %H:%M:%S")
+    for t in range(n_snapshots):
+        timestamp = (first + timedelta(hours=interval_hours * t)).strftime("%Y-%m-%d %H:%M:%S")
+        snapshot_id = snapshot_id_from_timestamp(timestamp)
+        for i, keyword in enumerate(keywords):
+            yield snapshot_id, keyword, synthetic_partition(keyword, catalogues[i], timestamp, t, seed, i, exchange_rate)
+
+
+def synthetic_df(n: int, n_keywords: int = len(PROFILES), seed: int = 0) -> pd.DataFrame:
+    """約 n 行の合成データ（1スナップショット。ベンチマーク用にメモリ上で作成）"""
+    per_keyword = -(-n // n_keywords)
+    frames = [df for _, _, df in iter_synthetic(n_keywords, per_keyword, 1, seed)]
+    return pd.concat(frames, ignore_index=True).iloc[:n]
+
+
+def generate(
+    store: SnapshotStore,
+    n_keywords: int = len(PROFILES),
+    products_per_keyword: int = 1000,
+    n_snapshots: int = 1,
+    seed: int = 0,
+    start: str = DEFAULT_START,
+    interval_hours: float = 24,
+    exchange_rate: float = EXCHANGE_RATE,
+) -> int:
+    """合成データをストアに書き込む（スナップショットごとにコミット）
+
+    Returns:
+        int: 書き込んだ行数
+    """
+    rows = 0
+    entries: list[dict] = []
+    current = None
+    for snapshot_id, keyword, df in iter_synthetic(
+        n_keywords, products_per_keyword, n_snapshots, seed, start, interval_hours, exchange_rate,
+    ):
+        if snapshot_id != current and entries:
+            store.rates.set(current, exchange_rate)
+            store.commit(entries)
+            entries = []
+        current = snapshot_id
+        entries.append(store.stage_partition(df, snapshot_id, keyword))
+        rows += len(df)
+    if entries:
+        store.rates.set(current, exchange_rate)
+        store.commit(entries)
+    return rows
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description="サンプルデータの分布から大規模な合成データを作成")
+    parser.add_argument("--keywords", type=int, default=len(PROFILES), help="キーワード数")
+    parser.add_argument("--products", type=int, default=1000, help="1キーワードあたりの商品数")
+    parser.add_argument("--snapshots", type=int, default=1, help="スナップショット数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    parser.add_argument("--start", default=DEFAULT_START, help="最初のスナップショットの日時（%%Y-%%m-%%d %%H:%%M:%%S）")
+    parser.add_argument("--interval-hours", type=float, default=24, help="スナップショットの間隔（時間）")
+    parser.add_argument("--exchange-rate", type=float, default=EXCHANGE_RATE, help="為替レート")
+    parser.add_argument("--store", default=SYNTHETIC_STORE_DIR, help="書き込み先ストア")
+    args = parser.parse_args()
+
+    setup_logging()
+    total = args.keywords * args.products * args.snapshots
+    logger.info(f"🧪 合成データを作成中... {args.keywords}キーワード × {args.products:,}商品 × {args.snapshots}スナップショット = {total:,}行")
+    rows = generate(
+        SnapshotStore(args.store), args.keywords, args.products, args.snapshots,
+        args.seed, args.start, args.interval_hours, args.exchange_rate,
+    )
+    logger.info(f"✅ {rows:,}行を {args.store} に保存しました", extra=log_fields(store=args.store, rows=rows, seed=args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""api: 想定外のエラーでも JSON の 500 を返す"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import api
+from storage import SnapshotStore
+from synthetic import synthetic_df
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.write_snapshot(synthetic_df(200, 3, seed=0))
+    return store
+
+
+@pytest.fixture
+def server(store, monkeypatch):
+    monkeypatch.setattr(api, "RELOAD_INTERVAL", 0)
+    server = api.make_server("127.0.0.1", 0, store.root)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _get(url: str) -> tuple[int, dict]:
+    try:
+        with urllib.request.urlopen(url, timeout=10) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+def test_corrupt_partition_returns_500(server, store):
+    assert _get(f"{server}/ranking")[0] == 200
+
+    # 新しいスナップショットのパーティションが壊れている
+    snapshot_id = store.write_snapshot(synthetic_df(200, 3, seed=1).assign(timestamp="2025-01-02 09:00:00"))
+    for part in store.partitions():
+        if part["snapshot_id"] == snapshot_id:
+            with open(f"{store.root}/{part['path']}", "wb") as f:
+                f.write(b"broken")
+
+    status, body = _get(f"{server}/ranking")
+    assert status == 500
+    assert "error" in body
+    # 接続は維持され、以降のリクエストにも応答する
+    assert _get(f"{server}/nope")[0] == 500
@@ -0,0 +1,30 @@
+"""benchmark: 性能の予算・ベースラインのゲート（python benchmark.py と同じチェック）"""
+
+import os
+
+import pytest
+
+import benchmark
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def in_repo_root(monkeypatch):
+    """ベースラインのファイルはリポジトリ直下から読む"""
+    monkeypatch.chdir(ROOT)
+
+
+def test_startup_within_budget():
+    assert benchmark.bench_startup() == []
+
+
+def test_analytics_scaling():
+    """10^4 → 10^5 行の増加の傾きとピークメモリ（処理時間の絶対値はマシンに依存するため比較しない）"""
+    assert benchmark.bench_analytics(row_counts=[10_000, 100_000], compare_time=False) == []
+
+
+@pytest.mark.slow
+def test_analytics_within_baseline():
+    """10^6 行を含む全件（処理時間もベースラインと比較。ベースラインを記録したマシンで実行する）"""
+    assert benchmark.bench_analytics() == []
@@ -0,0 +1,51 @@
+"""item_schema: キーの代替・不正な値の除外と件数"""
+
+import warnings
+
+import pytest
+
+from item_schema import parse_items
+
+
+def _item(**basic) -> dict:
+    return {"item_basic": {"name": "商品", "price": 10_000_000, "sold": 5, "shop_rating": 4.8, **basic}}
+
+
+def test_key_fallback():
+    page = parse_items([
+        _item(price=0, price_min=25_000_000),
+        {"name": "直接", "price_min": 5_000_000, "historical_sold": 7, "item_rating": {"rating_star": 4.26}},
+        _item(sold=0, historical_sold=12, shop_rating=0, item_rating={"rating_star": 3.9}),
+    ])
+    df = page.frame
+    assert df["price"].tolist() == [250, 50, 100]
+    assert df["sales"].tolist() == [5, 7, 12]
+    assert df["shop_rating"].tolist() == [4.8, 4.3, 3.9]
+    assert (page.items, page.dropped, page.malformed) == (3, 0, 0)
+
+
+@pytest.mark.parametrize("price", [-10_000_000, 30_000, "N/A", "abc", float("inf"), float("nan")])
+def test_invalid_price_is_malformed(price):
+    """負・数値でない・丸めると 0 になる価格（0.3 TWD）は malformed（警告も出さない）"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        page = parse_items([_item(price=price), _item()])
+    expected_malformed = 0 if price == "N/A" else 1
+    expected_dropped = 1 if price == "N/A" else 0
+    assert len(page.frame) == 1
+    assert (page.dropped, page.malformed) == (expected_dropped, expected_malformed)
+
+
+def test_dropped_and_malformed_counts():
+    page = parse_items([
+        _item(),
+        _item(name=""),                          # 商品名なし → dropped
+        _item(price=0),                          # 価格なし（代替キーもなし） → dropped
+        _item(shop_rating=7.5),                  # 評価が範囲外 → malformed
+        _item(name=123),                         # 商品名が文字列でない → malformed
+        _item(sold="many"),                      # 販売数が数値でない → malformed
+        "not a dict",                            # 商品の形式でない → malformed
+        {"item_basic": None},
+    ])
+    assert (page.items, page.dropped, page.malformed) == (8, 2, 5)
+    assert page.frame["price"].tolist() == [100]
@@ -0,0 +1,114 @@
+"""listing_ai: StubClient による重複排除・キャッシュ・失敗時の動作"""
+
+import threading
+
+import pytest
+
+from listing_ai import ListingCache, ListingGenerator, StubClient, product_key
+
+PRODUCTS = [
+    {"name": "Calbee 薯條 80g", "keyword": "日本 零食", "price": 120},
+    {"name": "日清 杯麵 78g", "keyword": "日本 泡麵", "price": 65},
+    {"name": "UCC 即溶咖啡 90g", "keyword": "日本 咖啡", "price": 250},
+]
+
+
+class FailingClient(StubClient):
+    """指定した商品名だけ失敗するクライアント"""
+
+    def __init__(self, fail_name: str):
+        super().__init__()
+        self.fail_name = fail_name
+
+    def complete(self, prompt: str) -> str:
+        if f"商品名: {self.fail_name}\n" in prompt:
+            with self._lock:
+                self.calls += 1
+            raise RuntimeError("API error")
+        return super().complete(prompt)
+
+
+def make_generator(tmp_path, client) -> ListingGenerator:
+    return ListingGenerator(client, ListingCache(str(tmp_path)), max_workers=4)
+
+
+@pytest.mark.parametrize("use_batch", [False, True])
+def test_generates_each_product_once(tmp_path, use_batch):
+    client = StubClient()
+    generator = make_generator(tmp_path, client)
+
+    listings = generator.generate_all(PRODUCTS + PRODUCTS, use_batch=use_batch)
+
+    assert client.calls == len(PRODUCTS)
+    assert set(listings) == {product_key(p) for p in PRODUCTS}
+    assert all(listing["hashtags"][0].startswith("#") for listing in listings.values())
+
+
+def test_concurrent_callers_share_inflight_generation(tmp_path):
+    client = StubClient(delay=0.05)
+    generator = make_generator(tmp_path, client)
+    results = []
+
+    def worker():
+        results.append(generator.generate_all(PRODUCTS))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert client.calls == len(PRODUCTS)
+    assert len(results) == 4 and all(len(result) == len(PRODUCTS) for result in results)
+
+
+def test_reuses_disk_cache(tmp_path):
+    generator = make_generator(tmp_path, StubClient())
+    first = generator.generate_all(PRODUCTS)
+
+    client = StubClient()
+    second = make_generator(tmp_path, client).generate_all(PRODUCTS)
+
+    assert client.calls == 0
+    assert second == first
+    assert make_generator(tmp_path, client).cached(PRODUCTS[0]) == first[product_key(PRODUCTS[0])]
+
+
+def test_failed_product_is_released_and_retried(tmp_path):
+    client = FailingClient(PRODUCTS[0]["name"])
+    generator = make_generator(tmp_path, client)
+
+    listings = generator.generate_all(PRODUCTS)
+
+    assert product_key(PRODUCTS[0]) not in listings
+    assert len(listings) == len(PRODUCTS) - 1
+    assert generator._inflight == {}
+    assert generator.cached(PRODUCTS[0]) is None
+
+    # 失敗はキャッシュしないので、次の呼び出しで再生成される
+    generator.client = StubClient()
+    assert generator.get(PRODUCTS[0]) is not None
+    assert generator.client.calls == 1
+
+
+def test_batch_failure_releases_all_products(tmp_path):
+    class BrokenBatchClient(StubClient):
+        def complete_batch(self, prompts, poll_interval=0.0):
+            raise RuntimeError("batch error")
+
+    generator = make_generator(tmp_path, BrokenBatchClient())
+
+    assert generator.generate_all(PRODUCTS, use_batch=True) == {}
+    assert generator._inflight == {}
+
+
+def test_prompt_error_does_not_leave_waiters_blocked(tmp_path):
+    generator = make_generator(tmp_path, StubClient())
+    broken = [*PRODUCTS, {"name": "價格不明", "keyword": "日本 零食"}]
+
+    with pytest.raises(KeyError):
+        generator.generate_all(broken)
+
+    assert generator._inflight == {}
+    # 中断された商品も、後の呼び出しで待機せずに生成される
+    assert len(generator.generate_all(PRODUCTS)) == len(PRODUCTS)
@@ -0,0 +1,39 @@
+"""query: 集計値から計算したカテゴリ別の統計と行データからの統計の一致"""
+
+import pandas as pd
+import pytest
+
+from analytics import frame_category_summary
+from profit import ProfitParams
+from query import query_category_summary, query_products
+from storage import SnapshotStore
+from synthetic import synthetic_df
+
+PARAMS = ProfitParams(4.5, 0.12, 250, 0.45)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.write_snapshot(synthetic_df(2_000, 6, seed=0))
+    store.write_snapshot(synthetic_df(1_000, 6, seed=1).assign(timestamp="2025-01-02 09:00:00"))
+    return store
+
+
+@pytest.mark.parametrize("min_sales", [None, 0])
+def test_category_summary_matches_rows(store, min_sales):
+    """利益の条件がなければ集計値から計算し、行データからの集計と一致する（赤字の商品を含む）"""
+    products = query_products(store, min_sales=min_sales, params=PARAMS)
+    assert (products["profit"] < 0).any()
+
+    summary = query_category_summary(store, min_sales=min_sales, params=PARAMS)
+    assert summary is not None
+    expected = frame_category_summary(products, "profit")
+    pd.testing.assert_frame_equal(
+        summary.sort_index(), expected.sort_index(), check_dtype=False, check_index_type=False, check_names=False,
+    )
+
+
+def test_profit_threshold_falls_back_to_rows(store):
+    """利益の条件で一部の行だけが除外されるパーティションがあれば None（行データから集計する）"""
+    assert query_category_summary(store, min_profit=0, params=PARAMS) is None
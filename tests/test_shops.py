@@ -0,0 +1,68 @@
+"""shops: ローカルのモックサーバーに対する店舗情報の付与"""
+
+import threading
+
+import pytest
+import requests
+
+import mock_shopee
+from sample_data import SAMPLE_PRODUCTS
+from shops import ShopCache, ShopEnricher, ShopFetcher
+
+
+@pytest.fixture
+def mock_url():
+    server = mock_shopee.make_server("127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _stats(url: str) -> dict:
+    return requests.get(f"{url}/_stats", timeout=10).json()
+
+
+def _products() -> list[dict]:
+    """モックと同じ shopid の商品（同じ店舗が複数の商品・キーワードに現れる）"""
+    return [
+        {
+            "keyword": product["keyword"],
+            "shopid": mock_shopee.mock_item(product)["item_basic"]["shopid"],
+            "sales": product["sales"],
+        }
+        for product in SAMPLE_PRODUCTS
+    ]
+
+
+def test_each_shop_fetched_once(mock_url, tmp_path):
+    products = _products()
+    shopids = {product["shopid"] for product in products}
+    assert len(shopids) < len(products)
+
+    with requests.Session() as session:
+        enricher = ShopEnricher(ShopFetcher(session, mock_url, delay=(0, 0)), ShopCache(str(tmp_path)))
+        enriched = enricher.enrich(products)
+        enricher.enrich(products)
+
+    stats = _stats(mock_url)
+    assert stats["distinct_shops"] == len(shopids)
+    assert stats["max_requests_per_shop"] == 1
+    expected = mock_shopee.mock_shop(products[0]["shopid"])
+    assert enriched[0]["shop_name"] == expected["name"]
+    assert enriched[0]["shop_follower_count"] == expected["follower_count"]
+    assert all(0 < product["shop_sales_share"] <= 1 for product in enriched)
+
+
+def test_shared_cache_skips_requests(mock_url, tmp_path):
+    products = _products()
+    with requests.Session() as session:
+        ShopEnricher(ShopFetcher(session, mock_url, delay=(0, 0)), ShopCache(str(tmp_path))).enrich(products)
+        before = _stats(mock_url)["shop_requests"]
+        enriched = ShopEnricher(ShopFetcher(session, mock_url, delay=(0, 0)), ShopCache(str(tmp_path))).enrich(products)
+
+    assert _stats(mock_url)["shop_requests"] == before
+    assert all(product["shop_name"] is not None for product in enriched)
@@ -0,0 +1,54 @@
+"""sketch: 分位点の相対誤差と併合"""
+
+import numpy as np
+import pytest
+
+from sketch import SKETCH_ALPHA, QuantileSketch
+
+QS = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+
+def _values(seed: int, n: int = 5_000) -> np.ndarray:
+    """桁の広い値（価格・販売数と同じく対数正規に近い分布）"""
+    return np.random.default_rng(seed).lognormal(5, 2, n)
+
+
+@pytest.mark.parametrize("alpha", [SKETCH_ALPHA, 0.005, 0.1])
+def test_relative_error_within_alpha(alpha):
+    values = _values(0)
+    sketch = QuantileSketch.from_values(values, alpha)
+    exact = np.quantile(values, QS, method="lower")
+    estimated = np.array(sketch.quantiles(QS))
+    assert np.all(np.abs(estimated - exact) <= alpha * exact * (1 + 1e-9))
+
+
+def test_zero_and_nan_values():
+    sketch = QuantileSketch.from_values([0, 0, np.nan, -5, 10, 20])
+    assert sketch.count == 5
+    assert sketch.quantiles([0.0, 0.5, 1.0])[:2] == [0.0, 0.0]
+    assert sketch.quantile(1.0) == pytest.approx(20, rel=SKETCH_ALPHA)
+    assert all(np.isnan(QuantileSketch().quantiles()))
+
+
+def test_merge_is_associative_and_matches_single_sketch():
+    a, b, c = (QuantileSketch.from_values(_values(seed)) for seed in (1, 2, 3))
+    left = a.merge(b).merge(c)
+    right = a.merge(b.merge(c))
+    combined = QuantileSketch.from_values(np.concatenate([_values(1), _values(2), _values(3)]))
+
+    assert left.to_dict() == right.to_dict() == combined.to_dict()
+    assert b.merge(a).to_dict() == a.merge(b).to_dict()
+    assert QuantileSketch.merge_all([a, b, c]).to_dict() == combined.to_dict()
+
+
+def test_merge_rejects_different_alpha():
+    with pytest.raises(ValueError):
+        QuantileSketch(0.01).merge(QuantileSketch(0.02))
+
+
+def test_dict_round_trip():
+    sketch = QuantileSketch.from_values(np.concatenate([[0, 0], _values(4)]))
+    restored = QuantileSketch.from_dict(sketch.to_dict())
+    assert restored.bins == sketch.bins
+    assert restored.zero == sketch.zero
+    assert restored.quantiles(QS) == sketch.quantiles(QS)
@@ -0,0 +1,81 @@
+"""storage: 先行書き込みログ・パーティションの読み込み"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sketch import frame_sketches
+from storage import SnapshotStore, SweepLog
+from synthetic import synthetic_df
+
+
+def test_sweep_log_is_scoped_by_region(tmp_path):
+    """同じ時刻に始まった地域別のスイープは別のログになり、再開は同じ地域のログのみ"""
+    root = str(tmp_path)
+    tw = SweepLog.create("2026-01-01 10:00:00", root=root)
+    my = SweepLog.create("2026-01-01 10:00:00", "my", root=root)
+    SweepLog.create("2026-01-02 10:00:00", "my", root=root)
+    assert tw.path != my.path
+    tw.append("kw", [{"name": "a", "price": 100}])
+
+    resumed = SweepLog.latest_open(root=root)
+    assert (resumed.region, resumed.snapshot_id) == ("tw", "20260101-100000")
+    assert resumed.completed() == {"kw": [{"name": "a", "price": 100}]}
+    assert SweepLog.latest_open("my", root=root).snapshot_id == "20260102-100000_my"
+    assert SweepLog.latest_open("vn", root=root) is None
+
+
+def test_sweep_log_without_region_is_default_region(tmp_path):
+    """地域の記録がない既存のログは既定の地域（台湾）として再開する"""
+    wal_dir = tmp_path / "wal"
+    wal_dir.mkdir()
+    (wal_dir / "20260101-100000.jsonl").write_text(json.dumps({"timestamp": "2026-01-01 10:00:00"}) + "\n")
+
+    assert SweepLog.latest_open(root=str(tmp_path)).snapshot_id == "20260101-100000"
+    assert SweepLog.latest_open("my", root=str(tmp_path)) is None
+
+
+def test_scan_references_memory_map(tmp_path):
+    """範囲条件のない scan は保存列をコピーせず Arrow のまま返す（結果の値は変わらない）"""
+    pa = pytest.importorskip("pyarrow")
+    n = 100_000
+    store = SnapshotStore(str(tmp_path))
+    store.write_snapshot(pd.DataFrame({
+        "timestamp": "2026-01-01 10:00:00",
+        "keyword": np.where(np.arange(n) % 2, "a", "b"),
+        "name": "x",
+        "price": np.arange(n) + 100,
+        "sales": np.arange(n),
+        "shop_rating": np.where(np.arange(n) % 10, 4.5, np.nan),
+    }))
+    store.scan()
+
+    allocated = pa.total_allocated_bytes()
+    df = store.scan()
+    # 保存列（数MB）は確保しない（結合のメタデータ程度のみ）
+    assert pa.total_allocated_bytes() - allocated < 64 * 1024
+    assert isinstance(df["price"].dtype, pd.ArrowDtype)
+    assert sorted(df["price"].tolist()) == list(range(100, n + 100))
+    assert df["shop_rating"].isna().sum() == n // 10
+    assert df["estimated_profit_jpy"].notna().all()
+
+
+def test_sketches_stored_beside_partitions(tmp_path):
+    """分位点スケッチはパーティションの隣のファイルに保存し、マニフェストには含めない"""
+    df = synthetic_df(500, 3, seed=0)
+    store = SnapshotStore(str(tmp_path))
+    store.write_snapshot(df)
+
+    with open(store.manifest_path, encoding="utf-8") as f:
+        partitions = json.load(f)["partitions"]
+    assert all("sketch" not in part for part in partitions)
+    assert all((tmp_path / part["path"]).with_suffix(".sketch.json").exists() for part in partitions)
+
+    expected = frame_sketches(df)
+    merged = SnapshotStore(str(tmp_path)).sketches()
+    assert merged.keys() == expected.keys()
+    for keyword, columns in merged.items():
+        for col, sketch in columns.items():
+            assert sketch.to_dict() == expected[keyword][col].to_dict()
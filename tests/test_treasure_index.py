@@ -0,0 +1,75 @@
+"""treasure_index: 閾値クエリ・スイープと総当たりのマスクの一致"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from profit import ProfitParams, calculate_profit
+from treasure_index import TreasureIndex
+
+PARAMS = ProfitParams(4.5, 0.12, 250, 0.45)
+CONDITIONS = [(500, 100, 4.5), (0, 0, 0), (-1e9, 50, 4.0), (2000, 1000, 4.8), (1e9, 0, 0)]
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 2_000
+    df = pd.DataFrame({
+        "price": rng.uniform(50, 2000, n).round(0),
+        "sales": rng.integers(0, 5000, n),
+        "shop_rating": rng.uniform(3.5, 5.0, n).round(1),
+        "estimated_profit_jpy": rng.normal(300, 800, n).round(0),
+    })
+    # 利益・価格が計算できない商品
+    df.loc[::97, "estimated_profit_jpy"] = np.nan
+    df.loc[::89, "price"] = np.nan
+    df.loc[5, "estimated_profit_jpy"] = np.inf
+    return df
+
+
+def _brute(df, min_profit, min_sales, min_rating, params=None):
+    profit = df["estimated_profit_jpy"] if params is None else calculate_profit(df["price"], params)["profit"]
+    mask = (profit >= min_profit) & (df["sales"] >= min_sales) & (df["shop_rating"] >= min_rating) & np.isfinite(profit)
+    return df[mask]
+
+
+@pytest.mark.parametrize("params", [None, PARAMS])
+@pytest.mark.parametrize("condition", CONDITIONS)
+def test_matches_brute_force(df, condition, params):
+    index = TreasureIndex(df)
+    expected = _brute(df, *condition, params)
+
+    assert index.count(*condition, params=params) == len(expected)
+    assert sorted(index.select(*condition, params=params).index) == sorted(expected.index)
+
+
+def test_sweep_matches_count(df):
+    index = TreasureIndex(df)
+    thresholds = [-1e9, 0, 250, 500, 1000, 1e9]
+    counts = [index.count(t, 100, 4.5) for t in thresholds]
+    assert list(index.sweep(thresholds, 100, 4.5)) == counts
+    assert list(index.sweep(thresholds, 100, 4.5, params=PARAMS)) == [
+        len(_brute(df, t, 100, 4.5, PARAMS)) for t in thresholds
+    ]
+
+
+def test_nan_keys_excluded():
+    df = pd.DataFrame({
+        "price": [100.0, np.nan, 300.0, 400.0],
+        "sales": [500] * 4,
+        "shop_rating": [5.0] * 4,
+        "estimated_profit_jpy": [1000.0, 2000.0, np.nan, 900.0],
+    })
+    index = TreasureIndex(df)
+    assert index.count(-1e9, 0, 0) == 3
+    assert list(index.select(-1e9, 0, 0).index) == [1, 0, 3]
+    assert index.count(-1e9, 0, 0, params=PARAMS) == 3
+
+
+def test_candidate_cache_is_bounded(df):
+    index = TreasureIndex(df, cache_size=3)
+    for min_sales in range(10):
+        index.count(0, min_sales, 0)
+    assert len(index._candidates) == 3
+    assert index.count(0, 0, 0) == len(_brute(df, 0, 0, 0))
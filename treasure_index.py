@@ -0,0 +1,154 @@
+"""お宝商品候補インデックス（閾値クエリ・閾値スイープ用）
+
+利益列・価格列でソートした配列を保持し、販売数・評価の条件ごとに
+条件を満たす行のソート済みキーをキャッシュする（直近 CANDIDATE_CACHE_SIZE 条件の LRU）。
+2回目以降の同条件クエリは二分探索のみで、任意の最低利益に答えられる。
+新しい条件の初回は行数に比例する一括のマスク計算となる。
+キーが NaN・無限大の行（利益・価格が計算できない商品）は候補に含めない。
+
+- params なし: 保存済みの利益列（estimated_profit_jpy など）で判定
+- params あり: 利益は価格の一次式なので、最低利益を価格の範囲に変換して判定
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from profit import ProfitParams, calculate_profit, price_range_for_profit
+
+# 販売数・評価の条件ごとの候補のキャッシュ数（1条件あたり候補数に比例する配列2本）
+CANDIDATE_CACHE_SIZE = 16
+
+
+class TreasureIndex:
+    """お宝商品候補インデックス"""
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        profit_col: str = "estimated_profit_jpy",
+        cache_size: int = CANDIDATE_CACHE_SIZE,
+    ):
+        self.df = df.reset_index(drop=True)
+        self.profit_col = profit_col
+        self.cache_size = cache_size
+        self._sales = self.df["sales"].to_numpy(dtype=float)
+        self._rating = self.df["shop_rating"].to_numpy(dtype=float)
+        self._sorted: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._candidates: OrderedDict[tuple, tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        # ダッシュボードでは複数セッションのスレッドで共有される
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_latest(cls, df: pd.DataFrame, profit_col: str = "estimated_profit_jpy") -> "TreasureIndex":
+        """最新スナップショットだけでインデックスを作成"""
+        if "timestamp" in df.columns:
+            df = df[df["timestamp"] == df["timestamp"].max()]
+        return cls(df, profit_col)
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    def _order(self, col: str) -> tuple[np.ndarray, np.ndarray]:
+        """col の値が有限の行を昇順に並べた (キー, 行位置)"""
+        if col not in self._sorted:
+            keys = self.df[col].to_numpy(dtype=float)
+            order = np.flatnonzero(np.isfinite(keys))
+            order = order[np.argsort(keys[order], kind="stable")]
+            self._sorted[col] = (keys[order], order)
+        return self._sorted[col]
+
+    def _eligible(self, col: str, min_sales: float, min_rating: float) -> tuple[np.ndarray, np.ndarray]:
+        """販売数・評価の条件を満たす行の (ソート済みキー, 行位置)"""
+        key = (col, float(min_sales), float(min_rating))
+        with self._lock:
+            cached = self._candidates.get(key)
+            if cached is not None:
+                self._candidates.move_to_end(key)
+                return cached
+            keys, order = self._order(col)
+
+        mask = (self._sales[order] >= min_sales) & (self._rating[order] >= min_rating)
+        candidates = (keys[mask], order[mask])
+        with self._lock:
+            self._candidates[key] = candidates
+            if len(self._candidates) > self.cache_size:
+                self._candidates.popitem(last=False)
+        return candidates
+
+    def _span(self, min_profit: float, min_sales: float, min_rating: float, params: ProfitParams | None):
+        """条件を満たす候補の (ソート済みキー, 行位置, 開始, 終了)"""
+        if params is None:
+            values, positions = self._eligible(self.profit_col, min_sales, min_rating)
+            return values, positions, np.searchsorted(values, min_profit, side="left"), len(values)
+
+        values, positions = self._eligible("price", min_sales, min_rating)
+        price_range = price_range_for_profit(min_profit, params)
+        if price_range is None:
+            return values, positions, 0, 0
+        low, high = price_range
+        start = 0 if low is None else np.searchsorted(values, low, side="left")
+        end = len(values) if high is None else np.searchsorted(values, high, side="right")
+        return values, positions, start, end
+
+    def count(
+        self,
+        min_profit: float = 500,
+        min_sales: float = 100,
+        min_rating: float = 4.5,
+        params: ProfitParams | None = None,
+    ) -> int:
+        """条件を満たす候補数"""
+        _, _, start, end = self._span(min_profit, min_sales, min_rating, params)
+        return max(int(end - start), 0)
+
+    def select(
+        self,
+        min_profit: float = 500,
+        min_sales: float = 100,
+        min_rating: float = 4.5,
+        params: ProfitParams | None = None,
+    ) -> pd.DataFrame:
+        """条件を満たす候補を利益の高い順に返す"""
+        _, positions, start, end = self._span(min_profit, min_sales, min_rating, params)
+        result = self.df.iloc[positions[start:end]]
+
+        if params is None:
+            return result.sort_values(self.profit_col, ascending=False, kind="stable")
+
+        # 価格範囲は境界を少し広げているので、利益で再判定する
+        profit = calculate_profit(result["price"], params)["profit"]
+        result = result.assign(profit=profit)
+        return result[result["profit"] >= min_profit].sort_values("profit", ascending=False, kind="stable")
+
+    def sweep(
+        self,
+        min_profits,
+        min_sales: float = 100,
+        min_rating: float = 4.5,
+        params: ProfitParams | None = None,
+    ) -> np.ndarray:
+        """最低利益を変化させたときの候補数（感度分析用）
+
+        Args:
+            min_profits: 最低利益（円）の配列
+        """
+        min_profits = np.asarray(min_profits, dtype=float)
+
+        if params is None:
+            values, _ = self._eligible(self.profit_col, min_sales, min_rating)
+            return len(values) - np.searchsorted(values, min_profits, side="left")
+
+        values, _ = self._eligible("price", min_sales, min_rating)
+        need = min_profits + params.fixed_cost
+        margin = params.margin
+        if margin == 0:
+            return np.where(need <= 0, len(values), 0)
+
+        bounds = need / margin
+        slack = np.abs(bounds) * 1e-9 + 1e-9
+        if margin > 0:
+            return len(values) - np.searchsorted(values, bounds - slack, side="left")
+        return np.searchsorted(values, bounds + slack, side="right")